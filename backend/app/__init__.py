@@ -2,13 +2,26 @@ import os
 
 from app.config import config
 from app.extensions import init_extensions, db
+from app.models.user_search import install_search_index
+from app.schemas.validators import init_validators
+from app.services.event_broker import init_event_broker
+from app.services.user_cache import init_user_cache
+from app.services.write_batcher import init_write_batching
+from app.utils.compression import init_compression
+from app.utils.fastjson import init_json
+from app.utils.metrics import init_metrics
+from app.utils.query_analysis import init_query_analysis
 from app.utils.exceptions import AppException
 from flask import Flask, jsonify, render_template
 
 
-def create_app(config_name: str | None = None) -> Flask:
+def create_app(
+        config_name: str | None = None,
+        config_overrides: dict | None = None,
+) -> Flask:
     """
     Application Factory Pattern.
+    config_overrides — значения поверх выбранной конфигурации (например, в тестах).
     """
 
     if config_name is None:
@@ -18,6 +31,8 @@ def create_app(config_name: str | None = None) -> Flask:
 
     # Загрузка конфигурации
     app.config.from_object(config.get(config_name, config["default"]))
+    if config_overrides:
+        app.config.update(config_overrides)
 
     # Строгая проверка только если действительно выбран production
     if config_name == "production" and not app.config.get("SECRET_KEY"):
@@ -26,12 +41,38 @@ def create_app(config_name: str | None = None) -> Flask:
     # Инициализация расширений (db, migrate, cors и т.д.)
     init_extensions(app)
 
+    # Метрики запросов (Server-Timing, /metrics) — первыми среди хуков,
+    # чтобы total включал остальные before/after_request
+    init_metrics(app)
+
+    # Анализ SQL в разработке: медленные и повторяющиеся операторы
+    init_query_analysis(app)
+
+    # JSON-ответы (после init_metrics: он подменяет app.json) и их сжатие
+    init_json(app)
+    init_compression(app)
+
+    # Кэш пользователей
+    init_user_cache(app)
+
+    # Групповая фиксация записей (USERS_WRITE_BATCHING)
+    init_write_batching(app)
+
+    # Поток изменений пользователей (SSE, USERS_STREAM_ENABLED)
+    init_event_broker(app)
+
+    # Правила валидации (список временных доменов)
+    init_validators(app)
+
     # Регистрация blueprints
     register_blueprints(app)
 
     # Регистрация обработчиков ошибок
     register_error_handlers(app)
 
+    # CLI-команды (flask users ...)
+    register_commands(app)
+
     @app.route("/")
     def index_page():
         return render_template("index.html")
@@ -41,6 +82,9 @@ def create_app(config_name: str | None = None) -> Flask:
     with app.app_context():
         if config_name in ("development", "testing"):
             db.create_all()
+            # Для уже существующей БД create_all не создаёт поисковый индекс
+            with db.engine.begin() as connection:
+                install_search_index(connection)
             if config_name == "development":
                 seed_database()
 
@@ -49,9 +93,25 @@ def create_app(config_name: str | None = None) -> Flask:
 
 def register_blueprints(app: Flask) -> None:
     """Регистрация всех blueprints приложения."""
-    from app.routes import users
+    from app.routes import metrics, system, users
+
+    if app.config["ASYNC_MODE"]:
+        from app.routes import users_async
+
+        # Регистрируется первым: его правила перекрывают синхронные
+        app.register_blueprint(users_async.bp)
 
     app.register_blueprint(users.bp)
+    app.register_blueprint(system.bp)
+    if app.config["METRICS_ENABLED"]:
+        app.register_blueprint(metrics.bp)
+
+
+def register_commands(app: Flask) -> None:
+    """Регистрация CLI-команд."""
+    from app.commands import users_cli
+
+    app.cli.add_command(users_cli)
 
 
 def register_error_handlers(app: Flask) -> None:
@@ -0,0 +1,289 @@
+"""
+ASGI-обёртка приложения: поток SSE и async-view без потока ОС на запрос.
+
+В event loop ASGI-сервера обслуживаются:
+
+- GET /api/users/stream — ожидающий подписчик — корутина, а не занятый
+  поток WSGI;
+- async-view (ASYNC_MODE, app.routes.users_async) — запрос проходит через
+  хуки Flask как обычно, а view ожидается прямо в loop сервера; запросы к
+  БД идут через пул async-соединений этого loop (AsyncDatabase.serve_loop).
+
+Остальные запросы уходят во Flask через asgiref.WsgiToAsgi в собственном
+пуле из ASGI_WSGI_THREADS потоков: по умолчанию asgiref выполняет
+синхронный код в одном общем потоке (thread_sensitive), и запросы шли бы
+по очереди.
+
+Запуск: uvicorn asgi:application (см. backend/asgi.py).
+"""
+import asyncio
+import inspect
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Set
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from flask import Flask, Response, request, request_started
+from werkzeug.exceptions import HTTPException
+
+from app.extensions import async_db
+from app.services.event_broker import KEEPALIVE, EventBroker, Subscription
+from app.utils import fastjson
+from app.utils.exceptions import AppException
+
+STREAM_PATH = "/api/users/stream"
+
+STREAM_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+]
+
+
+class _LoopWaker:
+    """
+    Пробуждение потоков одного event loop: брокер вызывает wake из потока
+    публикующего, и на публикацию приходится один call_soon_threadsafe,
+    сколько бы подписчиков ни ждало в этом loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        # Меняется и читается только в потоке loop
+        self.events: Set[asyncio.Event] = set()
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def wake(self) -> None:
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.loop.call_soon_threadsafe(self._run)
+
+    def _run(self) -> None:
+        with self._lock:
+            self._scheduled = False
+        for event in self.events:
+            event.set()
+
+
+class _ThreadedWsgiInstance(WsgiToAsgiInstance):
+    """Запрос к WSGI-приложению в потоке из executor, а не в общем потоке asgiref."""
+
+    def __init__(self, wsgi_application, executor: ThreadPoolExecutor):
+        super().__init__(wsgi_application)
+        # Исходная синхронная функция из-под декоратора @sync_to_async
+        run_wsgi_app = WsgiToAsgiInstance.__dict__["run_wsgi_app"].func
+        self.run_wsgi_app = sync_to_async(
+            run_wsgi_app.__get__(self),
+            thread_sensitive=False,
+            executor=executor,
+        )
+
+
+class ThreadedWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi, параллельно выполняющий запросы в пуле потоков."""
+
+    def __init__(self, wsgi_application, threads: int):
+        super().__init__(wsgi_application)
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="asgi-wsgi")
+
+    async def __call__(self, scope, receive, send) -> None:
+        await _ThreadedWsgiInstance(self.wsgi_application, self.executor)(scope, receive, send)
+
+
+class UsersASGI:
+    """ASGI-приложение: поток изменений и async-view в event loop, остальное — Flask."""
+
+    def __init__(self, app: Flask):
+        self.flask_app = app
+        self.wsgi = ThreadedWsgiToAsgi(app, app.config["ASGI_WSGI_THREADS"])
+        self._wakers: Dict[asyncio.AbstractEventLoop, _LoopWaker] = {}
+        self.async_endpoints = {
+            endpoint
+            for endpoint, view in app.view_functions.items()
+            if inspect.iscoroutinefunction(view)
+        }
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        broker = self.flask_app.extensions.get("event_broker")
+        if (
+                scope["type"] == "http"
+                and scope["path"] == STREAM_PATH
+                and scope["method"] == "GET"
+                and broker is not None
+        ):
+            await self._stream(broker, scope, receive, send)
+        elif scope["type"] == "http" and self._is_async_view(scope):
+            await self._dispatch_async(scope, receive, send)
+        else:
+            await self.wsgi(scope, receive, send)
+
+    def _is_async_view(self, scope) -> bool:
+        # OPTIONS Flask отвечает сам (CORS preflight) — через WSGI
+        if not self.async_endpoints or scope["method"] == "OPTIONS":
+            return False
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        try:
+            endpoint, _ = self.flask_app.url_map.bind("localhost").match(path, scope["method"])
+        except HTTPException:
+            return False
+        return endpoint in self.async_endpoints
+
+    async def _dispatch_async(self, scope, receive, send) -> None:
+        """Запрос к async-view в текущем loop (аналог Flask.wsgi_app)."""
+        app = self.flask_app
+        async_db.serve_loop(app)
+        body = await _read_body(receive)
+        # Окружение WSGI строится так же, как для остальных запросов
+        adapter = WsgiToAsgiInstance(app)
+        adapter.scope = scope
+        environ = adapter.build_environ(scope, io.BytesIO(body))
+
+        ctx = app.request_context(environ)
+        error = None
+        try:
+            try:
+                ctx.push()
+                response = await self._full_dispatch()
+            except Exception as e:
+                error = e
+                response = app.handle_exception(e)
+            app_iter, status, headers = response.get_wsgi_response(environ)
+            try:
+                content = b"".join(app_iter)
+            finally:
+                if hasattr(app_iter, "close"):
+                    app_iter.close()
+        finally:
+            if error is not None and app.should_ignore_error(error):
+                error = None
+            ctx.pop(error)
+
+        await send({
+            "type": "http.response.start",
+            "status": int(status.split(" ", 1)[0]),
+            "headers": [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in headers
+            ],
+        })
+        await send({"type": "http.response.body", "body": content})
+
+    async def _full_dispatch(self) -> Response:
+        """Flask.full_dispatch_request, но view ожидается, а не запускается в новом loop."""
+        app = self.flask_app
+        app._got_first_request = True
+        try:
+            request_started.send(app, _async_wrapper=app.ensure_sync)
+            rv = app.preprocess_request()
+            if rv is None:
+                view = app.view_functions[request.url_rule.endpoint]
+                rv = await view(**request.view_args)
+        except Exception as e:
+            rv = app.handle_user_exception(e)
+        return app.finalize_request(rv)
+
+    async def _stream(self, broker: EventBroker, scope, receive, send) -> None:
+        headers = dict(scope["headers"])
+        last_event_id = headers.get(b"last-event-id")
+        waker = self._waker()
+        try:
+            subscription = broker.subscribe(
+                last_event_id.decode("latin-1") if last_event_id is not None else None,
+                notify=waker.wake,
+            )
+        except AppException as e:
+            await _send_json(send, e.status_code, e.to_dict())
+            return
+        wakeup = asyncio.Event()
+        waker.events.add(wakeup)
+
+        # Отключение клиента — отдельная задача: будит основной цикл
+        watcher = asyncio.ensure_future(_wait_disconnect(receive, subscription, wakeup))
+        try:
+            await send({"type": "http.response.start", "status": 200, "headers": STREAM_HEADERS})
+            while True:
+                chunks = subscription.drain()
+                if chunks:
+                    await send({
+                        "type": "http.response.body",
+                        "body": b"".join(chunks),
+                        "more_body": True,
+                    })
+                if subscription.closed:
+                    break
+                try:
+                    async with asyncio.timeout(broker.keepalive):
+                        await wakeup.wait()
+                except TimeoutError:
+                    await send({"type": "http.response.body", "body": KEEPALIVE, "more_body": True})
+                wakeup.clear()
+            if not watcher.done():
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            subscription.close()
+            waker.events.discard(wakeup)
+            watcher.cancel()
+
+    def _waker(self) -> _LoopWaker:
+        loop = asyncio.get_running_loop()
+        waker = self._wakers.get(loop)
+        if waker is None:
+            waker = self._wakers[loop] = _LoopWaker(loop)
+        return waker
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.async_endpoints:
+                    await async_db.dispose_loop(self.flask_app)
+                self.wsgi.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return b"".join(chunks)
+
+
+async def _wait_disconnect(receive, subscription: Subscription, wakeup: asyncio.Event) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+    subscription.close()
+    wakeup.set()
+
+
+async def _send_json(send, status: int, payload) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json")],
+    })
+    await send({"type": "http.response.body", "body": fastjson.dumps(payload)})
+
+
+def create_asgi_app(app: Flask) -> UsersASGI:
+    """Обернуть Flask-приложение для ASGI-сервера."""
+    return UsersASGI(app)
@@ -0,0 +1,79 @@
+import os
+
+import click
+from flask.cli import AppGroup
+
+from app.services.import_service import (
+    FORMATS,
+    ON_DUPLICATE_POLICIES,
+    ON_DUPLICATE_SKIP,
+    UserImporter,
+    detect_format,
+)
+from app.utils.exceptions import AppException
+
+users_cli = AppGroup("users", help="Управление пользователями.")
+
+
+@users_cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--format", "fmt",
+    type=click.Choice(FORMATS),
+    default=None,
+    help="Формат файла (по умолчанию — по расширению).",
+)
+@click.option("--chunk-size", default=1000, show_default=True, help="Строк на транзакцию.")
+@click.option(
+    "--on-duplicate",
+    type=click.Choice(ON_DUPLICATE_POLICIES),
+    default=ON_DUPLICATE_SKIP,
+    show_default=True,
+    help="Что делать с уже существующим email.",
+)
+@click.option(
+    "--checkpoint",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Файл чекпоинта (по умолчанию <path>.checkpoint).",
+)
+@click.option(
+    "--resume/--no-resume",
+    default=True,
+    show_default=True,
+    help="Продолжить с сохранённого чекпоинта.",
+)
+def import_users(path, fmt, chunk_size, on_duplicate, checkpoint, resume):
+    """Импортировать пользователей из CSV/NDJSON файла."""
+    checkpoint = checkpoint or f"{path}.checkpoint"
+    if not resume:
+        click.echo("Чекпоинт игнорируется, импорт с начала файла")
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+    def progress(line, stats):
+        click.echo(
+            f"строка {line}: обработано {stats.processed}, создано {stats.created}, "
+            f"обновлено {stats.updated}, пропущено {stats.skipped}, "
+            f"ошибок {stats.invalid}"
+        )
+
+    importer = UserImporter(
+        chunk_size=chunk_size,
+        on_duplicate=on_duplicate,
+        checkpoint_path=checkpoint,
+        progress=progress,
+    )
+
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            stats = importer.run(f, fmt or detect_format(path), source=path)
+    except AppException as e:
+        raise click.ClickException(e.message)
+
+    for error in stats.errors:
+        click.echo(f"строка {error['line']}: {error['details']}", err=True)
+    click.echo(
+        f"✅ Импорт завершён: создано {stats.created}, обновлено {stats.updated}, "
+        f"пропущено {stats.skipped}, ошибок {stats.invalid}"
+    )
@@ -17,8 +17,45 @@ class Config:
         f"sqlite:///{BASE_DIR / 'data' / 'users.db'}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Реплики для чтения (URL через запятую) -> bind'ы replica_0, replica_1, ...
+    READ_REPLICA_URLS = [
+        url.strip() for url in os.getenv("READ_REPLICA_URLS", "").split(",")
+        if url.strip()
+    ]
+    SQLALCHEMY_BINDS = {
+        f"replica_{i}": url for i, url in enumerate(READ_REPLICA_URLS)
+    }
+    # Окно read-your-writes: после записи клиент читает с primary (сек)
+    REPLICA_READ_YOUR_WRITES_SECONDS = float(
+        os.getenv("REPLICA_READ_YOUR_WRITES_SECONDS", 5)
+    )
     SQLALCHEMY_ECHO = False
 
+    # Профиль движка (см. app.extensions.engine_options); явно заданные
+    # SQLALCHEMY_ENGINE_OPTIONS имеют приоритет
+    # Пул соединений (QueuePool: файловая SQLite, PostgreSQL и т.д.)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+    # Только для серверных СУБД: проверка соединения и его пересоздание (сек)
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+    # SQLite: PRAGMA на каждое новое соединение
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    # Кэш страниц в КиБ (PRAGMA cache_size = -N)
+    SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+
+    # Async-режим: основные эндпоинты /api/users обслуживаются async-view
+    # через sqlalchemy.ext.asyncio (aiosqlite / asyncpg). Конкурентность
+    # даёт только ASGI (asgi.py): там view выполняются в event loop сервера
+    # с пулом соединений; под WSGI каждый view занимает поток воркера
+    ASYNC_MODE = os.getenv("ASYNC_MODE", "false").lower() == "true"
+
     # CORS
     CORS_ORIGINS = os.getenv(
         "CORS_ORIGINS",
@@ -27,10 +64,102 @@ class Config:
 
     # Pagination
     USERS_PER_PAGE = int(os.getenv("USERS_PER_PAGE", 20))
-
-    # JSON
+    # Стратегия подсчёта total в списках: exact | cached
+    USERS_COUNT_STRATEGY = os.getenv("USERS_COUNT_STRATEGY", "exact")
+    USERS_COUNT_CACHE_TTL = float(os.getenv("USERS_COUNT_CACHE_TTL", 30))
+
+    # ETag для списка: с total — версия выборки (агрегат count/max(updated_at)/max(id)
+    # вместо COUNT), без total (with_total=false, keyset) — хэш тела страницы
+    USERS_LIST_ETAG = os.getenv("USERS_LIST_ETAG", "true").lower() == "true"
+
+    # Кэш пользователей (GET /api/users/<id>)
+    USER_CACHE_ENABLED = os.getenv("USER_CACHE_ENABLED", "true").lower() == "true"
+    USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 60))
+    USER_CACHE_NEGATIVE_TTL = float(os.getenv("USER_CACHE_NEGATIVE_TTL", 5))
+    USER_CACHE_MAXSIZE = int(os.getenv("USER_CACHE_MAXSIZE", 10000))
+    # Общий кэш (например, redis://localhost:6379/0); по умолчанию только локальный
+    USER_CACHE_REDIS_URL = os.getenv("USER_CACHE_REDIS_URL")
+    # TTL локального уровня при общем кэше (сек): инвалидация в другом воркере
+    # удаляет только общую запись, локальные копии живут не дольше этого
+    USER_CACHE_LOCAL_TTL = float(os.getenv("USER_CACHE_LOCAL_TTL", 2))
+
+    # Файл со списком временных почтовых доменов (по одному в строке)
+    DISPOSABLE_DOMAINS_FILE = os.getenv("DISPOSABLE_DOMAINS_FILE")
+
+    # Пакетное создание пользователей
+    USERS_BULK_MAX_ITEMS = int(os.getenv("USERS_BULK_MAX_ITEMS", 10000))
+    USERS_BULK_CHUNK_SIZE = int(os.getenv("USERS_BULK_CHUNK_SIZE", 1000))
+
+    # Журнал изменений (GET /api/users/changes): курсор не продвигается по
+    # изменениям моложе SETTLE_MS — они отдаются повторно, а не теряются,
+    # если транзакция с более ранним updated_at зафиксируется позже
+    USERS_CHANGES_SETTLE_MS = int(os.getenv("USERS_CHANGES_SETTLE_MS", 1000))
+
+    # Поток изменений SSE (GET /api/users/stream, app.services.event_broker).
+    # QUEUE_SIZE — сколько событий подписчик может отставать; при переполнении
+    # OVERFLOW=disconnect закрывает поток, drop — пропускает старые события;
+    # клиент получает reset и догружает изменения через /changes.
+    # REPLAY_SIZE — последних событий для продолжения по Last-Event-ID
+    USERS_STREAM_ENABLED = os.getenv("USERS_STREAM_ENABLED", "true").lower() == "true"
+    USERS_STREAM_QUEUE_SIZE = int(os.getenv("USERS_STREAM_QUEUE_SIZE", 256))
+    USERS_STREAM_OVERFLOW = os.getenv("USERS_STREAM_OVERFLOW", "disconnect")
+    USERS_STREAM_REPLAY_SIZE = int(os.getenv("USERS_STREAM_REPLAY_SIZE", 1000))
+    USERS_STREAM_MAX_SUBSCRIBERS = int(os.getenv("USERS_STREAM_MAX_SUBSCRIBERS", 10000))
+    USERS_STREAM_KEEPALIVE_S = float(os.getenv("USERS_STREAM_KEEPALIVE_S", 15))
+    USERS_STREAM_RETRY_MS = int(os.getenv("USERS_STREAM_RETRY_MS", 3000))
+    # asgi.py: потоков для запросов, которые обслуживает синхронный Flask
+    # (всё, кроме потока изменений) — как --threads у WSGI-сервера
+    ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", 16))
+
+    # Запись одним оператором: INSERT / UPDATE / DELETE ... RETURNING
+    # (SQLite 3.35+, PostgreSQL; на остальных СУБД — проверка и запись)
+    USERS_WRITE_RETURNING = os.getenv("USERS_WRITE_RETURNING", "true").lower() == "true"
+
+    # Групповая фиксация записей (app.services.write_batcher): create/update/delete
+    # из параллельных запросов — одной транзакцией. Пакет — операции, накопившиеся
+    # за время предыдущего COMMIT, плюс пришедшие за WINDOW_MS после первой;
+    # не больше BATCH_SIZE. Работает поверх USERS_WRITE_RETURNING
+    USERS_WRITE_BATCHING = os.getenv("USERS_WRITE_BATCHING", "false").lower() == "true"
+    USERS_WRITE_BATCH_WINDOW_MS = float(os.getenv("USERS_WRITE_BATCH_WINDOW_MS", 0))
+    USERS_WRITE_BATCH_SIZE = int(os.getenv("USERS_WRITE_BATCH_SIZE", 64))
+
+    # Пакетное получение по ID (GET /api/users?ids=..., POST /api/users/lookup)
+    USERS_LOOKUP_MAX_IDS = int(os.getenv("USERS_LOOKUP_MAX_IDS", 5000))
+    USERS_LOOKUP_CHUNK_SIZE = int(os.getenv("USERS_LOOKUP_CHUNK_SIZE", 500))
+
+    # Метрики запросов: Server-Timing и GET /metrics (Prometheus)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Анализ SQL (app.utils.query_analysis): медленные операторы с параметрами
+    # и методом сервиса, повторы одной формы SQL за запрос (N+1)
+    QUERY_ANALYSIS = os.getenv("QUERY_ANALYSIS", "false").lower() == "true"
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 100))
+    # План (EXPLAIN QUERY PLAN / EXPLAIN) для медленных SELECT
+    QUERY_EXPLAIN = os.getenv("QUERY_EXPLAIN", "false").lower() == "true"
+    QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", 3))
+
+    # Сжатие ответов по Accept-Encoding: gzip, а также br / zstd при
+    # установленных brotli / zstandard (app.utils.compression)
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    # Меньшие тела не сжимаются (в т.ч. ответ с одним пользователем)
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+    COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+    COMPRESSION_MIMETYPES = [
+        "application/json",
+        "application/x-ndjson",
+        "text/csv",
+        "text/html",
+        "text/css",
+        "text/plain",
+        "text/javascript",
+        "application/javascript",
+    ]
+
+    # JSON (jsonify): компактный вывод без отступов, UTF-8 без \uXXXX
     JSON_SORT_KEYS = False
-    JSONIFY_PRETTYPRINT_REGULAR = True
+    JSON_COMPACT = os.getenv("JSON_COMPACT", "true").lower() == "true"
 
 
 class DevelopmentConfig(Config):
@@ -38,7 +167,9 @@ class DevelopmentConfig(Config):
 
     DEBUG = True
     TESTING = False
-    SQLALCHEMY_ECHO = True
+    QUERY_ANALYSIS = os.getenv("QUERY_ANALYSIS", "true").lower() == "true"
+    QUERY_EXPLAIN = os.getenv("QUERY_EXPLAIN", "true").lower() == "true"
+    JSON_COMPACT = os.getenv("JSON_COMPACT", "false").lower() == "true"
 
 
 class ProductionConfig(Config):
@@ -54,6 +185,7 @@ class TestingConfig(Config):
 
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    SQLALCHEMY_BINDS = {}
     SQLALCHEMY_ECHO = False
 
 
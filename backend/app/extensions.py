@@ -1,9 +1,232 @@
+import asyncio
+
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+from app.utils.db_pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from app.utils.db_routing import (
+    RoutingSession,
+    is_pinned_to_primary,
+    next_replica,
+    replica_keys,
+    routing_stats,
+)
+
+# Async-драйверы для ASYNC_MODE по диалекту синхронного URL
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def is_memory_sqlite(url) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(config) -> dict:
+    """
+    Профиль движка по URL: пул соединений (со статистикой ожидания) для
+    файловой SQLite и серверных СУБД, pre-ping и recycle — только для серверных.
+    In-memory SQLite оставляем как есть (Flask-SQLAlchemy ставит StaticPool).
+    """
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if is_memory_sqlite(url):
+        return {}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+    }
+    if url.get_backend_name() != "sqlite":
+        options["pool_pre_ping"] = config["DB_POOL_PRE_PING"]
+        options["pool_recycle"] = config["DB_POOL_RECYCLE"]
+    return options
+
+
+def sqlite_pragmas(config, memory: bool = False) -> list:
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA synchronous = {config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA cache_size = -{int(config['SQLITE_CACHE_SIZE_KB'])}",
+    ]
+    if not memory:
+        # WAL и mmap имеют смысл только для файла
+        pragmas.insert(0, f"PRAGMA journal_mode = {config['SQLITE_JOURNAL_MODE']}")
+        pragmas.append(f"PRAGMA mmap_size = {int(config['SQLITE_MMAP_SIZE'])}")
+    return pragmas
+
+
+def install_sqlite_pragmas(engine, config) -> None:
+    """Выполнять PRAGMA из конфигурации на каждом новом соединении SQLite."""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas(config, memory=is_memory_sqlite(engine.url))
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+def make_async_url(url: str):
+    """URL синхронного движка -> тот же адрес с async-драйвером."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"ASYNC_MODE не поддерживает СУБД {backend}")
+    if is_memory_sqlite(url):
+        # У каждого async-соединения была бы своя пустая in-memory БД
+        raise RuntimeError("ASYNC_MODE требует файловую SQLite-базу")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+class AsyncDatabase:
+    """
+    Async-движок SQLAlchemy (sqlalchemy.ext.asyncio) поверх той же БД, что и db.
+
+    Создаётся только при ASYNC_MODE. Соединения asyncpg/aiosqlite привязаны
+    к event loop, в котором открыты, поэтому набор движков — свой на loop:
+
+    - под ASGI (app.asgi) async-view выполняются прямо в loop сервера; он
+      регистрируется через serve_loop(), и его движки держат пул соединений
+      с настройками синхронного движка;
+    - под WSGI Flask запускает каждый async-view в новом loop, и там
+      работают общие движки без пула (NullPool).
+
+    Для реплик из SQLALCHEMY_BINDS создаются свои async-движки: read_session()
+    выбирает их так же, как read_replica() для db.session. Движки создаются
+    и после старта, поэтому инструментирование подключается через on_engine().
+    """
+
+    def init_app(self, app) -> None:
+        binds = app.config.get("SQLALCHEMY_BINDS") or {}
+        urls = {None: make_async_url(app.config["SQLALCHEMY_DATABASE_URI"])}
+        urls.update({key: make_async_url(binds[key]) for key in replica_keys(binds)})
+        state = app.extensions["async_db"] = {
+            "config": app.config,
+            "urls": urls,
+            "listeners": [],
+            # event loop -> движки с пулом (см. serve_loop)
+            "loops": {},
+        }
+        try:
+            state["default"] = self._create_engines(state, pooled=False)
+        except ImportError as e:
+            raise RuntimeError("Для ASYNC_MODE требуется пакет greenlet") from e
+
+    @staticmethod
+    def _create_engines(state, pooled: bool) -> dict:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        config = state["config"]
+        options = {"echo": config.get("SQLALCHEMY_ECHO", False)}
+        if pooled:
+            # Настройки пула — те же, что у синхронного движка
+            options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+            if options.get("poolclass") is InstrumentedQueuePool:
+                options["poolclass"] = InstrumentedAsyncQueuePool
+        else:
+            options["poolclass"] = NullPool
+        engines = {}
+        for key, url in state["urls"].items():
+            engines[key] = create_async_engine(url, **options)
+            install_sqlite_pragmas(engines[key].sync_engine, config)
+            for listener in state["listeners"]:
+                listener(engines[key].sync_engine)
+        return {
+            "engine": engines[None],
+            "engines": engines,
+            # Объекты остаются доступными после commit (сериализация в view)
+            "sessionmaker": async_sessionmaker(engines[None], expire_on_commit=False),
+        }
+
+    def on_engine(self, app, listener) -> None:
+        """Вызывать listener(sync_engine) для каждого async-движка, в том числе будущих."""
+        state = app.extensions["async_db"]
+        state["listeners"].append(listener)
+        for engine in self.sync_engines(app):
+            listener(engine)
+
+    @staticmethod
+    def sync_engines(app) -> list:
+        """sync_engine всех созданных async-движков приложения."""
+        state = app.extensions["async_db"]
+        return [
+            engine.sync_engine
+            for engines in (state["default"], *state["loops"].values())
+            for engine in engines["engines"].values()
+        ]
+
+    @staticmethod
+    def pool_engine(app):
+        """Primary-движок с пулом (loop ASGI-сервера); без ASGI — движок без пула."""
+        state = app.extensions["async_db"]
+        return next(iter(state["loops"].values()), state["default"])["engine"]
+
+    def serve_loop(self, app) -> None:
+        """Завести движки с пулом для текущего event loop (вызывается из ASGI)."""
+        state = app.extensions["async_db"]
+        loop = asyncio.get_running_loop()
+        if loop not in state["loops"]:
+            state["loops"][loop] = self._create_engines(state, pooled=True)
+
+    async def dispose_loop(self, app) -> None:
+        """Закрыть пул текущего event loop (остановка ASGI-сервера)."""
+        engines = app.extensions["async_db"]["loops"].pop(asyncio.get_running_loop(), None)
+        if engines is not None:
+            for engine in engines["engines"].values():
+                await engine.dispose()
+
+    @staticmethod
+    def _engines(state) -> dict:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return state["default"]
+        return state["loops"].get(loop, state["default"])
+
+    @property
+    def engine(self):
+        """Primary-движок текущего event loop (вне loop ASGI-сервера — без пула)."""
+        return self._engines(current_app.extensions["async_db"])["engine"]
+
+    def session(self):
+        """Новая AsyncSession (использовать как async with)."""
+        return self._engines(current_app.extensions["async_db"])["sessionmaker"]()
+
+    def read_session(self):
+        """
+        AsyncSession для чтения: реплика по кругу, primary — без реплик
+        и для клиента в окне read-your-writes.
+        """
+        engines = self._engines(current_app.extensions["async_db"])
+        keys = replica_keys(engines["engines"])
+        if not keys:
+            return engines["sessionmaker"]()
+        if is_pinned_to_primary():
+            routing_stats.incr("primary_read_your_writes")
+            return engines["sessionmaker"]()
+        key = next_replica(keys)
+        routing_stats.incr(key)
+        return engines["sessionmaker"](bind=engines["engines"][key])
+
 
 # Инстансы расширений (создаются один раз, инициализируются в init_extensions)
-db = SQLAlchemy()
+# Чтения внутри read_replica() уходят на bind'ы replica_N (см. app.utils.db_routing)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+async_db = AsyncDatabase()
 migrate = Migrate()
 cors = CORS()
 
@@ -11,8 +234,23 @@ cors = CORS()
 def init_extensions(app):
     """Инициализация всех расширений Flask."""
 
-    # SQLAlchemy
+    # SQLAlchemy: профиль движка + явно заданные SQLALCHEMY_ENGINE_OPTIONS
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **engine_options(app.config),
+        **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+    }
     db.init_app(app)
+    # Реплики — копии primary без своих моделей: убираем их пустые metadata,
+    # чтобы create_all() / drop_all() не обращались к репликам
+    for key in replica_keys(db.metadatas):
+        del db.metadatas[key]
+    with app.app_context():
+        for engine in db.engines.values():
+            install_sqlite_pragmas(engine, app.config)
+
+    # Async-движок (опционально)
+    if app.config["ASYNC_MODE"]:
+        async_db.init_app(app)
 
     # Миграции БД
     migrate.init_app(app, db)
@@ -23,8 +261,14 @@ def init_extensions(app):
         resources={
             r"/api/*": {
                 "origins": app.config["CORS_ORIGINS"],
-                "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-                "allow_headers": ["Content-Type", "Authorization"],
+                "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+                # Условные запросы: If-Match / If-None-Match и ETag в ответе;
+                # Last-Event-ID — продолжение потока /api/users/stream
+                "allow_headers": [
+                    "Content-Type", "Authorization", "If-Match", "If-None-Match",
+                    "Last-Event-ID",
+                ],
+                "expose_headers": ["ETag"],
                 "supports_credentials": True,
                 "max_age": 3600,
             }
@@ -1,3 +1,4 @@
 from .user import User
+from . import user_search  # noqa: F401  (регистрирует DDL поискового индекса)
 
 __all__ = ["User"]
@@ -1,5 +1,7 @@
 from datetime import datetime, UTC
 
+from sqlalchemy import true
+
 from app.extensions import db
 
 
@@ -10,7 +12,7 @@ class User(db.Model):
 
     # Столбцы
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    name = db.Column(db.String(100), nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     created_at = db.Column(
         db.DateTime(timezone=True),
@@ -23,12 +25,34 @@ class User(db.Model):
         onupdate=lambda: datetime.now(UTC),
         nullable=False,
     )
-    is_active = db.Column(db.Boolean, default=True, nullable=False, index=True)
+    is_active = db.Column(db.Boolean, default=True, nullable=False)
 
-    # Индексы
+    # Индексы. Лента активных пользователей (ORDER BY created_at DESC, id DESC)
+    # читается из частичного индекса без мягко удалённых строк. Он же покрывающий:
+    # страница, count и версия списка (max(updated_at), max(id)) не обращаются
+    # к таблице. В SQLite нет INCLUDE — столбцы ленты входят в ключ.
+    # Поиск по email — уникальный ix_users_email (уникальность нужна и среди
+    # неактивных, поэтому он не частичный).
+    # Журнал изменений (GET /api/users/changes) — seek по (updated_at, id)
+    # среди всех строк, включая мягко удалённые.
     __table_args__ = (
-        db.Index("ix_users_email_active", "email", "is_active"),
-        db.Index("ix_users_created_at", "created_at"),
+        db.Index("ix_users_updated_at", updated_at, id),
+        db.Index(
+            "ix_users_active_feed",
+            created_at.desc(),
+            id.desc(),
+            name,
+            email,
+            updated_at,
+            sqlite_where=is_active == true(),
+        ).ddl_if(dialect="sqlite"),
+        db.Index(
+            "ix_users_active_feed",
+            created_at.desc(),
+            id.desc(),
+            postgresql_include=["name", "email", "updated_at"],
+            postgresql_where=is_active == true(),
+        ).ddl_if(dialect="postgresql"),
     )
 
     def __repr__(self) -> str:
@@ -49,14 +73,22 @@ class User(db.Model):
         }
 
     # Утилиты для поиска
+    @classmethod
+    def active(cls):
+        """
+        Условие «только активные» в том же виде, что и WHERE частичного
+        индекса (is_active = 1 / = true): иначе планировщик его не выберет.
+        """
+        return cls.is_active == true()
+
     @classmethod
     def find_by_id(cls, user_id: int) -> "User | None":
         """Найти пользователя по ID (только активных)."""
-        return cls.query.filter_by(id=user_id, is_active=True).first()
+        return cls.query.filter(cls.id == user_id, cls.active()).first()
 
     @classmethod
     def find_by_email(cls, email: str) -> "User | None":
         """Найти пользователя по email (только активных)."""
         return (
-            cls.query.filter_by(email=email.lower().strip(), is_active=True).first()
+            cls.query.filter(cls.email == email.lower().strip(), cls.active()).first()
         )
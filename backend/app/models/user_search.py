@@ -0,0 +1,136 @@
+"""
+Индекс полнотекстового (подстрочного) поиска по пользователям.
+
+SQLite: FTS5-таблица users_fts с токенизатором trigram поверх users
+(external content), синхронизируемая триггерами. В индекс попадают только
+активные записи, поэтому мягкое удаление убирает пользователя из поиска.
+
+PostgreSQL: GIN-индексы pg_trgm по name и email — их использует обычный
+ILIKE '%term%', ранжирование через similarity().
+"""
+import sqlalchemy as sa
+from sqlalchemy import event
+
+from app.models.user import User
+
+FTS_TABLE = "users_fts"
+
+# Trigram-индекс не умеет искать подстроки короче трёх символов
+FTS_MIN_TERM_LENGTH = 3
+
+# Лёгкое описание виртуальной таблицы для построения запросов
+# (в metadata не регистрируется, create_all её не трогает)
+users_fts = sa.table(
+    FTS_TABLE,
+    sa.column("rowid", sa.Integer),
+    sa.column(FTS_TABLE),
+    sa.column("rank"),
+)
+
+SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, email,
+        content='users', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users
+    WHEN new.is_active BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, email)
+        VALUES (new.id, new.name, new.email);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users
+    WHEN old.is_active BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, email)
+        VALUES ('delete', old.id, old.name, old.email);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS users_fts_au
+    AFTER UPDATE OF name, email, is_active ON users BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, email)
+        SELECT 'delete', old.id, old.name, old.email WHERE old.is_active;
+        INSERT INTO {FTS_TABLE}(rowid, name, email)
+        SELECT new.id, new.name, new.email WHERE new.is_active;
+    END
+    """,
+]
+
+SQLITE_POPULATE = f"""
+    INSERT INTO {FTS_TABLE}(rowid, name, email)
+    SELECT id, name, email FROM users WHERE is_active
+"""
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS users_fts_au",
+    "DROP TRIGGER IF EXISTS users_fts_ad",
+    "DROP TRIGGER IF EXISTS users_fts_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_name_trgm "
+    "ON users USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_users_email_trgm "
+    "ON users USING gin (email gin_trgm_ops)",
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS ix_users_email_trgm",
+    "DROP INDEX IF EXISTS ix_users_name_trgm",
+]
+
+
+def install_search_index(connection) -> None:
+    """Создать поисковый индекс (идемпотентно) и заполнить его при создании."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (FTS_TABLE,),
+        ).first()
+        for statement in SQLITE_DDL:
+            connection.exec_driver_sql(statement)
+        if not exists:
+            connection.exec_driver_sql(SQLITE_POPULATE)
+    elif dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            connection.exec_driver_sql(statement)
+
+
+def uninstall_search_index(connection) -> None:
+    """Удалить поисковый индекс."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        statements = SQLITE_DROP
+    elif dialect == "postgresql":
+        statements = POSTGRES_DROP
+    else:
+        return
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def normalize_term(search: str | None) -> str:
+    """Схлопнуть пробелы в поисковом запросе."""
+    return " ".join((search or "").split())
+
+
+def fts_phrase(term: str) -> str:
+    """Экранировать запрос как фразу FTS5 (поиск подстроки, без операторов)."""
+    return '"' + term.replace('"', '""') + '"'
+
+
+@event.listens_for(User.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    install_search_index(connection)
+
+
+@event.listens_for(User.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    uninstall_search_index(connection)
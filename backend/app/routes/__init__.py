@@ -1,3 +1,3 @@
-from . import users
+from . import metrics, system, users, users_async
 
-__all__ = ["users"]
+__all__ = ["metrics", "system", "users", "users_async"]
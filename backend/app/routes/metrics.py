@@ -0,0 +1,16 @@
+from flask import Blueprint, Response
+
+from app.utils.metrics import render_metrics
+
+# Blueprint (без префикса: Prometheus по умолчанию опрашивает /metrics)
+bp = Blueprint('metrics', __name__)
+
+
+@bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """GET /metrics — метрики в текстовом формате Prometheus"""
+    return Response(
+        render_metrics(),
+        mimetype='text/plain',
+        headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+    )
@@ -0,0 +1,38 @@
+from flask import Blueprint, current_app, jsonify
+
+from app.extensions import async_db, db
+from app.utils.db_pool import pool_stats
+from app.utils.db_routing import replica_keys, routing_stats
+
+# Blueprint
+bp = Blueprint('system', __name__, url_prefix='/api/system')
+
+
+@bp.route('/pool', methods=['GET'])
+def get_pool_stats():
+    """GET /api/system/pool — занятость пулов соединений и время ожидания"""
+    data = {
+        (bind_key or 'default'): pool_stats(engine)
+        for bind_key, engine in db.engines.items()
+    }
+    if current_app.config['ASYNC_MODE']:
+        data['async'] = pool_stats(async_db.pool_engine(current_app).sync_engine)
+
+    return jsonify({
+        'success': True,
+        'data': data
+    }), 200
+
+
+@bp.route('/replicas', methods=['GET'])
+def get_replica_stats():
+    """GET /api/system/replicas — реплики и распределение чтений"""
+    return jsonify({
+        'success': True,
+        'data': {
+            'replicas': replica_keys(db.engines),
+            'read_your_writes_seconds':
+                current_app.config['REPLICA_READ_YOUR_WRITES_SECONDS'],
+            'reads': routing_stats.to_dict()
+        }
+    }), 200
@@ -1,46 +1,302 @@
-from flask import Blueprint, request, jsonify
+import csv
+import io
+
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    request,
+    stream_with_context,
+)
 from marshmallow import ValidationError
 from app.services.user_service import UserService
 from app.schemas.user_schema import (
     UserSchema,
     UserCreateSchema,
     UserUpdateSchema,
-    PaginationSchema
+    PaginationSchema,
+    UserFieldsSchema,
+    LookupSchema,
+    ChangesSchema,
+    BulkUpdateSchema,
+    BulkDeleteSchema,
+    ExportSchema,
+    ImportSchema
+)
+from app.schemas.validators import validate_many
+from app.schemas.fast_user import (
+    USER_FIELDS,
+    row_serializer,
+    select_fields,
+    serialize_rows,
+)
+from app.services.event_broker import get_event_broker
+from app.services.import_service import UserImporter, detect_format
+from app.services.user_cache import get_user_cache
+from app.utils import fastjson
+from app.utils.exceptions import AppException, ValidationException
+from app.utils.fastjson import json_response
+from app.utils.helpers import (
+    as_utc,
+    body_etag,
+    compute_etag,
+    is_not_modified,
+    not_modified,
+    set_validators,
+    user_etag,
 )
-from app.utils.exceptions import AppException
 
 # Blueprint
 bp = Blueprint('users', __name__, url_prefix='/api/users')
 
 # Схемы
 user_schema = UserSchema()
-users_schema = UserSchema(many=True)
 user_create_schema = UserCreateSchema()
 user_update_schema = UserUpdateSchema()
 pagination_schema = PaginationSchema()
+user_fields_schema = UserFieldsSchema()
+lookup_schema = LookupSchema()
+changes_schema = ChangesSchema()
+bulk_update_schema = BulkUpdateSchema()
+bulk_delete_schema = BulkDeleteSchema()
+export_schema = ExportSchema()
+import_schema = ImportSchema()
+
+# Поля выгрузки (в том же порядке и формате, что и UserSchema)
+EXPORT_FIELDS = USER_FIELDS
+EXPORT_FLUSH_ROWS = 500
+
+
+def load_lookup(data):
+    """Параметры пакетного получения (ids, fields) с ограничением USERS_LOOKUP_MAX_IDS."""
+    params = lookup_schema.load(data)
+    max_ids = current_app.config['USERS_LOOKUP_MAX_IDS']
+    if len(params['ids']) > max_ids:
+        raise ValidationException(f'Слишком много ID в запросе (максимум {max_ids})')
+    return params
+
+
+def lookup_response(params, users, missing):
+    """Ответ пакетного получения: пользователи в порядке ids и отсутствующие ID."""
+    fields = params.get('field_names')
+    return json_response({
+        'success': True,
+        'data': [select_fields(user, fields) for user in users] if fields else users,
+        'metadata': {
+            'requested': len(params['ids']),
+            'found': len(users),
+            'missing': missing
+        }
+    })
+
+
+def uses_list_version(params) -> bool:
+    """
+    ETag списка по версии выборки (count, max(updated_at), max(id)) — только
+    когда total всё равно считается: агрегат заменяет COUNT. Без total
+    (with_total=false, keyset по умолчанию) версия была бы лишним O(N)-запросом,
+    и ETag считается по телу страницы (list_response).
+    """
+    if not current_app.config['USERS_LIST_ETAG']:
+        return False
+    keyset = 'cursor' in params or 'limit' in params
+    return params.get('with_total', not keyset)
+
+
+def list_response(payload, etag):
+    """Ответ списка; без версии выборки ETag — хэш тела (и 304 по нему)."""
+    response = json_response(payload)
+    if etag is None and current_app.config['USERS_LIST_ETAG']:
+        etag = body_etag(response.get_data())
+        if is_not_modified(etag):
+            return not_modified(etag)
+    return set_validators(response, etag)
 
 
 @bp.route('', methods=['GET'])
 def get_users():
     """
     GET /api/users
-    Query params: page, per_page, search
+    Query params: page, per_page, search, with_total
+    Keyset-режим: cursor, limit (вместо page/per_page)
+    Пакетное получение: ids=1,2,3 (и fields) — см. lookup_users
     """
     try:
+        if 'ids' in request.args:
+            params = load_lookup(request.args)
+            return lookup_response(params, *UserService.get_users_data(params['ids']))
+
         # Валидация параметров
         params = pagination_schema.load(request.args)
+        # Sparse fieldset: только запрошенные колонки в SELECT и в ответе
+        fields = params.get('field_names', USER_FIELDS)
+
+        # Версия выборки: If-None-Match проверяем до загрузки и сериализации
+        etag = known_total = None
+        if uses_list_version(params):
+            version, strategy = UserService.get_list_version(params.get('search'))
+            etag = compute_etag(
+                'users', sorted(request.args.items(multi=True)), *version
+            )
+            if is_not_modified(etag):
+                return not_modified(etag)
+            known_total = (version[0], strategy)
 
         # Получаем данные
-        users, metadata = UserService.get_all_users(
-            page=params['page'],
-            per_page=params['per_page'],
-            search=params.get('search')
-        )
+        if 'cursor' in params or 'limit' in params:
+            users, metadata = UserService.get_users_by_cursor(
+                cursor=params.get('cursor'),
+                limit=params.get('limit', params['per_page']),
+                search=params.get('search'),
+                with_total=params.get('with_total', False),
+                known_total=known_total,
+                fields=fields
+            )
+        else:
+            users, metadata = UserService.get_all_users(
+                page=params['page'],
+                per_page=params['per_page'],
+                search=params.get('search'),
+                with_total=params.get('with_total', True),
+                known_total=known_total,
+                fields=fields
+            )
+
+        return list_response({
+            'success': True,
+            'data': serialize_rows(users, fields),
+            'metadata': metadata
+        }, etag)
 
+    except ValidationError as e:
         return jsonify({
+            'success': False,
+            'error': 'Ошибка валидации параметров',
+            'details': e.messages
+        }), 400
+    except AppException as e:
+        return jsonify(e.to_dict()), e.status_code
+
+
+@bp.route('/lookup', methods=['POST'])
+def lookup_users():
+    """
+    POST /api/users/lookup
+    Тело: {"ids": [1, 2, 3], "fields": "id,name"} — для списков ID, не влезающих в URL
+    Порядок data совпадает с ids (без повторов); отсутствующие и
+    удалённые ID — в metadata.missing.
+    """
+    try:
+        params = load_lookup(request.get_json(silent=True) or {})
+        return lookup_response(params, *UserService.get_users_data(params['ids']))
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Ошибка валидации',
+            'details': e.messages
+        }), 400
+    except AppException as e:
+        return jsonify(e.to_dict()), e.status_code
+
+
+@bp.route('/changes', methods=['GET'])
+def get_changes():
+    """
+    GET /api/users/changes?since=<cursor | ISO 8601>&limit=N
+    Изменения после since: data — созданные и изменённые пользователи,
+    deleted — ID мягко удалённых. metadata.cursor — since следующего опроса.
+    """
+    try:
+        params = changes_schema.load(request.args)
+        rows, metadata = UserService.get_changes(
+            since=params.get('since'),
+            limit=params['limit']
+        )
+
+        return json_response({
             'success': True,
-            'data': users_schema.dump(users),
+            'data': serialize_rows(row for row in rows if row.is_active),
+            'deleted': [row.id for row in rows if not row.is_active],
             'metadata': metadata
+        })
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Ошибка валидации параметров',
+            'details': e.messages
+        }), 400
+    except AppException as e:
+        return jsonify(e.to_dict()), e.status_code
+
+
+@bp.route('/stream', methods=['GET'])
+def stream_users():
+    """
+    GET /api/users/stream — Server-Sent Events: user.created, user.updated,
+    user.deleted, users.changed (пакетные операции) и reset (догрузить
+    изменения через /changes). Last-Event-ID — продолжить после разрыва.
+
+    Под WSGI открытый поток занимает поток сервера; тысячи подписчиков —
+    через ASGI-точку входа asgi.py, где этот путь обслуживается в event loop.
+    """
+    broker = get_event_broker()
+    if broker is None:
+        return jsonify({
+            'success': False,
+            'error': 'Поток изменений отключён'
+        }), 404
+
+    try:
+        subscription = broker.subscribe(request.headers.get('Last-Event-ID'))
+    except AppException as e:
+        return jsonify(e.to_dict()), e.status_code
+
+    response = Response(
+        subscription.iter_chunks(broker.keepalive),
+        mimetype='text/event-stream'
+    )
+    # Подписка снимается и тогда, когда тело так и не начали читать
+    response.call_on_close(subscription.close)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@bp.route('/import', methods=['POST'])
+def import_users():
+    """
+    POST /api/users/import
+    Тело: файл (multipart, поле file) или сырой CSV/NDJSON
+    Query params: format, on_duplicate (skip | update | fail), chunk_size
+    """
+    try:
+        params = import_schema.load(request.args)
+
+        upload = request.files.get('file')
+        if upload is not None:
+            raw, filename = upload.stream, upload.filename
+        else:
+            raw, filename = io.BufferedReader(request.stream), None
+
+        fmt = params.get('format') or detect_format(
+            filename,
+            default='csv' if request.mimetype == 'text/csv' else 'ndjson'
+        )
+
+        importer = UserImporter(
+            chunk_size=params['chunk_size'],
+            on_duplicate=params['on_duplicate']
+        )
+        stream = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+        stats = importer.run(stream, fmt)
+
+        return jsonify({
+            'success': True,
+            'message': 'Импорт завершён',
+            'data': stats.to_dict()
         }), 200
 
     except ValidationError as e:
@@ -53,20 +309,113 @@ def get_users():
         return jsonify(e.to_dict()), e.status_code
 
 
+@bp.route('/export', methods=['GET'])
+def export_users():
+    """
+    GET /api/users/export
+    Query params: format (ndjson | csv), search
+    """
+    try:
+        params = export_schema.load(request.args)
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Ошибка валидации параметров',
+            'details': e.messages
+        }), 400
+
+    rows = UserService.iter_users_for_export(search=params.get('search'))
+
+    if params['format'] == 'csv':
+        body, mimetype, ext = _export_csv(rows), 'text/csv', 'csv'
+    else:
+        body, mimetype, ext = _export_ndjson(rows), 'application/x-ndjson', 'ndjson'
+
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=users.{ext}'
+    # Не буферизовать ответ на reverse-proxy (nginx)
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _export_ndjson(rows):
+    serializer = row_serializer(EXPORT_FIELDS)
+    rows = iter(rows)
+    # Первая строка уходит сразу после выборки, дальше — по EXPORT_FLUSH_ROWS
+    first = next(rows, None)
+    if first is None:
+        return
+    yield fastjson.dumps(serializer(first)) + b'\n'
+
+    chunk = []
+    for row in rows:
+        chunk.append(fastjson.dumps(serializer(row)))
+        if len(chunk) >= EXPORT_FLUSH_ROWS:
+            yield b'\n'.join(chunk) + b'\n'
+            chunk = []
+    if chunk:
+        yield b'\n'.join(chunk) + b'\n'
+
+
+def _export_csv(rows):
+    serializer = row_serializer(EXPORT_FIELDS)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    # Заголовок уходит сразу, ещё до первого запроса к БД
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    for row in rows:
+        writer.writerow(serializer(row))
+        pending += 1
+        if pending >= EXPORT_FLUSH_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+
 @bp.route('/<int:user_id>', methods=['GET'])
 def get_user(user_id):
     """GET /api/users/<int:user_id>"""
     try:
-        user = UserService.get_user_by_id(user_id)
-        return jsonify({
+        fields = user_fields_schema.load(request.args).get('field_names')
+        data = UserService.get_user_data(user_id)
+        etag = user_etag(data['id'], data['updated_at'], fields)
+        last_modified = as_utc(data['updated_at'])
+        if is_not_modified(etag, last_modified):
+            return not_modified(etag, last_modified)
+
+        response = json_response({
             'success': True,
-            'data': user_schema.dump(user)
-        }), 200
+            'data': select_fields(data, fields) if fields else data
+        })
+        return set_validators(response, etag, last_modified)
 
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Ошибка валидации параметров',
+            'details': e.messages
+        }), 400
     except AppException as e:
         return jsonify(e.to_dict()), e.status_code
 
 
+@bp.route('/cache/stats', methods=['GET'])
+def user_cache_stats():
+    """GET /api/users/cache/stats — счётчики кэша пользователей"""
+    return jsonify({
+        'success': True,
+        'data': get_user_cache().stats()
+    }), 200
+
+
 @bp.route('', methods=['POST'])
 def create_user():
     """POST /api/users"""
@@ -96,6 +445,121 @@ def create_user():
         return jsonify(e.to_dict()), e.status_code
 
 
+@bp.route('/bulk', methods=['POST'])
+def bulk_create_users():
+    """
+    POST /api/users/bulk
+    Тело: [{"name": ..., "email": ...}, ...] или {"users": [...]}
+    """
+    try:
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload = payload.get('users')
+        if not isinstance(payload, list):
+            raise ValidationException('Ожидается массив пользователей')
+
+        max_items = current_app.config['USERS_BULK_MAX_ITEMS']
+        if len(payload) > max_items:
+            raise ValidationException(
+                f'Слишком много пользователей в пакете (максимум {max_items})'
+            )
+
+        # Валидация всего пакета за один проход
+        errors = validate_many(payload)
+        valid = [
+            (index, item) for index, item in enumerate(payload)
+            if index not in errors
+        ]
+
+        created = UserService.bulk_create_users([item for _, item in valid])
+
+        results = [None] * len(payload)
+        for index, item_errors in errors.items():
+            results[index] = {
+                'index': index,
+                'status': 'invalid',
+                'details': item_errors
+            }
+        for (index, _), result in zip(valid, created):
+            results[index] = {'index': index, **result}
+
+        summary = {'created': 0, 'conflict': 0, 'invalid': 0}
+        for result in results:
+            summary[result['status']] += 1
+
+        return jsonify({
+            'success': True,
+            'data': results,
+            'metadata': {'total': len(payload), **summary}
+        }), 200
+
+    except AppException as e:
+        return jsonify(e.to_dict()), e.status_code
+
+
+def bulk_change_response(params, results):
+    """Ответ пакетного обновления / удаления: результат по каждому ID и сводка."""
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return jsonify({
+        'success': True,
+        'data': results,
+        'metadata': {'total': len(results), 'dry_run': params['dry_run'], **summary}
+    }), 200
+
+
+@bp.route('', methods=['PATCH'])
+def bulk_update_users():
+    """
+    PATCH /api/users
+    Тело: {"ids": [1, 2] | "search": "...", "changes": {"name": ...}, "dry_run": false}
+    """
+    try:
+        params = bulk_update_schema.load(request.get_json(silent=True) or {})
+        results = UserService.bulk_update_users(
+            params['changes'],
+            ids=params.get('ids'),
+            search=params.get('search'),
+            dry_run=params['dry_run']
+        )
+        return bulk_change_response(params, results)
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Ошибка валидации',
+            'details': e.messages
+        }), 400
+    except AppException as e:
+        return jsonify(e.to_dict()), e.status_code
+
+
+@bp.route('', methods=['DELETE'])
+def bulk_delete_users():
+    """
+    DELETE /api/users (мягкое удаление)
+    Тело: {"ids": [1, 2] | "search": "...", "dry_run": false}
+    """
+    try:
+        params = bulk_delete_schema.load(request.get_json(silent=True) or {})
+        results = UserService.bulk_delete_users(
+            ids=params.get('ids'),
+            search=params.get('search'),
+            dry_run=params['dry_run']
+        )
+        return bulk_change_response(params, results)
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Ошибка валидации',
+            'details': e.messages
+        }), 400
+    except AppException as e:
+        return jsonify(e.to_dict()), e.status_code
+
+
 @bp.route('/<int:user_id>', methods=['PUT'])
 def update_user(user_id):
     """PUT /api/users/<id>"""
@@ -108,13 +572,20 @@ def update_user(user_id):
                 'error': 'Нет данных для обновления'
             }), 400
 
-        user = UserService.update_user(user_id, **data)
+        # If-Match: обновляем, только если клиент видел текущую версию
+        if_match = None
+        if request.if_match and not request.if_match.star_tag:
+            if_match = request.if_match.as_set()
 
-        return jsonify({
+        user = UserService.update_user(user_id, if_match=if_match, **data)
+
+        response = jsonify({
             'success': True,
             'message': 'Пользователь обновлён',
             'data': user_schema.dump(user)
-        }), 200
+        })
+        response.set_etag(user_etag(user.id, user.updated_at))
+        return response, 200
 
     except ValidationError as e:
         return jsonify({
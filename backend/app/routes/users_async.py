@@ -0,0 +1,201 @@
+"""
+Async-версии основных эндпоинтов /api/users (ASYNC_MODE).
+
+Регистрируются перед синхронным blueprint и перекрывают его правила;
+импорт, экспорт и пакетные операции остаются синхронными.
+Ответы совпадают с app.routes.users.
+"""
+from flask import Blueprint, current_app, jsonify, request
+from marshmallow import ValidationError
+
+from app.routes.users import (
+    list_response,
+    load_lookup,
+    lookup_response,
+    pagination_schema,
+    user_create_schema,
+    user_fields_schema,
+    user_schema,
+    user_update_schema,
+    uses_list_version,
+)
+from app.schemas.fast_user import USER_FIELDS, select_fields, serialize_rows
+from app.services.async_user_service import AsyncUserService
+from app.utils.exceptions import AppException
+from app.utils.fastjson import json_response
+from app.utils.helpers import (
+    as_utc,
+    compute_etag,
+    is_not_modified,
+    not_modified,
+    set_validators,
+    user_etag,
+)
+
+# Blueprint
+bp = Blueprint('users_async', __name__, url_prefix='/api/users')
+
+
+@bp.route('', methods=['GET'])
+async def get_users():
+    """GET /api/users (см. app.routes.users.get_users)"""
+    try:
+        if 'ids' in request.args:
+            params = load_lookup(request.args)
+            users, missing = await AsyncUserService.get_users_data(params['ids'])
+            return lookup_response(params, users, missing)
+
+        params = pagination_schema.load(request.args)
+        fields = params.get('field_names', USER_FIELDS)
+
+        etag = known_total = None
+        if uses_list_version(params):
+            version, strategy = await AsyncUserService.get_list_version(
+                params.get('search')
+            )
+            etag = compute_etag(
+                'users', sorted(request.args.items(multi=True)), *version
+            )
+            if is_not_modified(etag):
+                return not_modified(etag)
+            known_total = (version[0], strategy)
+
+        if 'cursor' in params or 'limit' in params:
+            users, metadata = await AsyncUserService.get_users_by_cursor(
+                cursor=params.get('cursor'),
+                limit=params.get('limit', params['per_page']),
+                search=params.get('search'),
+                with_total=params.get('with_total', False),
+                known_total=known_total,
+                fields=fields
+            )
+        else:
+            users, metadata = await AsyncUserService.get_all_users(
+                page=params['page'],
+                per_page=params['per_page'],
+                search=params.get('search'),
+                with_total=params.get('with_total', True),
+                known_total=known_total,
+                fields=fields
+            )
+
+        return list_response({
+            'success': True,
+            'data': serialize_rows(users, fields),
+            'metadata': metadata
+        }, etag)
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Ошибка валидации параметров',
+            'details': e.messages
+        }), 400
+    except AppException as e:
+        return jsonify(e.to_dict()), e.status_code
+
+
+@bp.route('/<int:user_id>', methods=['GET'])
+async def get_user(user_id):
+    """GET /api/users/<int:user_id>"""
+    try:
+        fields = user_fields_schema.load(request.args).get('field_names')
+        data = await AsyncUserService.get_user_data(user_id)
+        etag = user_etag(data['id'], data['updated_at'], fields)
+        last_modified = as_utc(data['updated_at'])
+        if is_not_modified(etag, last_modified):
+            return not_modified(etag, last_modified)
+
+        response = json_response({
+            'success': True,
+            'data': select_fields(data, fields) if fields else data
+        })
+        return set_validators(response, etag, last_modified)
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Ошибка валидации параметров',
+            'details': e.messages
+        }), 400
+    except AppException as e:
+        return jsonify(e.to_dict()), e.status_code
+
+
+@bp.route('', methods=['POST'])
+async def create_user():
+    """POST /api/users"""
+    try:
+        data = user_create_schema.load(request.get_json())
+
+        user = await AsyncUserService.create_user(
+            name=data['name'],
+            email=data['email']
+        )
+
+        return jsonify({
+            'success': True,
+            'message': 'Пользователь успешно создан',
+            'data': user_schema.dump(user)
+        }), 201
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Ошибка валидации',
+            'details': e.messages
+        }), 400
+    except AppException as e:
+        return jsonify(e.to_dict()), e.status_code
+
+
+@bp.route('/<int:user_id>', methods=['PUT'])
+async def update_user(user_id):
+    """PUT /api/users/<id>"""
+    try:
+        data = user_update_schema.load(request.get_json() or {})
+
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'Нет данных для обновления'
+            }), 400
+
+        if_match = None
+        if request.if_match and not request.if_match.star_tag:
+            if_match = request.if_match.as_set()
+
+        user = await AsyncUserService.update_user(user_id, if_match=if_match, **data)
+
+        response = jsonify({
+            'success': True,
+            'message': 'Пользователь обновлён',
+            'data': user_schema.dump(user)
+        })
+        response.set_etag(user_etag(user.id, user.updated_at))
+        return response, 200
+
+    except ValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': 'Ошибка валидации',
+            'details': e.messages
+        }), 400
+    except AppException as e:
+        return jsonify(e.to_dict()), e.status_code
+
+
+@bp.route('/<int:user_id>', methods=['DELETE'])
+async def delete_user(user_id):
+    """DELETE /api/users/<id>?soft=true"""
+    try:
+        soft = request.args.get('soft', 'true').lower() == 'true'
+        await AsyncUserService.delete_user(user_id, soft_delete=soft)
+
+        return jsonify({
+            'success': True,
+            'message': 'Пользователь удалён'
+        }), 200
+
+    except AppException as e:
+        return jsonify(e.to_dict()), e.status_code
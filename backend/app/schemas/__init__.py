@@ -3,6 +3,13 @@ from .user_schema import (
     UserCreateSchema,
     UserUpdateSchema,
     PaginationSchema,
+    UserFieldsSchema,
+    LookupSchema,
+    ChangesSchema,
+    BulkUpdateSchema,
+    BulkDeleteSchema,
+    ExportSchema,
+    ImportSchema,
 )
 
 __all__ = [
@@ -10,4 +17,11 @@ __all__ = [
     "UserCreateSchema",
     "UserUpdateSchema",
     "PaginationSchema",
+    "UserFieldsSchema",
+    "LookupSchema",
+    "ChangesSchema",
+    "BulkUpdateSchema",
+    "BulkDeleteSchema",
+    "ExportSchema",
+    "ImportSchema",
 ]
@@ -0,0 +1,80 @@
+"""
+Быстрая сериализация пользователей для горячих путей чтения.
+
+Вместо ORM-объектов и UserSchema.dump работает с кортежами колонок из
+Core select(): для набора полей заранее собирается функция, которая
+превращает строку в dict той же формы, что выдаёт UserSchema.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+from app.models.user import User
+from app.utils.metrics import serialize_timer
+
+# Поля UserSchema в порядке объявления
+USER_FIELDS = ("id", "name", "email", "created_at", "updated_at", "is_active")
+
+DATETIME_FIELDS = frozenset({"created_at", "updated_at"})
+
+# Ключ сортировки ленты: нужен курсору, даже если клиент его не запросил
+FEED_KEY_FIELDS = ("created_at", "id")
+
+RowSerializer = Callable[[Sequence[Any]], Dict[str, Any]]
+
+_serializers: Dict[tuple, RowSerializer] = {}
+
+
+def user_columns(fields: Sequence[str] = USER_FIELDS) -> list:
+    """Колонки таблицы users для Core select() в порядке полей."""
+    table = User.__table__
+    return [table.c[name] for name in fields]
+
+
+def feed_columns(fields: Sequence[str] = USER_FIELDS) -> list:
+    """
+    Колонки запроса ленты: запрошенные поля, затем недостающие поля ключа
+    сортировки. Сериализатор берёт только первые len(fields) значений строки.
+    """
+    extra = tuple(name for name in FEED_KEY_FIELDS if name not in fields)
+    return user_columns(tuple(fields) + extra)
+
+
+def select_fields(payload: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """Подмножество полей уже сериализованного пользователя (payload UserSchema)."""
+    return {name: payload[name] for name in fields}
+
+
+def row_serializer(fields: Sequence[str] = USER_FIELDS) -> RowSerializer:
+    """Собрать (и закэшировать) сериализатор строки для набора полей."""
+    fields = tuple(fields)
+    serializer = _serializers.get(fields)
+    if serializer is not None:
+        return serializer
+
+    datetime_positions = tuple(
+        i for i, name in enumerate(fields) if name in DATETIME_FIELDS
+    )
+
+    if not datetime_positions:
+        def serializer(row):
+            return dict(zip(fields, row))
+    else:
+        def serializer(row):
+            values = list(row)
+            for i in datetime_positions:
+                value = values[i]
+                if value is not None:
+                    values[i] = value.isoformat()
+            return dict(zip(fields, values))
+
+    _serializers[fields] = serializer
+    return serializer
+
+
+def serialize_rows(
+        rows: Iterable[Sequence[Any]],
+        fields: Sequence[str] = USER_FIELDS,
+) -> List[Dict[str, Any]]:
+    """Сериализовать строки Core select() в список dict формы UserSchema."""
+    serializer = row_serializer(fields)
+    with serialize_timer():
+        return [serializer(row) for row in rows]
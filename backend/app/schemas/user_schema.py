@@ -1,6 +1,79 @@
-import re
+from marshmallow import (
+    Schema,
+    fields,
+    validate,
+    validates,
+    validates_schema,
+    ValidationError,
+)
 
-from marshmallow import Schema, fields, validate, validates, ValidationError
+from app.schemas import validators
+from app.schemas.fast_user import USER_FIELDS
+from app.utils.pagination import decode_change_cursor, decode_cursor
+
+
+class CursorField(fields.Field):
+    """Непрозрачный токен курсора -> объект Cursor."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if not isinstance(value, str) or not value:
+            raise ValidationError("Некорректный курсор")
+        try:
+            return decode_cursor(value)
+        except ValueError as e:
+            raise ValidationError(str(e)) from e
+
+
+class ChangeCursorField(fields.Field):
+    """Курсор изменений (токен из предыдущего ответа) или момент ISO 8601 -> ChangeCursor."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if not isinstance(value, str) or not value:
+            raise ValidationError("Некорректный курсор изменений")
+        try:
+            return decode_change_cursor(value)
+        except ValueError as e:
+            raise ValidationError(str(e)) from e
+
+
+class FieldsField(fields.Field):
+    """Список полей через запятую (?fields=id,name) -> кортеж в порядке USER_FIELDS."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if not isinstance(value, str):
+            raise ValidationError("Некорректный список полей")
+        requested = {name.strip() for name in value.split(",") if name.strip()}
+        if not requested:
+            raise ValidationError("Укажите хотя бы одно поле")
+        unknown = requested.difference(USER_FIELDS)
+        if unknown:
+            raise ValidationError(
+                f"Неизвестные поля: {', '.join(sorted(unknown))}. "
+                f"Допустимые: {', '.join(USER_FIELDS)}"
+            )
+        return tuple(name for name in USER_FIELDS if name in requested)
+
+
+class IdListField(fields.Field):
+    """Список ID: JSON-массив или строка через запятую (?ids=1,2,3); без повторов."""
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, str):
+            value = [item.strip() for item in value.split(",") if item.strip()]
+        if not isinstance(value, list) or not value:
+            raise ValidationError("Ожидается непустой список ID")
+        ids = {}
+        for item in value:
+            if isinstance(item, bool):
+                raise ValidationError(f"Некорректный ID: {item!r}")
+            try:
+                user_id = int(item)
+            except (TypeError, ValueError):
+                raise ValidationError(f"Некорректный ID: {item!r}")
+            if user_id < 1:
+                raise ValidationError(f"Некорректный ID: {item!r}")
+            ids.setdefault(user_id, None)
+        return list(ids)
 
 
 class UserSchema(Schema):
@@ -31,23 +104,12 @@ class UserSchema(Schema):
     @validates("name")
     def validate_name(self, value: str):
         """Валидация имени (только буквы, пробелы и дефисы)."""
-        if not re.match(r"^[а-яА-ЯёЁa-zA-Z\s\-]{2,100}$", value.strip()):
-            raise ValidationError(
-                "Имя может содержать только буквы, пробелы и дефисы",
-            )
+        validators.validate_name(value)
 
     @validates("email")
     def validate_email(self, value: str):
         """Дополнительная валидация email (отсечение временных доменов)."""
-        disposable_domains = [
-            "tempmail.com",
-            "10minutemail.com",
-            "guerrillamail.com",
-            "maildrop.cc",
-        ]
-        domain = value.split("@")[1].lower()
-        if domain in disposable_domains:
-            raise ValidationError("Временные email адреса не разрешены")
+        validators.validate_email_domain(value)
 
 
 class UserCreateSchema(Schema):
@@ -73,22 +135,11 @@ class UserCreateSchema(Schema):
 
     @validates("name")
     def validate_name(self, value: str):
-        if not re.match(r"^[а-яА-ЯёЁa-zA-Z\s\-]{2,100}$", value.strip()):
-            raise ValidationError(
-                "Имя может содержать только буквы, пробелы и дефисы",
-            )
+        validators.validate_name(value)
 
     @validates("email")
     def validate_email(self, value: str):
-        disposable_domains = [
-            "tempmail.com",
-            "10minutemail.com",
-            "guerrillamail.com",
-            "maildrop.cc",
-        ]
-        domain = value.split("@")[1].lower()
-        if domain in disposable_domains:
-            raise ValidationError("Временные email адреса не разрешены")
+        validators.validate_email_domain(value)
 
 
 class UserUpdateSchema(Schema):
@@ -112,10 +163,8 @@ class UserUpdateSchema(Schema):
 
     @validates("name")
     def validate_name(self, value: str):
-        if value and not re.match(r"^[а-яА-ЯёЁa-zA-Z\s\-]{2,100}$", value.strip()):
-            raise ValidationError(
-                "Имя может содержать только буквы, пробелы и дефисы",
-            )
+        if value:
+            validators.validate_name(value)
 
 
 class PaginationSchema(Schema):
@@ -137,3 +186,119 @@ class PaginationSchema(Schema):
         ),
     )
     search = fields.Str(allow_none=True)
+    # with_total=false — не считать total (has_next по лишней записи)
+    with_total = fields.Bool()
+
+    # Sparse fieldset: ?fields=id,name (по умолчанию все поля UserSchema)
+    field_names = FieldsField(data_key="fields")
+
+    # Keyset-пагинация: ?cursor=<token>&limit=N (первая страница — только limit)
+    cursor = CursorField()
+    limit = fields.Int(
+        validate=validate.Range(
+            min=1,
+            max=100,
+            error="Размер страницы должен быть от 1 до 100",
+        ),
+    )
+
+
+class UserFieldsSchema(Schema):
+    """Параметры GET /api/users/<id>."""
+
+    field_names = FieldsField(data_key="fields")
+
+
+class LookupSchema(Schema):
+    """Пакетное получение пользователей: GET /api/users?ids=... и POST /api/users/lookup."""
+
+    ids = IdListField(required=True)
+    field_names = FieldsField(data_key="fields")
+
+
+class ChangesSchema(Schema):
+    """Параметры GET /api/users/changes (без since — с начала журнала)."""
+
+    since = ChangeCursorField()
+    limit = fields.Int(
+        load_default=100,
+        validate=validate.Range(
+            min=1,
+            max=1000,
+            error="Размер страницы должен быть от 1 до 1000",
+        ),
+    )
+
+
+class BulkDeleteSchema(Schema):
+    """
+    Пакетное мягкое удаление (DELETE /api/users): список ID или поисковый
+    фильтр (как search в списке); dry_run — только посчитать совпадения.
+    """
+
+    ids = IdListField()
+    search = fields.Str()
+    dry_run = fields.Bool(load_default=False)
+
+    @validates("search")
+    def validate_search(self, value: str):
+        if not value.strip():
+            raise ValidationError("Пустой фильтр выбрал бы всех пользователей")
+
+    @validates_schema
+    def validate_target(self, data, **kwargs):
+        if ("ids" in data) == ("search" in data):
+            raise ValidationError("Укажите либо ids, либо search")
+
+
+class BulkUpdateSchema(BulkDeleteSchema):
+    """
+    Пакетное обновление (PATCH /api/users): выборка как у BulkDeleteSchema
+    и changes. Email уникален, поэтому пакетно меняется только имя.
+    """
+
+    changes = fields.Nested(UserUpdateSchema(only=("name",)), required=True)
+
+    @validates("changes")
+    def validate_changes(self, value: dict):
+        if not value:
+            raise ValidationError("Нет данных для обновления")
+
+
+class ExportSchema(Schema):
+    """Схема для параметров выгрузки пользователей."""
+
+    format = fields.Str(
+        load_default="ndjson",
+        validate=validate.OneOf(
+            ["ndjson", "csv"],
+            error="Формат выгрузки: ndjson или csv",
+        ),
+    )
+    search = fields.Str(allow_none=True)
+
+
+class ImportSchema(Schema):
+    """Схема для параметров импорта пользователей."""
+
+    format = fields.Str(
+        validate=validate.OneOf(
+            ["ndjson", "csv"],
+            error="Формат импорта: ndjson или csv",
+        ),
+    )
+    on_duplicate = fields.Str(
+        load_default="skip",
+        validate=validate.OneOf(
+            ["skip", "update", "fail"],
+            error="Политика дубликатов: skip, update или fail",
+        ),
+    )
+    chunk_size = fields.Int(
+        load_default=1000,
+        validate=validate.Range(
+            min=1,
+            max=10000,
+            error="Размер чанка должен быть от 1 до 10000",
+        ),
+    )
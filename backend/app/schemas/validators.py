@@ -0,0 +1,192 @@
+"""
+Общие правила валидации пользователей.
+
+Паттерны скомпилированы один раз, список временных доменов хранится во
+множестве и может загружаться из файла. validate_many() проверяет пакет
+записей без marshmallow и без исключений на каждую запись, выдавая те же
+сообщения, что UserCreateSchema / UserUpdateSchema.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+from flask import Flask
+from marshmallow import ValidationError
+from marshmallow.validate import Email
+
+NAME_PATTERN = re.compile(r"^[а-яА-ЯёЁa-zA-Z\s\-]{2,100}$")
+
+NAME_MIN_LENGTH = 2
+NAME_MAX_LENGTH = 100
+EMAIL_MAX_LENGTH = 120
+
+NAME_LENGTH_ERROR = "Имя должно быть от 2 до 100 символов"
+NAME_ERROR = "Имя может содержать только буквы, пробелы и дефисы"
+EMAIL_LENGTH_ERROR = "Email слишком длинный"
+DISPOSABLE_EMAIL_ERROR = "Временные email адреса не разрешены"
+
+# Стандартные сообщения marshmallow (для совпадения с ошибками схем)
+INVALID_INPUT_ERROR = "Invalid input type."
+UNKNOWN_FIELD_ERROR = "Unknown field."
+REQUIRED_ERROR = "Missing data for required field."
+NULL_ERROR = "Field may not be null."
+INVALID_STRING_ERROR = "Not a valid string."
+INVALID_EMAIL_ERROR = Email.default_message
+
+DEFAULT_DISPOSABLE_DOMAINS = (
+    "tempmail.com",
+    "10minutemail.com",
+    "guerrillamail.com",
+    "maildrop.cc",
+)
+
+
+class DomainBlocklist:
+    """Множество запрещённых (временных) почтовых доменов."""
+
+    def __init__(self, domains: Iterable[str] = DEFAULT_DISPOSABLE_DOMAINS):
+        self._domains = frozenset(
+            domain.strip().lower() for domain in domains if domain.strip()
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "DomainBlocklist":
+        """Загрузить домены из файла: по одному в строке, # — комментарий."""
+        with open(path, encoding="utf-8") as f:
+            return cls(line.split("#", 1)[0] for line in f)
+
+    def is_blocked(self, email: str) -> bool:
+        return email.rpartition("@")[2].lower() in self._domains
+
+    def __contains__(self, domain: str) -> bool:
+        return domain.lower() in self._domains
+
+    def __len__(self) -> int:
+        return len(self._domains)
+
+
+_blocklist = DomainBlocklist()
+
+
+def get_blocklist() -> DomainBlocklist:
+    return _blocklist
+
+
+def set_blocklist(blocklist: DomainBlocklist) -> None:
+    global _blocklist
+    _blocklist = blocklist
+
+
+def init_validators(app: Flask) -> None:
+    """Загрузить список временных доменов из DISPOSABLE_DOMAINS_FILE (если задан)."""
+    path = app.config.get("DISPOSABLE_DOMAINS_FILE")
+    set_blocklist(DomainBlocklist.from_file(path) if path else DomainBlocklist())
+
+
+# Проверки отдельных полей (для @validates в схемах)
+
+def validate_name(value: str) -> None:
+    """Имя: только буквы, пробелы и дефисы."""
+    if not NAME_PATTERN.match(value.strip()):
+        raise ValidationError(NAME_ERROR)
+
+
+def validate_email_domain(value: str) -> None:
+    """Email: отсечение временных доменов."""
+    if _blocklist.is_blocked(value):
+        raise ValidationError(DISPOSABLE_EMAIL_ERROR)
+
+
+def is_valid_email(value: str) -> bool:
+    """Формат email по тем же правилам, что marshmallow.validate.Email."""
+    if not value or "@" not in value:
+        return False
+
+    user_part, domain_part = value.rsplit("@", 1)
+    if not Email.USER_REGEX.match(user_part):
+        return False
+
+    if domain_part in Email.DOMAIN_WHITELIST or Email.DOMAIN_REGEX.match(domain_part):
+        return True
+    try:
+        domain_part = domain_part.encode("idna").decode("ascii")
+    except UnicodeError:
+        return False
+    return bool(Email.DOMAIN_REGEX.match(domain_part))
+
+
+# Пакетная проверка
+
+def _name_errors(value: str) -> List[str]:
+    if not NAME_MIN_LENGTH <= len(value) <= NAME_MAX_LENGTH:
+        return [NAME_LENGTH_ERROR]
+    if not NAME_PATTERN.match(value.strip()):
+        return [NAME_ERROR]
+    return []
+
+
+def _email_format_errors(value: str) -> List[str]:
+    errors = []
+    if not is_valid_email(value):
+        errors.append(INVALID_EMAIL_ERROR)
+    if len(value) > EMAIL_MAX_LENGTH:
+        errors.append(EMAIL_LENGTH_ERROR)
+    return errors
+
+
+def _email_errors(value: str) -> List[str]:
+    errors = _email_format_errors(value)
+    if not errors and _blocklist.is_blocked(value):
+        errors.append(DISPOSABLE_EMAIL_ERROR)
+    return errors
+
+
+_FIELD_CHECKS = {"name": _name_errors, "email": _email_errors}
+# Частичная проверка (как UserUpdateSchema) временные домены не отсекает
+_PARTIAL_FIELD_CHECKS = {"name": _name_errors, "email": _email_format_errors}
+
+# Сообщение о неверном типе у fields.Str и fields.Email различается
+_TYPE_ERRORS = {"name": INVALID_STRING_ERROR, "email": INVALID_EMAIL_ERROR}
+
+
+def validate_record(record: Any, partial: bool = False) -> Optional[Dict[str, List[str]]]:
+    """Проверить одну запись; вернуть ошибки по полям или None."""
+    if not isinstance(record, dict):
+        return {"_schema": [INVALID_INPUT_ERROR]}
+
+    errors: Dict[str, List[str]] = {}
+    for key in record:
+        if key not in _FIELD_CHECKS:
+            errors[key] = [UNKNOWN_FIELD_ERROR]
+
+    checks = _PARTIAL_FIELD_CHECKS if partial else _FIELD_CHECKS
+    for name, check in checks.items():
+        if name not in record:
+            if not partial:
+                errors[name] = [REQUIRED_ERROR]
+            continue
+        value = record[name]
+        if value is None:
+            errors[name] = [NULL_ERROR]
+        elif not isinstance(value, str):
+            errors[name] = [_TYPE_ERRORS[name]]
+        else:
+            field_errors = check(value)
+            if field_errors:
+                errors[name] = field_errors
+
+    return errors or None
+
+
+def validate_many(records: Iterable[Any], partial: bool = False) -> Dict[int, Dict[str, List[str]]]:
+    """
+    Проверить пакет записей пользователя.
+
+    Возвращает {индекс: ошибки} только для невалидных записей — в том же
+    формате, что Schema(many=True).validate().
+    """
+    errors: Dict[int, Dict[str, List[str]]] = {}
+    for index, record in enumerate(records):
+        record_errors = validate_record(record, partial=partial)
+        if record_errors:
+            errors[index] = record_errors
+    return errors
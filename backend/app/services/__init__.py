@@ -1,3 +1,4 @@
 from .user_service import UserService
+from .async_user_service import AsyncUserService
 
-__all__ = ["UserService"]
+__all__ = ["UserService", "AsyncUserService"]
@@ -0,0 +1,312 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.extensions import async_db, db
+from app.models.user import User
+from app.models.user_search import normalize_term
+from app.schemas.fast_user import USER_FIELDS
+from app.services.user_cache import get_user_cache
+from app.services.user_service import (
+    COUNT_CACHED,
+    COUNT_EXACT,
+    COUNT_SKIPPED,
+    UserService,
+    _user_schema,
+)
+from app.utils.cache import MISSING
+from app.utils.db_routing import is_pinned_to_primary, pin_to_primary
+from app.utils.pagination import Cursor
+from app.utils.exceptions import (
+    NotFoundException,
+    ConflictException,
+    DatabaseException,
+)
+
+
+class AsyncUserService:
+    """
+    Async-двойник UserService (ASYNC_MODE).
+
+    Запросы строятся теми же функциями UserService и выполняются через
+    AsyncSession, поэтому ответы обоих режимов совпадают. Кэши (total,
+    пользователи) общие с синхронным сервисом.
+
+    Чтения идут через async_db.read_session() — реплики и окно
+    read-your-writes как у read_replica(); записи открывают окно клиенту.
+    Групповая фиксация (USERS_WRITE_BATCHING) к async-записям не применяется:
+    WriteBatcher выполняет операции в своём потоке через db.session, а каждая
+    async-запись фиксируется в своей AsyncSession.
+    """
+
+    @staticmethod
+    async def get_all_users(
+            page: int = 1,
+            per_page: int = 20,
+            search: Optional[str] = None,
+            with_total: bool = True,
+            known_total: Optional[Tuple[int, str]] = None,
+            fields: Tuple[str, ...] = USER_FIELDS,
+    ) -> Tuple[List[Row], Dict[str, Any]]:
+        """Страница пользователей (см. UserService.get_all_users)."""
+        try:
+            async with async_db.read_session() as session:
+                result = await session.execute(
+                    UserService._page_query(page, per_page, search, fields)
+                )
+                rows = result.all()
+                total, strategy = await AsyncUserService._count_users(
+                    session, search, with_total, known_total
+                )
+            return UserService._page_result(rows, page, per_page, total, strategy)
+
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Ошибка при получении пользователей: {str(e)}")
+
+    @staticmethod
+    async def get_users_by_cursor(
+            cursor: Optional[Cursor] = None,
+            limit: int = 20,
+            search: Optional[str] = None,
+            with_total: bool = False,
+            known_total: Optional[Tuple[int, str]] = None,
+            fields: Tuple[str, ...] = USER_FIELDS,
+    ) -> Tuple[List[Row], Dict[str, Any]]:
+        """Keyset-пагинация (см. UserService.get_users_by_cursor)."""
+        try:
+            async with async_db.read_session() as session:
+                result = await session.execute(
+                    UserService._cursor_query(cursor, limit, search, fields)
+                )
+                users, metadata = UserService._cursor_result(
+                    result.all(), cursor, limit
+                )
+                if with_total:
+                    total, strategy = await AsyncUserService._count_users(
+                        session, search, True, known_total
+                    )
+                    metadata["total"] = total
+                    metadata["count_strategy"] = strategy
+            return users, metadata
+
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Ошибка при получении пользователей: {str(e)}")
+
+    @staticmethod
+    async def _count_users(
+            session,
+            search: Optional[str],
+            with_total: bool,
+            known_total: Optional[Tuple[int, str]] = None,
+    ) -> Tuple[Optional[int], str]:
+        if not with_total:
+            return None, COUNT_SKIPPED
+        if known_total is not None:
+            return known_total
+
+        key = normalize_term(search).lower()
+        total = UserService._cached_count(key)
+        if total is not MISSING:
+            return total, COUNT_CACHED
+
+        total = await session.scalar(UserService._count_query(search))
+        UserService._store_count(key, total)
+        return total, COUNT_EXACT
+
+    @staticmethod
+    async def get_list_version(
+            search: Optional[str] = None,
+    ) -> Tuple[Tuple[int, Optional[str], Optional[int]], str]:
+        """Версия выборки списка для ETag (см. UserService.get_list_version)."""
+        key = ("version", normalize_term(search).lower())
+        version = UserService._cached_count(key)
+        if version is not MISSING:
+            return version, COUNT_CACHED
+
+        try:
+            async with async_db.read_session() as session:
+                result = await session.execute(UserService._version_query(search))
+                row = result.one()
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Ошибка при получении пользователей: {str(e)}")
+
+        version = UserService._version_from_row(row)
+        UserService._store_count(key, version)
+        return version, COUNT_EXACT
+
+    @staticmethod
+    async def _find_active(session, **filters) -> Optional[User]:
+        """Аналог User.find_by_id / find_by_email для AsyncSession."""
+        return await session.scalar(
+            db.select(User).where(User.active()).filter_by(**filters).limit(1)
+        )
+
+    @staticmethod
+    async def _get_active_user(session, user_id: int) -> User:
+        user = await AsyncUserService._find_active(session, id=user_id)
+        if not user:
+            raise NotFoundException(f"Пользователь с ID {user_id} не найден")
+        return user
+
+    @staticmethod
+    async def get_user_by_id(user_id: int) -> User:
+        """Получить пользователя по ID."""
+        try:
+            async with async_db.read_session() as session:
+                return await AsyncUserService._get_active_user(session, user_id)
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Ошибка при получении пользователя: {str(e)}")
+
+    @staticmethod
+    async def get_user_data(user_id: int) -> Dict[str, Any]:
+        """Сериализованный пользователь через read-through кэш (см. UserService.get_user_data)."""
+        cache = get_user_cache()
+        if is_pinned_to_primary():
+            found, payload = False, None
+        else:
+            found, payload = cache.get(user_id)
+        if not found:
+            version = cache.version(user_id)
+            try:
+                async with async_db.read_session() as session:
+                    user = await AsyncUserService._find_active(session, id=user_id)
+            except SQLAlchemyError as e:
+                raise DatabaseException(f"Ошибка при получении пользователя: {str(e)}")
+            if user is None:
+                cache.set_missing(user_id, version)
+            else:
+                payload = _user_schema.dump(user)
+                cache.set(user_id, payload, version)
+
+        if payload is None:
+            raise NotFoundException(f"Пользователь с ID {user_id} не найден")
+        return payload
+
+    @staticmethod
+    async def get_users_data(
+            user_ids: List[int],
+    ) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """Пакетное получение по ID (см. UserService.get_users_data)."""
+        payloads, misses, versions = UserService._cached_users(user_ids)
+        if misses:
+            try:
+                async with async_db.read_session() as session:
+                    rows = []
+                    for stmt in UserService._lookup_queries(misses):
+                        rows.extend((await session.execute(stmt)).all())
+            except SQLAlchemyError as e:
+                raise DatabaseException(f"Ошибка при получении пользователей: {str(e)}")
+            payloads.update(UserService._store_lookup(misses, rows, versions))
+        return UserService._lookup_result(user_ids, payloads)
+
+    @staticmethod
+    async def create_user(name: str, email: str) -> User:
+        """Создать нового пользователя (см. UserService.create_user)."""
+        name = name.strip()
+        email = email.strip().lower()
+
+        async with async_db.session() as session:
+            try:
+                if UserService.write_returning(async_db.engine.dialect):
+                    # Занятый email — IntegrityError уникального индекса
+                    user = (await session.scalars(
+                        UserService._insert_query(name, email)
+                    )).one()
+                else:
+                    existing = await AsyncUserService._find_active(session, email=email)
+                    if existing:
+                        raise ConflictException(
+                            f"Пользователь с email {email} уже существует",
+                        )
+                    user = User(name=name, email=email, is_active=True)
+                    session.add(user)
+                await session.commit()
+
+            except IntegrityError:
+                await session.rollback()
+                raise ConflictException(f"Email {email} уже используется")
+            except SQLAlchemyError as e:
+                await session.rollback()
+                raise DatabaseException(f"Ошибка создания пользователя: {str(e)}")
+
+        pin_to_primary()
+        UserService.invalidate_counts()
+        get_user_cache().invalidate(user.id)
+        UserService._publish_user("user.created", user)
+        return user
+
+    @staticmethod
+    async def update_user(
+            user_id: int,
+            if_match: Optional[Set[str]] = None,
+            **kwargs,
+    ) -> User:
+        """Обновить пользователя (см. UserService.update_user)."""
+        values = UserService._update_values(kwargs)
+        async with async_db.session() as session:
+            try:
+                if values and UserService.write_returning(async_db.engine.dialect):
+                    updated_at = None
+                    if if_match is not None:
+                        updated_at = await session.scalar(
+                            UserService._user_version_query(user_id)
+                        )
+                        if updated_at is None:
+                            raise NotFoundException(f"Пользователь с ID {user_id} не найден")
+                        UserService._check_version(user_id, updated_at, if_match)
+
+                    user = (await session.scalars(
+                        UserService._update_query(user_id, values, updated_at)
+                    )).first()
+                    if user is None:
+                        raise UserService._update_miss(user_id, updated_at)
+                else:
+                    user = await AsyncUserService._get_active_user(session, user_id)
+                    UserService._check_version(user.id, user.updated_at, if_match)
+                    for key, value in values.items():
+                        setattr(user, key, value)
+
+                await session.commit()
+
+            except IntegrityError:
+                await session.rollback()
+                raise ConflictException("Email уже используется другим пользователем")
+            except SQLAlchemyError as e:
+                await session.rollback()
+                raise DatabaseException(f"Ошибка обновления: {str(e)}")
+
+        pin_to_primary()
+        UserService.invalidate_counts()
+        get_user_cache().invalidate(user_id)
+        if values:
+            UserService._publish_user("user.updated", user)
+        return user
+
+    @staticmethod
+    async def delete_user(user_id: int, soft_delete: bool = True) -> None:
+        """Удалить пользователя (мягкое или жёсткое удаление)."""
+        async with async_db.session() as session:
+            try:
+                if UserService.write_returning(async_db.engine.dialect):
+                    deleted = await session.scalar(
+                        UserService._delete_query(user_id, soft_delete)
+                    )
+                    if deleted is None:
+                        raise NotFoundException(f"Пользователь с ID {user_id} не найден")
+                else:
+                    user = await AsyncUserService._get_active_user(session, user_id)
+                    if soft_delete:
+                        user.is_active = False
+                    else:
+                        await session.delete(user)
+                await session.commit()
+
+            except SQLAlchemyError as e:
+                await session.rollback()
+                raise DatabaseException(f"Ошибка удаления: {str(e)}")
+
+        pin_to_primary()
+        UserService.invalidate_counts()
+        get_user_cache().invalidate(user_id)
+        UserService._publish("user.deleted", {"id": user_id})
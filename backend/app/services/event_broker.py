@@ -0,0 +1,198 @@
+"""
+Pub/sub изменений пользователей для потока SSE (GET /api/users/stream).
+
+UserService после COMMIT публикует события (user.created / user.updated /
+user.deleted, для пакетных операций — users.changed со списком ID). Событие
+один раз сериализуется в кадр SSE и дописывается в общий журнал; подписчик
+читает журнал со своей позиции. Его очередь — кадры между позицией и концом
+журнала, не больше USERS_STREAM_QUEUE_SIZE: медленный подписчик не тормозит
+публикацию, а при переполнении его поток закрывается (disconnect) или
+теряет старые события и получает reset (drop). Публикация не перебирает
+подписчиков — только будит ожидающих (один вызов на event loop ASGI).
+
+Журнал хранит последние USERS_STREAM_REPLAY_SIZE кадров: клиент,
+переподключившийся с Last-Event-ID, получает пропущенное. Если нужного
+события в журнале уже нет (или ID из другого процесса / до перезапуска),
+приходит reset — клиент догружает изменения через GET /api/users/changes.
+
+Брокер живёт в процессе: при нескольких воркерах каждый видит только свои
+записи.
+"""
+import secrets
+import threading
+from collections import deque
+from itertools import islice
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Set
+
+from flask import Flask, current_app
+
+from app.utils import fastjson
+from app.utils.exceptions import ServiceUnavailableException
+
+OVERFLOW_DISCONNECT = "disconnect"
+OVERFLOW_DROP = "drop"
+
+# Комментарий SSE: держит соединение и выявляет отключившихся клиентов
+KEEPALIVE = b": keepalive\n\n"
+
+
+class Subscription:
+    """
+    Позиция подписчика в журнале брокера.
+
+    notify вызывается из потока публикующего после каждого события; без
+    notify подписка ждёт на своём threading.Event (iter_chunks для WSGI).
+    """
+
+    def __init__(self, broker: "EventBroker", notify: Optional[Callable[[], None]]):
+        self._broker = broker
+        self._wakeup = None if notify is not None else threading.Event()
+        self.notify = notify or self._wakeup.set
+        self._pending: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def drain(self) -> List[bytes]:
+        """
+        Забрать кадры после своей позиции. Больше USERS_STREAM_QUEUE_SIZE —
+        переполнение: при disconnect подписка закрывается (клиент
+        переподключится и получит reset), при drop — reset и последние
+        QUEUE_SIZE кадров.
+        """
+        broker = self._broker
+        with broker._lock:
+            chunks, self._pending = self._pending, []
+            backlog = broker._seq - self.position
+            if backlog > broker.queue_size:
+                if broker.overflow != OVERFLOW_DROP:
+                    broker._close(self)
+                    return chunks
+                chunks.append(broker._reset_chunk("overflow"))
+                backlog = broker.queue_size
+            if backlog:
+                chunks.extend(islice(broker._log, len(broker._log) - backlog, None))
+            self.position = broker._seq
+        return chunks
+
+    def close(self) -> None:
+        with self._broker._lock:
+            self._broker._close(self)
+
+    def iter_chunks(self, keepalive: float) -> Iterator[bytes]:
+        """Тело ответа WSGI: блокирует поток до событий, раз в keepalive — комментарий."""
+        try:
+            while True:
+                chunks = self.drain()
+                if chunks:
+                    yield b"".join(chunks)
+                if self.closed:
+                    return
+                if not self._wakeup.wait(keepalive):
+                    yield KEEPALIVE
+                self._wakeup.clear()
+        finally:
+            self.close()
+
+
+class EventBroker:
+    """Журнал событий, подписки и их пробуждение."""
+
+    def __init__(self, app: Flask):
+        self.queue_size = app.config["USERS_STREAM_QUEUE_SIZE"]
+        self.overflow = app.config["USERS_STREAM_OVERFLOW"]
+        self.max_subscribers = app.config["USERS_STREAM_MAX_SUBSCRIBERS"]
+        self.keepalive = app.config["USERS_STREAM_KEEPALIVE_S"]
+        self.retry_ms = app.config["USERS_STREAM_RETRY_MS"]
+        self.replay_size = app.config["USERS_STREAM_REPLAY_SIZE"]
+        # ID событий — "<epoch>-<номер>": номер из другого процесса или до
+        # перезапуска не спутать с текущим
+        self.epoch = secrets.token_hex(4)
+        self._seq = 0
+        # Журнал покрывает и очередь подписчика, и Last-Event-ID
+        self._log: Deque[bytes] = deque(maxlen=max(self.replay_size, self.queue_size))
+        self._subscribers: Set[Subscription] = set()
+        # notify -> число подписок: ASGI-подписки одного loop делят один notify
+        self._listeners: Dict[Callable[[], None], int] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, event: str, data) -> None:
+        """Дописать событие в журнал и разбудить подписчиков."""
+        body = fastjson.dumps(data)
+        with self._lock:
+            self._seq += 1
+            self._log.append(b"id: %s\nevent: %s\ndata: %s\n\n" % (
+                self._event_id(self._seq).encode(), event.encode(), body
+            ))
+            listeners = list(self._listeners)
+        for notify in listeners:
+            notify()
+
+    def subscribe(
+            self,
+            last_event_id: Optional[str] = None,
+            notify: Optional[Callable[[], None]] = None,
+    ) -> Subscription:
+        """
+        Новая подписка. Первые кадры — retry и пропущенные после last_event_id
+        события (или reset, если их уже нет в журнале); без last_event_id —
+        ID текущего события, с которого клиент продолжит после переподключения.
+        """
+        subscription = Subscription(self, notify)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise ServiceUnavailableException("Слишком много подписчиков потока")
+            subscription._pending.append(b"retry: %d\n\n" % self.retry_ms)
+            subscription.position = self._seq
+            if last_event_id is None:
+                subscription._pending.append(b"id: %s\n\n" % self._event_id(self._seq).encode())
+            else:
+                position = self._resume_position(last_event_id)
+                if position is None:
+                    subscription._pending.append(self._reset_chunk("gap"))
+                else:
+                    subscription.position = position
+            self._subscribers.add(subscription)
+            self._listeners[subscription.notify] = self._listeners.get(subscription.notify, 0) + 1
+        return subscription
+
+    def _close(self, subscription: Subscription) -> None:
+        """Снять подписку (под блокировкой)."""
+        subscription.closed = True
+        if subscription not in self._subscribers:
+            return
+        self._subscribers.discard(subscription)
+        left = self._listeners.pop(subscription.notify) - 1
+        if left:
+            self._listeners[subscription.notify] = left
+
+    def _resume_position(self, last_event_id: str) -> Optional[int]:
+        """Номер события last_event_id, если с него можно продолжить, иначе None."""
+        epoch, _, seq = last_event_id.strip().partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        # Все события после seq должны быть в журнале и в очереди подписчика
+        missed = self._seq - seq
+        if missed < 0 or missed > min(self.replay_size, self.queue_size):
+            return None
+        return seq
+
+    def _event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def _reset_chunk(self, reason: str) -> bytes:
+        # ID текущего события: после reset клиент продолжает с него
+        return b'id: %s\nevent: reset\ndata: {"reason":"%s"}\n\n' % (
+            self._event_id(self._seq).encode(), reason.encode()
+        )
+
+
+def init_event_broker(app: Flask) -> None:
+    """Включить поток изменений (USERS_STREAM_ENABLED)."""
+    if app.config["USERS_STREAM_ENABLED"]:
+        app.extensions["event_broker"] = EventBroker(app)
+
+
+def get_event_broker() -> Optional[EventBroker]:
+    """EventBroker текущего приложения или None (поток выключен)."""
+    return current_app.extensions.get("event_broker")
@@ -0,0 +1,239 @@
+import csv
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.schemas.validators import validate_many
+from app.services.user_service import UserService
+from app.utils.exceptions import (
+    ConflictException,
+    DatabaseException,
+    ValidationException,
+)
+
+FORMATS = ("csv", "ndjson")
+
+ON_DUPLICATE_SKIP = "skip"
+ON_DUPLICATE_UPDATE = "update"
+ON_DUPLICATE_FAIL = "fail"
+ON_DUPLICATE_POLICIES = (ON_DUPLICATE_SKIP, ON_DUPLICATE_UPDATE, ON_DUPLICATE_FAIL)
+
+# Сколько ошибок валидации сохранять в отчёте
+MAX_REPORTED_ERRORS = 100
+
+IMPORT_FIELDS = ("name", "email")
+
+
+@dataclass
+class ImportStats:
+    """Счётчики импорта (сохраняются в чекпоинт вместе с позицией)."""
+
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def detect_format(filename: Optional[str], default: str = "ndjson") -> str:
+    """Определить формат по расширению файла."""
+    if filename:
+        ext = os.path.splitext(filename)[1].lower()
+        if ext == ".csv":
+            return "csv"
+        if ext in (".ndjson", ".jsonl"):
+            return "ndjson"
+    return default
+
+
+class UserImporter:
+    """
+    Потоковый импорт пользователей из CSV/NDJSON.
+
+    Файл читается построчно, строки валидируются по правилам UserCreateSchema
+    (validate_many) и записываются чанками (по транзакции на чанк) без
+    ORM-объектов, так что сессия не растёт с размером файла. После каждого чанка позиция
+    сохраняется в чекпоинт, и прерванный импорт можно продолжить.
+    """
+
+    def __init__(
+            self,
+            chunk_size: int = 1000,
+            on_duplicate: str = ON_DUPLICATE_SKIP,
+            checkpoint_path: Optional[str] = None,
+            progress: Optional[Callable[[int, ImportStats], None]] = None,
+    ):
+        if on_duplicate not in ON_DUPLICATE_POLICIES:
+            raise ValidationException(f"Неизвестная политика дубликатов: {on_duplicate}")
+        if chunk_size < 1:
+            raise ValidationException("Размер чанка должен быть >= 1")
+
+        self.chunk_size = chunk_size
+        self.on_duplicate = on_duplicate
+        self.checkpoint_path = checkpoint_path
+        self.progress = progress
+
+    def run(self, stream: TextIO, fmt: str, source: Optional[str] = None) -> ImportStats:
+        """Импортировать поток; вернуть итоговую статистику."""
+        if fmt not in FORMATS:
+            raise ValidationException(f"Неподдерживаемый формат: {fmt}")
+
+        start_line, stats = self._load_checkpoint(source)
+
+        chunk: List[Tuple[int, Dict[str, Any]]] = []
+        last_line = start_line
+        for line_no, record in self._iter_records(stream, fmt):
+            if line_no <= start_line:
+                continue
+            chunk.append((line_no, record))
+            last_line = line_no
+            if len(chunk) >= self.chunk_size:
+                self._process_chunk(chunk, stats)
+                self._chunk_done(source, last_line, stats)
+                chunk = []
+
+        if chunk:
+            self._process_chunk(chunk, stats)
+            self._chunk_done(source, last_line, stats)
+
+        self._clear_checkpoint()
+        return stats
+
+    # Чтение
+
+    @staticmethod
+    def _iter_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+        if fmt == "csv":
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line_no, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except ValueError:
+                yield line_no, None
+
+    # Запись
+
+    def _process_chunk(
+            self, chunk: List[Tuple[int, Any]], stats: ImportStats
+    ) -> None:
+        records = [
+            {key: record[key] for key in IMPORT_FIELDS if key in record}
+            if isinstance(record, dict) else record
+            for _, record in chunk
+        ]
+        errors = validate_many(records)
+
+        # Повторы email внутри чанка разрешаются так же, как дубликаты в БД:
+        # skip — остаётся первая строка (повтор пропущен), update — последняя
+        # (повтор считается обновлением предыдущей), fail — ошибка.
+        # Каждая строка попадает ровно в один счётчик
+        valid: Dict[str, Tuple[int, str]] = {}
+        for index, (line_no, _) in enumerate(chunk):
+            stats.processed += 1
+            if index in errors:
+                stats.invalid += 1
+                if len(stats.errors) < MAX_REPORTED_ERRORS:
+                    stats.errors.append({"line": line_no, "details": errors[index]})
+                continue
+            email = records[index]["email"].strip().lower()
+            if email in valid:
+                if self.on_duplicate == ON_DUPLICATE_FAIL:
+                    raise ConflictException(
+                        f"Строка {line_no}: email {email} повторяется в файле",
+                        payload={"stats": stats.to_dict()},
+                    )
+                if self.on_duplicate == ON_DUPLICATE_SKIP:
+                    stats.skipped += 1
+                    continue
+                stats.updated += 1
+            valid[email] = (line_no, records[index]["name"].strip())
+
+        if not valid:
+            return
+
+        try:
+            existing = UserService.existing_emails(list(valid))
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseException(f"Ошибка импорта: {str(e)}")
+
+        if existing and self.on_duplicate == ON_DUPLICATE_FAIL:
+            db.session.rollback()
+            email = sorted(existing, key=lambda e: valid[e][0])[0]
+            raise ConflictException(
+                f"Строка {valid[email][0]}: пользователь с email {email} уже существует",
+                payload={"stats": stats.to_dict()},
+            )
+
+        new_items = [
+            {"name": name, "email": email}
+            for email, (_, name) in valid.items()
+            if email not in existing
+        ]
+        # Занятые email уже отсеяны: повторно их bulk_create_users не ищет
+        results = UserService.bulk_create_users(
+            new_items, chunk_size=len(new_items) or 1, check_existing=False
+        )
+        stats.created += sum(1 for r in results if r["status"] == "created")
+        # Конфликты здесь — гонка с параллельной записью
+        raced = {r["email"] for r in results if r["status"] == "conflict"}
+
+        duplicates = existing | raced
+        if self.on_duplicate == ON_DUPLICATE_UPDATE and duplicates:
+            updated_ids = UserService.update_names(
+                {email: valid[email][1] for email in duplicates}
+            )
+            # Мягко удалённые пользователи не восстанавливаются — строка пропущена
+            stats.updated += len(updated_ids)
+            stats.skipped += len(duplicates) - len(updated_ids)
+        else:
+            stats.skipped += len(duplicates)
+
+    # Чекпоинт
+
+    def _load_checkpoint(self, source: Optional[str]) -> Tuple[int, ImportStats]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return 0, ImportStats()
+
+        with open(self.checkpoint_path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("source") != source:
+            return 0, ImportStats()
+        return int(data["line"]), ImportStats(**data["stats"])
+
+    def _chunk_done(self, source: Optional[str], line: int, stats: ImportStats) -> None:
+        self._save_checkpoint(source, line, stats)
+        if self.progress:
+            self.progress(line, stats)
+
+    def _save_checkpoint(self, source: Optional[str], line: int, stats: ImportStats) -> None:
+        if not self.checkpoint_path:
+            return
+
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"source": source, "line": line, "stats": stats.to_dict()},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self) -> None:
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
@@ -0,0 +1,189 @@
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from flask import Flask, current_app
+
+from app.utils.cache import MISSING, CacheBackend, LRUCache, RedisCacheBackend
+from app.utils.db_routing import replica_keys
+
+# Маркер закэшированного 404 (в общем кэше хранится как JSON)
+NOT_FOUND = {"__not_found__": True}
+
+
+class UserCache:
+    """
+    Read-through кэш сериализованных пользователей (payload UserSchema).
+
+    Первый уровень — in-process LRU, второй (опционально) — общий бэкенд,
+    например Redis. Отсутствующие пользователи кэшируются ненадолго.
+
+    Инвалидация видна другим процессам только через общий бэкенд, поэтому
+    при нём локальный уровень хранит записи не дольше local_ttl.
+
+    Заполнение после чтения из БД — compare-and-set по версии: invalidate()
+    записывает в versions метку времени, читатель берёт версию до запроса
+    (version / versions_many) и передаёт её в set / set_missing. Если запись
+    успела инвалидировать ID, устаревший payload в кэш не попадает.
+    С репликами (max_lag — окно read-your-writes) ID, изменённый меньше
+    max_lag секунд назад, не кэшируется: чтение могло прийти с отстающей
+    реплики, и её ответ (в том числе 404 только что созданного) прожил бы TTL.
+    """
+
+    def __init__(
+            self,
+            local: LRUCache,
+            shared: Optional[CacheBackend] = None,
+            ttl: float = 60.0,
+            negative_ttl: float = 5.0,
+            local_ttl: Optional[float] = None,
+            versions: Optional[CacheBackend] = None,
+            max_lag: float = 0.0,
+    ):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_lag = max_lag
+        # Версии живут дольше записей: метка должна пережить чтение из БД
+        self.versions = versions if versions is not None else LRUCache(
+            ttl=max(ttl, max_lag), maxsize=max(local.maxsize, 1)
+        )
+        self._lock = threading.Lock()
+        self.local_ttl = ttl
+        if shared is not None and local_ttl is not None:
+            self.local_ttl = min(ttl, local_ttl)
+
+    def get(self, user_id: int) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Вернуть (найдено_в_кэше, payload); payload None — закэшированный 404."""
+        value = self.local.get(user_id)
+        if value is MISSING and self.shared is not None:
+            value = self.shared.get(user_id)
+            if value is not MISSING:
+                ttl = self.negative_ttl if value == NOT_FOUND else self.ttl
+                self.local.set(user_id, value, ttl=min(ttl, self.local_ttl))
+        if value is MISSING:
+            return False, None
+        if value == NOT_FOUND:
+            return True, None
+        return True, value
+
+    def get_many(self, user_ids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Закэшированные из user_ids: {id: payload или None (404)}; промахов в словаре нет."""
+        cached = {}
+        for user_id in user_ids:
+            found, payload = self.get(user_id)
+            if found:
+                cached[user_id] = payload
+        return cached
+
+    def version(self, user_id: int) -> Any:
+        """Версия ID для последующего set / set_missing (брать до чтения из БД)."""
+        return self.versions.get(user_id)
+
+    def versions_many(self, user_ids: Iterable[int]) -> Dict[int, Any]:
+        return {user_id: self.version(user_id) for user_id in user_ids}
+
+    def set(self, user_id: int, payload: Dict[str, Any], version: Any = MISSING) -> None:
+        self._fill(user_id, payload, self.ttl, version)
+
+    def set_missing(self, user_id: int, version: Any = MISSING) -> None:
+        self._fill(user_id, NOT_FOUND, self.negative_ttl, version)
+
+    def _fill(self, user_id: int, value: Dict[str, Any], ttl: float, version: Any) -> None:
+        if version is not MISSING and time.time() - version < self.max_lag:
+            return
+        ttl_local = min(ttl, self.local_ttl)
+        if self.shared is None:
+            # Проверка версии и запись атомарны (общий lock с invalidate)
+            with self._lock:
+                if self.versions.get(user_id) == version:
+                    self.local.set(user_id, value, ttl=ttl_local)
+            return
+        # Версии в общем бэкенде: между проверкой и записью остаётся окно
+        # в один round trip, а не всё чтение из БД
+        if self.versions.get(user_id) != version:
+            return
+        self.local.set(user_id, value, ttl=ttl_local)
+        self.shared.set(user_id, value, ttl=ttl)
+
+    def invalidate(self, *user_ids: int) -> None:
+        stamp = time.time()
+        for user_id in user_ids:
+            with self._lock:
+                self.versions.set(user_id, stamp)
+                self.local.delete(user_id)
+            if self.shared is not None:
+                self.shared.delete(user_id)
+
+    def invalidate_many(self, user_ids: Iterable[int]) -> None:
+        self.invalidate(*user_ids)
+
+    def clear(self) -> None:
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"local": self.local.stats()}
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        return stats
+
+
+class NullUserCache(UserCache):
+    """Заглушка при выключенном кэше: ничего не хранит."""
+
+    def __init__(self):
+        super().__init__(local=LRUCache(maxsize=0))
+
+    def get(self, user_id: int) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        return False, None
+
+    def set(self, user_id: int, payload: Dict[str, Any], version: Any = MISSING) -> None:
+        pass
+
+    def set_missing(self, user_id: int, version: Any = MISSING) -> None:
+        pass
+
+
+def init_user_cache(app: Flask, shared: Optional[CacheBackend] = None) -> UserCache:
+    """Создать кэш пользователей по конфигурации и сохранить в app.extensions."""
+    config = app.config
+    if not config.get("USER_CACHE_ENABLED", True):
+        cache: UserCache = NullUserCache()
+    else:
+        if shared is None and config.get("USER_CACHE_REDIS_URL"):
+            shared = RedisCacheBackend.from_url(
+                config["USER_CACHE_REDIS_URL"], ttl=config["USER_CACHE_TTL"]
+            )
+        versions = None
+        max_lag = 0.0
+        if replica_keys(config.get("SQLALCHEMY_BINDS") or {}):
+            max_lag = config["REPLICA_READ_YOUR_WRITES_SECONDS"]
+        if isinstance(shared, RedisCacheBackend):
+            # Версии — в том же Redis, чтобы их видели все воркеры
+            versions = RedisCacheBackend(
+                shared.client,
+                prefix=f"{shared.prefix}version:",
+                ttl=max(config["USER_CACHE_TTL"], max_lag),
+            )
+        cache = UserCache(
+            local=LRUCache(
+                ttl=config["USER_CACHE_TTL"],
+                maxsize=config["USER_CACHE_MAXSIZE"],
+            ),
+            shared=shared,
+            ttl=config["USER_CACHE_TTL"],
+            negative_ttl=config["USER_CACHE_NEGATIVE_TTL"],
+            local_ttl=config.get("USER_CACHE_LOCAL_TTL"),
+            versions=versions,
+            max_lag=max_lag,
+        )
+    app.extensions["user_cache"] = cache
+    return cache
+
+
+def get_user_cache() -> UserCache:
+    """Кэш пользователей текущего приложения."""
+    return current_app.extensions["user_cache"]
@@ -1,14 +1,56 @@
-from typing import List, Tuple, Optional, Dict, Any
+import math
+from datetime import datetime, timedelta, UTC
+from typing import List, Tuple, Optional, Dict, Any, Iterator, Set
 
+from flask import current_app
+from sqlalchemy import Row
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.models.user import User
+from app.models.user_search import (
+    FTS_MIN_TERM_LENGTH,
+    fts_phrase,
+    normalize_term,
+    users_fts,
+)
 from app.extensions import db
+from app.schemas.fast_user import (
+    USER_FIELDS,
+    feed_columns,
+    serialize_rows,
+    user_columns,
+)
+from app.schemas.user_schema import UserSchema
+from app.services.event_broker import get_event_broker
+from app.services.user_cache import get_user_cache
+from app.services.write_batcher import get_write_batcher
+from app.utils.cache import MISSING, LRUCache
+from app.utils.db_routing import is_pinned_to_primary, pin_to_primary, read_replica
+from app.utils.pagination import (
+    ChangeCursor,
+    Cursor,
+    DIRECTION_NEXT,
+    DIRECTION_PREV,
+    encode_change_cursor,
+    encode_cursor,
+)
 from app.utils.exceptions import (
     NotFoundException,
     ConflictException,
     DatabaseException,
+    PreconditionFailedException,
+    ValidationException,
 )
+from app.utils.helpers import as_utc, user_etag
+
+# Кэш total по нормализованному поисковому запросу (сбрасывается при записи)
+_count_cache = LRUCache()
+
+_user_schema = UserSchema()
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+COUNT_SKIPPED = "skipped"
 
 
 class UserService:
@@ -19,71 +61,556 @@ class UserService:
             page: int = 1,
             per_page: int = 20,
             search: Optional[str] = None,
-    ) -> Tuple[List[User], Dict[str, Any]]:
+            with_total: bool = True,
+            known_total: Optional[Tuple[int, str]] = None,
+            fields: Tuple[str, ...] = USER_FIELDS,
+    ) -> Tuple[List[Row], Dict[str, Any]]:
         """
         Получить всех пользователей с пагинацией и опциональным поиском.
+        При with_total=False COUNT не выполняется, а has_next определяется
+        по лишней (per_page + 1) записи.
+
+        Возвращает строки Core select() (без ORM identity map): первыми идут
+        колонки fields — для сериализации через app.schemas.fast_user.
         """
         try:
-            query = User.query.filter_by(is_active=True)
-
-            # Поиск по имени или email
-            if search and search.strip():
-                search_pattern = f"%{search.strip()}%"
-                query = query.filter(
-                    db.or_(
-                        User.name.ilike(search_pattern),
-                        User.email.ilike(search_pattern),
-                    )
+            with read_replica():
+                rows = db.session.execute(
+                    UserService._page_query(page, per_page, search, fields)
+                ).all()
+                total, strategy = UserService._count_users(
+                    search, with_total, known_total
                 )
+            return UserService._page_result(rows, page, per_page, total, strategy)
+
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Ошибка при получении пользователей: {str(e)}")
+
+    @staticmethod
+    def get_users_by_cursor(
+            cursor: Optional[Cursor] = None,
+            limit: int = 20,
+            search: Optional[str] = None,
+            with_total: bool = False,
+            known_total: Optional[Tuple[int, str]] = None,
+            fields: Tuple[str, ...] = USER_FIELDS,
+    ) -> Tuple[List[Row], Dict[str, Any]]:
+        """
+        Keyset-пагинация по (created_at, id): вместо OFFSET делаем seek
+        от позиции курсора, поэтому глубина страницы не влияет на стоимость.
+        """
+        try:
+            with read_replica():
+                rows = db.session.execute(
+                    UserService._cursor_query(cursor, limit, search, fields)
+                ).all()
+                users, metadata = UserService._cursor_result(rows, cursor, limit)
+                if with_total:
+                    total, strategy = UserService._count_users(
+                        search, True, known_total
+                    )
+                    metadata["total"] = total
+                    metadata["count_strategy"] = strategy
+
+            return users, metadata
+
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Ошибка при получении пользователей: {str(e)}")
+
+    # Построение запросов списка (общие для UserService и AsyncUserService)
+
+    @staticmethod
+    def _page_query(
+            page: int,
+            per_page: int,
+            search: Optional[str],
+            fields: Tuple[str, ...] = USER_FIELDS,
+    ):
+        """Страница по OFFSET (с лишней записью для has_next)."""
+        stmt = UserService._active_select(
+            *feed_columns(fields), search=search, ranked=True
+        )
+
+        # Сортировка: сначала по релевантности (если есть поиск),
+        # затем по дате создания (новые сверху); пагинация
+        order = [User.created_at.desc(), User.id.desc()]
+        rank = UserService._search_rank(search)
+        if rank is not None:
+            order.insert(0, rank)
+
+        return (
+            stmt.order_by(*order)
+            .limit(per_page + 1)
+            .offset((page - 1) * per_page)
+        )
+
+    @staticmethod
+    def _page_result(
+            rows: List[Row],
+            page: int,
+            per_page: int,
+            total: Optional[int],
+            strategy: str,
+    ) -> Tuple[List[Row], Dict[str, Any]]:
+        metadata: Dict[str, Any] = {
+            "page": page,
+            "per_page": per_page,
+            "total": total,
+            "pages": math.ceil(total / per_page) if total is not None else None,
+            "has_next": len(rows) > per_page,
+            "has_prev": page > 1,
+            "count_strategy": strategy,
+        }
+        return rows[:per_page], metadata
+
+    @staticmethod
+    def _cursor_query(
+            cursor: Optional[Cursor],
+            limit: int,
+            search: Optional[str],
+            fields: Tuple[str, ...] = USER_FIELDS,
+    ):
+        """Seek от позиции курсора (с лишней записью для has_more)."""
+        stmt = UserService._active_select(*feed_columns(fields), search=search)
+
+        backwards = cursor is not None and cursor.direction == DIRECTION_PREV
+
+        if cursor is not None:
+            # Сравнение row value: SQLite и PostgreSQL начинают чтение индекса
+            # ленты прямо с позиции курсора (форма с OR читает диапазон
+            # created_at целиком)
+            position = db.tuple_(User.created_at, User.id)
+            key = (cursor.created_at, cursor.id)
+            seek = position > key if backwards else position < key
+            stmt = stmt.where(seek)
 
-            # Сортировка по дате создания (новые сверху) и пагинация
-            paginated = query.order_by(User.created_at.desc()).paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False,
+        if backwards:
+            order = (User.created_at.asc(), User.id.asc())
+        else:
+            order = (User.created_at.desc(), User.id.desc())
+
+        # Берём на одну запись больше, чтобы узнать, есть ли продолжение
+        return stmt.order_by(*order).limit(limit + 1)
+
+    @staticmethod
+    def _cursor_result(
+            rows: List[Row],
+            cursor: Optional[Cursor],
+            limit: int,
+    ) -> Tuple[List[Row], Dict[str, Any]]:
+        backwards = cursor is not None and cursor.direction == DIRECTION_PREV
+        has_more = len(rows) > limit
+        users = rows[:limit]
+
+        if backwards:
+            users.reverse()
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, cursor is not None
+
+        next_cursor = prev_cursor = None
+        if users and has_next:
+            last = users[-1]
+            next_cursor = encode_cursor(last.created_at, last.id, DIRECTION_NEXT)
+        if users and has_prev:
+            first = users[0]
+            prev_cursor = encode_cursor(first.created_at, first.id, DIRECTION_PREV)
+
+        metadata: Dict[str, Any] = {
+            "limit": limit,
+            "has_next": has_next,
+            "has_prev": has_prev,
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
+        }
+        return users, metadata
+
+    @staticmethod
+    def get_changes(
+            since: Optional[ChangeCursor] = None,
+            limit: int = 100,
+    ) -> Tuple[List[Row], Dict[str, Any]]:
+        """
+        Пользователи, созданные, изменённые или мягко удалённые после since,
+        в порядке (updated_at, id) — включая неактивных (надгробия).
+        Seek по индексу ix_users_updated_at: стоимость — O(изменений).
+
+        Курсор не уходит дальше «горизонта» now - USERS_CHANGES_SETTLE_MS:
+        транзакция могла взять updated_at раньше, а зафиксироваться позже
+        уже отданной строки. Свежие изменения возвращаются и при следующем
+        опросе — клиент применяет их повторно (upsert по id).
+        """
+        try:
+            with read_replica():
+                rows = db.session.execute(UserService._changes_query(since, limit)).all()
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Ошибка при получении изменений: {str(e)}")
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        position = since
+        if has_more:
+            # Полная страница: курсор двигается всегда, иначе опрос зациклится
+            position = ChangeCursor(as_utc(rows[-1].updated_at), rows[-1].id)
+        else:
+            horizon = datetime.now(UTC) - timedelta(
+                milliseconds=current_app.config["USERS_CHANGES_SETTLE_MS"]
             )
+            for row in rows:
+                updated_at = as_utc(row.updated_at)
+                if updated_at > horizon:
+                    break
+                position = ChangeCursor(updated_at, row.id)
 
-            metadata: Dict[str, Any] = {
-                "page": paginated.page,
-                "per_page": paginated.per_page,
-                "total": paginated.total,
-                "pages": paginated.pages,
-                "has_next": paginated.has_next,
-                "has_prev": paginated.has_prev,
-            }
+        metadata: Dict[str, Any] = {
+            "count": len(rows),
+            "has_more": has_more,
+            "cursor": (
+                encode_change_cursor(position.updated_at, position.id)
+                if position is not None else None
+            ),
+        }
+        return rows, metadata
 
-            return list(paginated.items), metadata
+    @staticmethod
+    def _changes_query(since: Optional[ChangeCursor], limit: int):
+        """Seek по (updated_at, id) после since (с лишней записью для has_more)."""
+        stmt = db.select(*user_columns())
+        if since is not None:
+            stmt = stmt.where(
+                db.tuple_(User.updated_at, User.id) > (since.updated_at, since.id)
+            )
+        return stmt.order_by(User.updated_at, User.id).limit(limit + 1)
 
+    @staticmethod
+    def _active_select(*columns, search: Optional[str] = None, ranked: bool = False):
+        """select() по активным пользователям с учётом поиска."""
+        return UserService._apply_search(
+            db.select(*columns).where(User.active()), search, ranked
+        )
+
+    @staticmethod
+    def _count_users(
+            search: Optional[str],
+            with_total: bool,
+            known_total: Optional[Tuple[int, str]] = None,
+    ) -> Tuple[Optional[int], str]:
+        """
+        Посчитать total согласно USERS_COUNT_STRATEGY; вернуть (total, стратегия).
+        known_total — уже известный (total, стратегия), например из get_list_version.
+        """
+        if not with_total:
+            return None, COUNT_SKIPPED
+        if known_total is not None:
+            return known_total
+
+        key = normalize_term(search).lower()
+        total = UserService._cached_count(key)
+        if total is not MISSING:
+            return total, COUNT_CACHED
+
+        total = db.session.scalar(UserService._count_query(search))
+        UserService._store_count(key, total)
+        return total, COUNT_EXACT
+
+    @staticmethod
+    def _count_query(search: Optional[str]):
+        return UserService._active_select(db.func.count(User.id), search=search)
+
+    @staticmethod
+    def _cached_count(key) -> Any:
+        """Значение из кэша total (при стратегии cached) или MISSING."""
+        if current_app.config.get("USERS_COUNT_STRATEGY") != COUNT_CACHED:
+            return MISSING
+        return _count_cache.get(key)
+
+    @staticmethod
+    def _store_count(key, value) -> None:
+        if current_app.config.get("USERS_COUNT_STRATEGY") == COUNT_CACHED:
+            _count_cache.set(
+                key, value, ttl=current_app.config["USERS_COUNT_CACHE_TTL"]
+            )
+
+    @staticmethod
+    def get_list_version(
+            search: Optional[str] = None,
+    ) -> Tuple[Tuple[int, Optional[str], Optional[int]], str]:
+        """
+        Версия выборки списка: (count, max(updated_at), max(id)) одним
+        агрегатным запросом — для ETag без загрузки и сериализации строк.
+        Вторым элементом возвращается стратегия, как у total.
+        """
+        key = ("version", normalize_term(search).lower())
+        version = UserService._cached_count(key)
+        if version is not MISSING:
+            return version, COUNT_CACHED
+
+        try:
+            with read_replica():
+                row = db.session.execute(UserService._version_query(search)).one()
         except SQLAlchemyError as e:
             raise DatabaseException(f"Ошибка при получении пользователей: {str(e)}")
 
+        version = UserService._version_from_row(row)
+        UserService._store_count(key, version)
+        return version, COUNT_EXACT
+
+    @staticmethod
+    def _version_query(search: Optional[str]):
+        return UserService._active_select(
+            db.func.count(User.id),
+            db.func.max(User.updated_at),
+            db.func.max(User.id),
+            search=search,
+        )
+
+    @staticmethod
+    def _version_from_row(row) -> Tuple[int, Optional[str], Optional[int]]:
+        count, max_updated_at, max_id = row
+        return (
+            count,
+            max_updated_at.isoformat() if max_updated_at else None,
+            max_id,
+        )
+
+    @staticmethod
+    def invalidate_counts() -> None:
+        """Сбросить закэшированные total (после любой записи)."""
+        _count_cache.clear()
+
+    @staticmethod
+    def iter_users_for_export(
+            search: Optional[str] = None,
+            batch_size: int = 1000,
+    ) -> Iterator[Any]:
+        """
+        Потоково отдать активных пользователей (строки Core, без ORM-объектов).
+
+        yield_per включает серверный курсор (stream_results), поэтому память
+        не зависит от размера таблицы.
+        """
+        stmt = UserService._active_select(
+            *user_columns(), search=search
+        ).order_by(User.id)
+
+        try:
+            with read_replica():
+                result = db.session.execute(
+                    stmt, execution_options={"yield_per": batch_size}
+                )
+                for partition in result.partitions():
+                    yield from partition
+        except SQLAlchemyError as e:
+            raise DatabaseException(f"Ошибка экспорта пользователей: {str(e)}")
+
+    @staticmethod
+    def _use_fts(term: str) -> bool:
+        """Можно ли искать через FTS5-индекс (SQLite, запрос >= 3 символов)."""
+        return (
+            db.engine.dialect.name == "sqlite"
+            and len(term) >= FTS_MIN_TERM_LENGTH
+        )
+
+    @staticmethod
+    def _apply_search(stmt, search: Optional[str], ranked: bool = False):
+        """
+        Поиск по имени или email (через поисковый индекс, если доступен).
+        ranked=True — с JOIN на users_fts, чтобы сортировать по rank.
+        """
+        term = normalize_term(search)
+        if not term:
+            return stmt
+
+        if UserService._use_fts(term):
+            match = users_fts.c.users_fts.match(fts_phrase(term))
+            if ranked:
+                return stmt.join(users_fts, users_fts.c.rowid == User.id).filter(match)
+            # Без ORDER BY rank планировщик при JOIN перебирает users по
+            # индексу is_active и проверяет MATCH на каждой строке;
+            # IN (подзапрос) заставляет начать с FTS-индекса
+            return stmt.filter(
+                User.id.in_(db.select(users_fts.c.rowid).where(match))
+            )
+
+        # PostgreSQL: ILIKE использует GIN-индексы pg_trgm
+        search_pattern = f"%{term}%"
+        return stmt.filter(
+            db.or_(
+                User.name.ilike(search_pattern),
+                User.email.ilike(search_pattern),
+            )
+        )
+
+    @staticmethod
+    def _search_rank(search: Optional[str]):
+        """Выражение для сортировки по релевантности (или None)."""
+        term = normalize_term(search)
+        if not term:
+            return None
+        if UserService._use_fts(term):
+            # bm25: чем меньше rank, тем релевантнее
+            return users_fts.c.rank.asc()
+        if db.engine.dialect.name == "postgresql":
+            return db.func.greatest(
+                db.func.similarity(User.name, term),
+                db.func.similarity(User.email, term),
+            ).desc()
+        return None
+
     @staticmethod
     def get_user_by_id(user_id: int) -> User:
-        """Получить пользователя по ID."""
+        """Получить пользователя по ID (чтение с реплики)."""
+        with read_replica():
+            return UserService._get_user(user_id)
+
+    @staticmethod
+    def _get_user(user_id: int) -> User:
+        """Пользователь по ID с primary — для последующей записи."""
         user = User.find_by_id(user_id)
         if not user:
             raise NotFoundException(f"Пользователь с ID {user_id} не найден")
         return user
 
+    @staticmethod
+    def get_user_data(user_id: int) -> Dict[str, Any]:
+        """
+        Сериализованный пользователь (payload UserSchema) через read-through кэш.
+        Отсутствующие ID тоже кэшируются (ненадолго).
+
+        Клиент в окне read-your-writes читает мимо кэша с primary (кэш мог
+        заполниться с отстающей реплики), остальные — с реплики.
+        """
+        cache = get_user_cache()
+        if is_pinned_to_primary():
+            found, payload = False, None
+        else:
+            found, payload = cache.get(user_id)
+        if not found:
+            # Версия до чтения: запись, успевшая инвалидировать ID, отменит заполнение
+            version = cache.version(user_id)
+            with read_replica():
+                user = User.find_by_id(user_id)
+            if user is None:
+                cache.set_missing(user_id, version)
+            else:
+                payload = _user_schema.dump(user)
+                cache.set(user_id, payload, version)
+
+        if payload is None:
+            raise NotFoundException(f"Пользователь с ID {user_id} не найден")
+        return payload
+
+    @staticmethod
+    def get_users_data(
+            user_ids: List[int],
+    ) -> Tuple[List[Dict[str, Any]], List[int]]:
+        """
+        Пакетный аналог get_user_data: (payload'ы в порядке user_ids, отсутствующие ID).
+        Сначала кэш пользователей, промахи — IN-запросами по
+        USERS_LOOKUP_CHUNK_SIZE ID; найденные и отсутствующие попадают в кэш.
+        """
+        payloads, misses, versions = UserService._cached_users(user_ids)
+        if misses:
+            try:
+                with read_replica():
+                    rows = [
+                        row
+                        for stmt in UserService._lookup_queries(misses)
+                        for row in db.session.execute(stmt)
+                    ]
+            except SQLAlchemyError as e:
+                raise DatabaseException(f"Ошибка при получении пользователей: {str(e)}")
+            payloads.update(UserService._store_lookup(misses, rows, versions))
+        return UserService._lookup_result(user_ids, payloads)
+
+    # Построение пакетного получения (общие для UserService и AsyncUserService)
+
+    @staticmethod
+    def _cached_users(
+            user_ids: List[int],
+    ) -> Tuple[Dict[int, Optional[Dict[str, Any]]], List[int], Dict[int, Any]]:
+        """
+        Попадания в кэш ({id: payload или None}), ID для запроса к БД и их
+        версии в кэше (для _store_lookup, см. get_user_data).
+        """
+        cache = get_user_cache()
+        # Клиент в окне read-your-writes читает мимо кэша (см. get_user_data)
+        cached = {} if is_pinned_to_primary() else cache.get_many(user_ids)
+        misses = [user_id for user_id in user_ids if user_id not in cached]
+        return cached, misses, cache.versions_many(misses)
+
+    @staticmethod
+    def _lookup_queries(user_ids: List[int]) -> Iterator:
+        chunk_size = current_app.config["USERS_LOOKUP_CHUNK_SIZE"]
+        for start in range(0, len(user_ids), chunk_size):
+            yield UserService._active_select(*user_columns()).where(
+                User.id.in_(user_ids[start:start + chunk_size])
+            )
+
+    @staticmethod
+    def _store_lookup(
+            user_ids: List[int],
+            rows: List[Row],
+            versions: Dict[int, Any],
+    ) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Сериализовать найденные строки и закэшировать результат по каждому ID."""
+        cache = get_user_cache()
+        found = dict(zip((row.id for row in rows), serialize_rows(rows)))
+        for user_id in user_ids:
+            payload = found.get(user_id)
+            if payload is None:
+                cache.set_missing(user_id, versions[user_id])
+            else:
+                cache.set(user_id, payload, versions[user_id])
+        return {user_id: found.get(user_id) for user_id in user_ids}
+
+    @staticmethod
+    def _lookup_result(
+            user_ids: List[int],
+            payloads: Dict[int, Optional[Dict[str, Any]]],
+    ) -> Tuple[List[Dict[str, Any]], List[int]]:
+        data, missing = [], []
+        for user_id in user_ids:
+            payload = payloads.get(user_id)
+            if payload is None:
+                missing.append(user_id)
+            else:
+                data.append(payload)
+        return data, missing
+
     @staticmethod
     def create_user(name: str, email: str) -> User:
-        """Создать нового пользователя."""
+        """
+        Создать нового пользователя.
+        На SQLite 3.35+ / PostgreSQL — один INSERT ... RETURNING (см. write_returning; при USERS_WRITE_BATCHING — в общем
+        с параллельными записями COMMIT), иначе проверка email и INSERT.
+        """
         try:
             # Нормализация
             name = name.strip()
             email = email.strip().lower()
 
-            # Проверка существования
-            existing = User.find_by_email(email)
-            if existing:
-                raise ConflictException(
-                    f"Пользователь с email {email} уже существует",
-                )
+            if UserService.write_returning(db.engine.dialect):
+                user = UserService._write(UserService._create_returning, name, email)
+            else:
+                # Проверка существования (отставание реплики безопасно:
+                # дубликат всё равно отсечёт уникальный индекс)
+                with read_replica():
+                    existing = User.find_by_email(email)
+                if existing:
+                    raise ConflictException(
+                        f"Пользователь с email {email} уже существует",
+                    )
 
-            # Создание
-            user = User(name=name, email=email, is_active=True)
-            db.session.add(user)
-            db.session.commit()
+                # Создание
+                user = User(name=name, email=email, is_active=True)
+                db.session.add(user)
+                db.session.commit()
+
+            UserService.invalidate_counts()
+            # Мог быть закэширован 404 для этого ID
+            get_user_cache().invalidate(user.id)
+            UserService._publish_user("user.created", user)
             return user
 
         except ConflictException:
@@ -96,28 +623,386 @@ class UserService:
             db.session.rollback()
             raise DatabaseException(f"Ошибка создания пользователя: {str(e)}")
 
+    # Запись одним оператором с RETURNING (общие для UserService и AsyncUserService)
+
+    @staticmethod
+    def write_returning(dialect) -> bool:
+        """
+        Писать одним оператором (INSERT / UPDATE / DELETE ... RETURNING):
+        USERS_WRITE_RETURNING и СУБД с RETURNING (SQLite 3.35+, PostgreSQL).
+        """
+        return (
+            current_app.config["USERS_WRITE_RETURNING"]
+            and dialect.name in ("sqlite", "postgresql")
+            and dialect.insert_returning
+            and dialect.update_returning
+            and dialect.delete_returning
+        )
+
+    @staticmethod
+    def _insert_query(name: str, email: str):
+        """
+        INSERT ... RETURNING; занятый email отсекает уникальный индекс (IntegrityError).
+        Не ON CONFLICT DO NOTHING: диалектные insert() в SQLAlchemy 2.0 не
+        кэшируют компиляцию (inherit_cache = False) — ~0.8 ms CPU на каждый INSERT.
+        """
+        return db.insert(User).values(name=name, email=email, is_active=True).returning(User)
+
+    @staticmethod
+    def _update_values(changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Переданные (не None) поля пользователя после нормализации."""
+        values = {}
+        for key, value in changes.items():
+            if key not in User.__table__.c or value is None:
+                continue
+
+            if key == "email":
+                value = value.strip().lower()
+            elif key == "name":
+                value = value.strip()
+
+            values[key] = value
+        return values
+
+    @staticmethod
+    def _update_query(user_id: int, values: Dict[str, Any], updated_at=None):
+        """
+        UPDATE активного пользователя с RETURNING.
+        updated_at — версия, проверенная по If-Match: строка обновится,
+        только если её не изменили после проверки.
+        """
+        stmt = db.update(User).where(User.id == user_id, User.active())
+        if updated_at is not None:
+            stmt = stmt.where(User.updated_at == updated_at)
+        return stmt.values(**values).returning(User)
+
+    @staticmethod
+    def _delete_query(user_id: int, soft_delete: bool):
+        """Мягкое (is_active = false) или жёсткое удаление активного пользователя с RETURNING id."""
+        if soft_delete:
+            stmt = db.update(User).values(is_active=False)
+        else:
+            stmt = db.delete(User)
+        return stmt.where(User.id == user_id, User.active()).returning(User.id)
+
+    @staticmethod
+    def _user_version_query(user_id: int):
+        return db.select(User.updated_at).where(User.id == user_id, User.active())
+
+    @staticmethod
+    def _check_version(user_id: int, updated_at, if_match: Optional[Set[str]]) -> None:
+        if if_match is not None and user_etag(user_id, updated_at) not in if_match:
+            raise PreconditionFailedException(
+                "Пользователь был изменён: версия не совпадает (If-Match)"
+            )
+
+    @staticmethod
+    def _update_miss(user_id: int, updated_at) -> Exception:
+        """Исключение для UPDATE ... RETURNING без строки."""
+        if updated_at is not None:
+            # Версия прошла If-Match, но строку изменили до UPDATE
+            return PreconditionFailedException(
+                "Пользователь был изменён: версия не совпадает (If-Match)"
+            )
+        return NotFoundException(f"Пользователь с ID {user_id} не найден")
+
+    @staticmethod
+    def _write(func, *args):
+        """
+        Выполнить запись с RETURNING (func из _*_returning) и зафиксировать:
+        через WriteBatcher, если включено USERS_WRITE_BATCHING, иначе в текущей сессии.
+        """
+        batcher = get_write_batcher()
+        if batcher is not None:
+            result = batcher.submit(func, *args)
+            # Пакет фиксируется в потоке без запроса: окно read-your-writes
+            # клиенту открываем здесь
+            pin_to_primary()
+            return result
+
+        try:
+            result = func(*args)
+        except Exception:
+            db.session.rollback()
+            raise
+        # Commit истекает атрибуты объектов сессии, а отсоединённый объект
+        # сохраняет значения из RETURNING — без перечитывания
+        if isinstance(result, User):
+            db.session.expunge(result)
+        db.session.commit()
+        return result
+
+    # Операции записи без commit (выполняются в _write или пакетом WriteBatcher)
+
+    @staticmethod
+    def _create_returning(name: str, email: str) -> User:
+        return db.session.scalars(UserService._insert_query(name, email)).one()
+
+    @staticmethod
+    def _update_returning(
+            user_id: int,
+            values: Dict[str, Any],
+            if_match: Optional[Set[str]],
+    ) -> User:
+        updated_at = None
+        if if_match is not None:
+            updated_at = db.session.scalar(UserService._user_version_query(user_id))
+            if updated_at is None:
+                raise NotFoundException(f"Пользователь с ID {user_id} не найден")
+            UserService._check_version(user_id, updated_at, if_match)
+
+        user = db.session.scalars(
+            UserService._update_query(user_id, values, updated_at)
+        ).first()
+        if user is None:
+            raise UserService._update_miss(user_id, updated_at)
+        return user
+
+    @staticmethod
+    def _delete_returning(user_id: int, soft_delete: bool) -> None:
+        # Один UPDATE / DELETE ... WHERE id = ? AND is_active RETURNING id
+        deleted = db.session.scalar(UserService._delete_query(user_id, soft_delete))
+        if deleted is None:
+            raise NotFoundException(f"Пользователь с ID {user_id} не найден")
+
+    # Поток изменений (GET /api/users/stream): публикация после COMMIT
+
     @staticmethod
-    def update_user(user_id: int, **kwargs) -> User:
-        """Обновить пользователя (частичное обновление)."""
+    def _publish(event: str, data: Dict[str, Any]) -> None:
+        broker = get_event_broker()
+        if broker is not None:
+            broker.publish(event, data)
+
+    @staticmethod
+    def _publish_user(event: str, user: User) -> None:
+        """user.created / user.updated с пользователем в формате UserSchema."""
+        if get_event_broker() is not None:
+            UserService._publish(event, _user_schema.dump(user))
+
+    @staticmethod
+    def _publish_changed(action: str, user_ids) -> None:
+        """Пакетная операция — одно событие users.changed со списком ID."""
+        UserService._publish("users.changed", {"action": action, "ids": sorted(user_ids)})
+
+    @staticmethod
+    def bulk_create_users(
+            items: List[Dict[str, Any]],
+            chunk_size: Optional[int] = None,
+            check_existing: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Пакетное создание пользователей (данные уже провалидированы).
+
+        Дубликаты ищутся внутри пакета и одним IN-запросом к БД на чанк,
+        вставка — многострочными INSERT, по транзакции на чанк.
+        check_existing=False — вызывающий уже отсеял занятые email
+        (existing_emails); появившиеся с тех пор отсекает уникальный индекс.
+        Возвращает результат для каждого элемента в исходном порядке.
+        """
+        chunk_size = chunk_size or current_app.config["USERS_BULK_CHUNK_SIZE"]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+
+        pending: List[Tuple[int, str, str]] = []
+        seen = set()
+        for index, item in enumerate(items):
+            name = item["name"].strip()
+            email = item["email"].strip().lower()
+            if email in seen:
+                results[index] = {
+                    "status": "conflict",
+                    "email": email,
+                    "error": f"Email {email} повторяется в пакете",
+                }
+                continue
+            seen.add(email)
+            pending.append((index, name, email))
+
         try:
-            user = UserService.get_user_by_id(user_id)
+            for start in range(0, len(pending), chunk_size):
+                UserService._insert_chunk(
+                    pending[start:start + chunk_size], results, check_existing
+                )
+        finally:
+            UserService.invalidate_counts()
 
-            # Обновляем только переданные поля
-            for key, value in kwargs.items():
-                if not hasattr(user, key) or value is None:
-                    continue
+        return results
+
+    @staticmethod
+    def _insert_chunk(
+            chunk: List[Tuple[int, str, str]],
+            results: List[Optional[Dict[str, Any]]],
+            check_existing: bool = True,
+    ) -> None:
+        """Вставить один чанк пакета и заполнить results."""
+        try:
+            existing = set()
+            if check_existing:
+                existing = UserService.existing_emails(
+                    [email for _, _, email in chunk]
+                )
 
-                if key == "email":
-                    value = value.strip().lower()
-                elif key == "name":
-                    value = value.strip()
+            rows = []
+            for index, name, email in chunk:
+                if email in existing:
+                    results[index] = {
+                        "status": "conflict",
+                        "email": email,
+                        "error": f"Пользователь с email {email} уже существует",
+                    }
+                else:
+                    rows.append((index, name, email))
 
-                setattr(user, key, value)
+            if not rows:
+                db.session.rollback()
+                return
 
+            now = datetime.now(UTC)
+            params = [
+                {
+                    "name": name,
+                    "email": email,
+                    "is_active": True,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for _, name, email in rows
+            ]
+            # RETURNING без sort_by_parameter_order: иначе на SQLite
+            # insertmanyvalues деградирует до INSERT по одной строке.
+            # id сопоставляем по email (он уникален).
+            table = User.__table__
+            stmt = table.insert().returning(table.c.id, table.c.email)
+
+            try:
+                ids = {
+                    email: user_id
+                    for user_id, email in db.session.execute(stmt, params)
+                }
+                db.session.commit()
+            except IntegrityError:
+                # Гонка с параллельной записью: вставляем чанк построчно
+                db.session.rollback()
+                ids = UserService._insert_rows_one_by_one(stmt, params)
+
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseException(f"Ошибка пакетного создания: {str(e)}")
+
+        for index, _, email in rows:
+            user_id = ids.get(email)
+            if user_id is None:
+                results[index] = {
+                    "status": "conflict",
+                    "email": email,
+                    "error": f"Email {email} уже используется",
+                }
+            else:
+                results[index] = {"status": "created", "id": user_id, "email": email}
+
+        # Сбрасываем возможные закэшированные 404 для новых ID
+        get_user_cache().invalidate_many(ids.values())
+        if ids:
+            UserService._publish_changed("created", ids.values())
+
+    @staticmethod
+    def existing_emails(emails: List[str]) -> Set[str]:
+        """Занятые email из списка (нормализованных) — одним IN-запросом."""
+        # Email уникален и среди неактивных записей, поэтому без фильтра
+        return set(
+            db.session.scalars(db.select(User.email).where(User.email.in_(emails)))
+        )
+
+    @staticmethod
+    def update_names(names_by_email: Dict[str, str]) -> List[int]:
+        """
+        Пакетно сменить имена активных пользователей по email (один
+        executemany, одна транзакция); вернуть ID обновлённых.
+        Мягко удалённые не восстанавливаются и не меняются.
+        """
+        table = User.__table__
+        stmt = (
+            table.update()
+            .where(table.c.id == db.bindparam("b_id"), User.active())
+            .values(name=db.bindparam("b_name"), updated_at=datetime.now(UTC))
+        )
+        try:
+            ids_by_email = dict(
+                db.session.execute(
+                    db.select(User.email, User.id).where(
+                        User.email.in_(list(names_by_email)), User.active()
+                    )
+                ).tuples().all()
+            )
+            if ids_by_email:
+                db.session.execute(
+                    stmt,
+                    [
+                        {"b_id": user_id, "b_name": names_by_email[email]}
+                        for email, user_id in ids_by_email.items()
+                    ],
+                )
             db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseException(f"Ошибка пакетного обновления: {str(e)}")
+
+        updated_ids = list(ids_by_email.values())
+        UserService.invalidate_counts()
+        get_user_cache().invalidate_many(updated_ids)
+        if updated_ids:
+            UserService._publish_changed("updated", updated_ids)
+        return updated_ids
+
+    @staticmethod
+    def _insert_rows_one_by_one(stmt, params: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Построчная вставка в savepoint'ах; конфликтные email пропускаются."""
+        ids: Dict[str, int] = {}
+        for row in params:
+            try:
+                with db.session.begin_nested():
+                    user_id, email = db.session.execute(stmt, row).one()
+                ids[email] = user_id
+            except IntegrityError:
+                continue
+        db.session.commit()
+        return ids
+
+    @staticmethod
+    def update_user(
+            user_id: int,
+            if_match: Optional[Set[str]] = None,
+            **kwargs,
+    ) -> User:
+        """
+        Обновить пользователя (частичное обновление).
+        if_match — допустимые ETag текущей версии (оптимистичная блокировка).
+
+        С RETURNING — один UPDATE ... WHERE id = ? AND is_active (при If-Match
+        перед ним читается только updated_at), иначе загрузка строки и UPDATE.
+        """
+        values = UserService._update_values(kwargs)
+        try:
+            if values and UserService.write_returning(db.engine.dialect):
+                user = UserService._write(
+                    UserService._update_returning, user_id, values, if_match
+                )
+            else:
+                user = UserService._get_user(user_id)
+                UserService._check_version(user.id, user.updated_at, if_match)
+
+                # Обновляем только переданные поля
+                for key, value in values.items():
+                    setattr(user, key, value)
+
+                db.session.commit()
+
+            UserService.invalidate_counts()
+            get_user_cache().invalidate(user_id)
+            if values:
+                UserService._publish_user("user.updated", user)
             return user
 
-        except ConflictException:
+        except (ConflictException, PreconditionFailedException, NotFoundException):
             raise
         except IntegrityError:
             db.session.rollback()
@@ -130,17 +1015,125 @@ class UserService:
     def delete_user(user_id: int, soft_delete: bool = True) -> None:
         """Удалить пользователя (мягкое или жёсткое удаление)."""
         try:
-            user = UserService.get_user_by_id(user_id)
+            if UserService.write_returning(db.engine.dialect):
+                UserService._write(UserService._delete_returning, user_id, soft_delete)
+            else:
+                user = UserService._get_user(user_id)
 
-            if soft_delete:
-                # Мягкое удаление
-                user.is_active = False
-                db.session.commit()
+                if soft_delete:
+                    # Мягкое удаление
+                    user.is_active = False
+                    db.session.commit()
+                else:
+                    # Жёсткое удаление
+                    db.session.delete(user)
+                    db.session.commit()
+
+            UserService.invalidate_counts()
+            get_user_cache().invalidate(user_id)
+            UserService._publish("user.deleted", {"id": user_id})
+
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            raise DatabaseException(f"Ошибка удаления: {str(e)}")
+
+    @staticmethod
+    def bulk_update_users(
+            changes: Dict[str, Any],
+            ids: Optional[List[int]] = None,
+            search: Optional[str] = None,
+            dry_run: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Пакетное обновление активных пользователей по списку ID или фильтру
+        search (как в get_all_users). Результат по каждому ID: updated /
+        not_found (при dry_run — matched / not_found, без изменений).
+        """
+        values = UserService._update_values(changes)
+        return UserService._bulk_apply(values, "updated", ids, search, dry_run)
+
+    @staticmethod
+    def bulk_delete_users(
+            ids: Optional[List[int]] = None,
+            search: Optional[str] = None,
+            dry_run: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Пакетное мягкое удаление (см. bulk_update_users): deleted / not_found."""
+        return UserService._bulk_apply({"is_active": False}, "deleted", ids, search, dry_run)
+
+    @staticmethod
+    def _bulk_apply(
+            values: Dict[str, Any],
+            status: str,
+            ids: Optional[List[int]],
+            search: Optional[str],
+            dry_run: bool,
+    ) -> List[Dict[str, Any]]:
+        """
+        UPDATE ... WHERE id IN (чанк) AND is_active по USERS_BULK_CHUNK_SIZE ID,
+        все чанки — в одной транзакции. С RETURNING — один оператор на чанк,
+        иначе (и при dry_run) SELECT совпавших ID перед UPDATE.
+        """
+        max_items = current_app.config["USERS_BULK_MAX_ITEMS"]
+        if ids is not None and len(ids) > max_items:
+            raise ValidationException(f"Слишком много ID в пакете (максимум {max_items})")
+
+        chunk_size = current_app.config["USERS_BULK_CHUNK_SIZE"]
+        returning = UserService.write_returning(db.engine.dialect)
+        matched: Set[int] = set()
+        try:
+            if ids is None:
+                ids = UserService._bulk_target_ids(search)
+
+            for start in range(0, len(ids), chunk_size):
+                criteria = (User.id.in_(ids[start:start + chunk_size]), User.active())
+                if returning and not dry_run:
+                    found = db.session.scalars(
+                        db.update(User).where(*criteria).values(**values)
+                        .returning(User.id)
+                    ).all()
+                else:
+                    found = db.session.scalars(db.select(User.id).where(*criteria)).all()
+                    if found and not dry_run:
+                        db.session.execute(
+                            db.update(User)
+                            .where(User.id.in_(found), User.active())
+                            .values(**values)
+                        )
+                matched.update(found)
+
+            if dry_run:
+                db.session.rollback()
             else:
-                # Жёсткое удаление
-                db.session.delete(user)
                 db.session.commit()
 
         except SQLAlchemyError as e:
             db.session.rollback()
-            raise DatabaseException(f"Ошибка удаления: {str(e)}")
+            raise DatabaseException(f"Ошибка пакетной операции: {str(e)}")
+
+        if matched and not dry_run:
+            UserService.invalidate_counts()
+            get_user_cache().invalidate_many(matched)
+            UserService._publish_changed(status, matched)
+
+        status = "matched" if dry_run else status
+        return [
+            {"id": user_id, "status": status if user_id in matched else "not_found"}
+            for user_id in ids
+        ]
+
+    @staticmethod
+    def _bulk_target_ids(search: str) -> List[int]:
+        """ID активных пользователей под фильтром (не больше USERS_BULK_MAX_ITEMS)."""
+        max_items = current_app.config["USERS_BULK_MAX_ITEMS"]
+        ids = list(db.session.scalars(
+            UserService._active_select(User.id, search=search)
+            .order_by(User.id)
+            .limit(max_items + 1)
+        ))
+        if len(ids) > max_items:
+            raise ValidationException(
+                f"Под фильтр попадает больше {max_items} пользователей: "
+                f"уточните search или передайте ids"
+            )
+        return ids
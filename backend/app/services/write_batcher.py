@@ -0,0 +1,146 @@
+"""
+Групповая фиксация записей (group commit).
+
+Операции create / update / delete из параллельных запросов ставятся
+в очередь; фоновый поток забирает в пакет всё, что накопилось, пока
+фиксировался предыдущий, и то, что придёт за USERS_WRITE_BATCH_WINDOW_MS
+после первой операции (не больше USERS_WRITE_BATCH_SIZE), и выполняет
+пакет одной транзакцией с одним COMMIT (в SQLite — один fsync и один
+захват блокировки записи на пакет).
+
+Каждая операция — отдельный оператор с RETURNING; её ошибка (конфликт
+email, 404, If-Match) возвращается только её вызывающему, остальные
+операции пакета фиксируются. Ошибка COMMIT достаётся всем операциям пакета.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+from flask import Flask, current_app
+
+from app.extensions import db
+
+
+class _Operation:
+    __slots__ = ("func", "args", "done", "result", "error")
+
+    def __init__(self, func: Callable, args: tuple):
+        self.func = func
+        self.args = args
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class WriteBatcher:
+    """Очередь записей и фоновый поток, фиксирующий их пакетами."""
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self.window = app.config["USERS_WRITE_BATCH_WINDOW_MS"] / 1000
+        self.max_size = app.config["USERS_WRITE_BATCH_SIZE"]
+        self._queue: "queue.Queue[Optional[_Operation]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, func: Callable, *args) -> Any:
+        """
+        Выполнить func(*args) в ближайшем пакете и дождаться COMMIT.
+        func выполняется в потоке пакета (своя сессия db.session) и не фиксирует
+        транзакцию; возвращённые ORM-объекты отсоединены от сессии.
+        """
+        operation = _Operation(func, args)
+        self._ensure_worker()
+        self._queue.put(operation)
+        operation.done.wait()
+        if operation.error is not None:
+            raise operation.error
+        return operation.result
+
+    def close(self) -> None:
+        """Дообработать очередь и остановить поток."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="user-write-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            operation = self._queue.get()
+            if operation is None:
+                return
+            batch = [operation]
+            deadline = time.monotonic() + self.window
+            stop = False
+            while len(batch) < self.max_size:
+                # После окна пакет забирает только уже ждущие операции
+                timeout = deadline - time.monotonic()
+                try:
+                    if timeout > 0:
+                        operation = self._queue.get(timeout=timeout)
+                    else:
+                        operation = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if operation is None:
+                    stop = True
+                    break
+                batch.append(operation)
+            self._execute(batch)
+            if stop:
+                return
+
+    def _execute(self, batch: List[_Operation]) -> None:
+        with self.app.app_context():
+            session = db.session
+            # В PostgreSQL ошибка оператора прерывает транзакцию — каждая
+            # операция в SAVEPOINT. В SQLite ошибка откатывает только сам
+            # оператор, а SAVEPOINT до первого DML pysqlite выполнил бы вне
+            # транзакции (RELEASE зафиксировал бы её сразу)
+            nested = db.engine.dialect.name != "sqlite"
+            try:
+                for operation in batch:
+                    try:
+                        if nested:
+                            with session.begin_nested():
+                                operation.result = operation.func(*operation.args)
+                        else:
+                            operation.result = operation.func(*operation.args)
+                    except Exception as e:
+                        operation.error = e
+
+                # Объекты из RETURNING остаются с загруженными значениями
+                session.expunge_all()
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                for operation in batch:
+                    if operation.error is None:
+                        operation.error = e
+            finally:
+                db.session.remove()
+                for operation in batch:
+                    operation.done.set()
+
+
+def init_write_batching(app: Flask) -> None:
+    """Включить групповую фиксацию записей (USERS_WRITE_BATCHING)."""
+    if app.config["USERS_WRITE_BATCHING"]:
+        app.extensions["write_batcher"] = WriteBatcher(app)
+
+
+def get_write_batcher() -> Optional[WriteBatcher]:
+    """WriteBatcher текущего приложения или None (пакетирование выключено)."""
+    return current_app.extensions.get("write_batcher")
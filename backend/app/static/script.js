@@ -1,8 +1,16 @@
 const API_URL = `${window.location.origin}/api/users`;
 
 let users = [];
+let usersTotal = null;
 let userModal;
 
+// Дельта-синхронизация: курсор /changes и момент загрузки списка
+let changesCursor = null;
+let listLoadedAt = null;
+
+// Поток изменений SSE (/stream)
+let eventSource = null;
+
 // Инициализация после загрузки DOM
 document.addEventListener('DOMContentLoaded', () => {
     const modalElement = document.getElementById('userModal');
@@ -11,7 +19,7 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     setupForm();
-    loadUsers();
+    loadUsers().then(connectStream);
 });
 
 // Настраиваем обработчик формы добавления пользователя
@@ -26,7 +34,6 @@ function setupForm() {
 async function loadUsers() {
     const spinner = document.getElementById('loadingSpinner');
     const tableWrapper = document.getElementById('usersTableWrapper');
-    const meta = document.getElementById('usersMeta');
     const emptyState = document.getElementById('emptyState');
 
     spinner.classList.remove('d-none');
@@ -42,17 +49,15 @@ async function loadUsers() {
         }
 
         users = json.data || [];
-        renderUsersTable(users);
-
-        if (json.metadata && typeof json.metadata.total === 'number') {
-            meta.textContent = `${json.metadata.total} пользователь(ей)`;
-        } else {
-            meta.textContent = `${users.length} пользователь(ей)`;
-        }
-
-        if (!users.length) {
-            emptyState.classList.remove('d-none');
-        }
+        usersTotal = json.metadata && typeof json.metadata.total === 'number'
+            ? json.metadata.total
+            : null;
+        // Изменения догружаем через /changes по часам сервера (заголовок Date,
+        // точность — секунда); повторно применённые изменения безвредны
+        const serverNow = Date.parse(res.headers.get('Date')) || Date.now();
+        changesCursor = new Date(serverNow - 2000).toISOString();
+        listLoadedAt = changesCursor;
+        renderUsers();
 
         spinner.classList.add('d-none');
         tableWrapper.classList.remove('d-none');
@@ -63,6 +68,94 @@ async function loadUsers() {
     }
 }
 
+// Догрузить изменения после загрузки списка (вместо полной перезагрузки)
+async function syncChanges() {
+    if (!changesCursor) {
+        return loadUsers();
+    }
+
+    try {
+        let hasMore = true;
+        while (hasMore) {
+            const res = await fetch(`${API_URL}/changes?since=${encodeURIComponent(changesCursor)}`);
+            const json = await res.json();
+
+            if (!res.ok || !json.success) {
+                throw new Error(json.error || `HTTP ${res.status}`);
+            }
+
+            applyChanges(json.data || [], json.deleted || []);
+            changesCursor = json.metadata.cursor || changesCursor;
+            hasMore = json.metadata.has_more;
+        }
+        renderUsers();
+    } catch (e) {
+        console.error(e);
+        await loadUsers();
+    }
+}
+
+// Подписка на поток изменений: список обновляется без опроса
+function connectStream() {
+    if (!window.EventSource || eventSource) return;
+
+    eventSource = new EventSource(`${API_URL}/stream`);
+    const onUser = event => {
+        applyChanges([JSON.parse(event.data)], []);
+        renderUsers();
+    };
+    eventSource.addEventListener('user.created', onUser);
+    eventSource.addEventListener('user.updated', onUser);
+    eventSource.addEventListener('user.deleted', event => {
+        applyChanges([], [JSON.parse(event.data).id]);
+        renderUsers();
+    });
+    // Пакетные операции и пропуски (reset) — догружаем через /changes;
+    // при (пере)подключении — то, что пришло до него
+    eventSource.addEventListener('users.changed', syncChanges);
+    eventSource.addEventListener('reset', syncChanges);
+    eventSource.addEventListener('open', syncChanges);
+}
+
+function streamConnected() {
+    return eventSource !== null && eventSource.readyState === EventSource.OPEN;
+}
+
+// Применить изменения к загруженному списку (повторное применение безопасно)
+function applyChanges(changed, deleted) {
+    const removed = new Set(deleted);
+    const before = users.length;
+    users = users.filter(user => !removed.has(user.id));
+    if (usersTotal !== null) {
+        usersTotal -= before - users.length;
+    }
+
+    for (const user of changed) {
+        const index = users.findIndex(item => item.id === user.id);
+        if (index !== -1) {
+            users[index] = user;
+        } else if (parseServerDate(user.created_at) >= new Date(listLoadedAt)) {
+            // Новый пользователь; изменения остальных за пределами страницы не показываем
+            users.push(user);
+            if (usersTotal !== null) {
+                usersTotal += 1;
+            }
+        }
+    }
+
+    users.sort((a, b) => (b.created_at.localeCompare(a.created_at)) || (b.id - a.id));
+}
+
+// Таблица, счётчик и пустое состояние
+function renderUsers() {
+    const meta = document.getElementById('usersMeta');
+    const emptyState = document.getElementById('emptyState');
+
+    renderUsersTable(users);
+    meta.textContent = `${usersTotal !== null ? usersTotal : users.length} пользователь(ей)`;
+    emptyState.classList.toggle('d-none', users.length > 0);
+}
+
 // Рендер таблицы пользователей
 function renderUsersTable(list) {
     const tbody = document.getElementById('usersTableBody');
@@ -133,8 +226,10 @@ async function handleAddUser(event) {
 
         showMessage('Пользователь успешно создан.', 'success');
 
-        // Обновляем список
-        await loadUsers();
+        // Без потока изменений догружаем сами
+        if (!streamConnected()) {
+            await syncChanges();
+        }
         event.target.reset();
     } catch (e) {
         console.error(e);
@@ -189,7 +284,9 @@ async function deleteUser(userId) {
         }
 
         showMessage('Пользователь удалён.', 'success');
-        await loadUsers();
+        if (!streamConnected()) {
+            await syncChanges();
+        }
     } catch (e) {
         console.error(e);
         showMessage('Не удалось удалить пользователя.', 'danger');
@@ -214,6 +311,11 @@ function showMessage(message, type = 'info', timeout = 4000) {
     }, timeout);
 }
 
+// Сервер отдаёт время в UTC без смещения
+function parseServerDate(isoString) {
+    return new Date(/[zZ]|[+-]\d\d:\d\d$/.test(isoString) ? isoString : `${isoString}Z`);
+}
+
 function formatDate(isoString) {
     if (!isoString) return '-';
     const date = new Date(isoString);
@@ -3,9 +3,11 @@ from .exceptions import (
     ValidationException,
     NotFoundException,
     ConflictException,
+    PreconditionFailedException,
     DatabaseException,
     UnauthorizedException,
     ForbiddenException,
+    ServiceUnavailableException,
 )
 
 __all__ = [
@@ -13,7 +15,9 @@ __all__ = [
     "ValidationException",
     "NotFoundException",
     "ConflictException",
+    "PreconditionFailedException",
     "DatabaseException",
     "UnauthorizedException",
     "ForbiddenException",
+    "ServiceUnavailableException",
 ]
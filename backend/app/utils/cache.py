@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Маркер отсутствия значения (None — допустимое закэшированное значение)
+MISSING = object()
+
+
+class CacheBackend(ABC):
+    """Интерфейс бэкенда кэша."""
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Any:
+        """Вернуть значение или MISSING."""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class LRUCache(CacheBackend):
+    """Потокобезопасный in-process LRU-кэш с TTL и ограничением размера."""
+
+    def __init__(self, ttl: float = 30.0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Общий кэш поверх Redis-совместимого клиента (get / set(ex=) / delete).
+
+    Значения хранятся в JSON, ключи — с префиксом. Клиент передаётся
+    снаружи, поэтому в тестах его можно подменить локальным фейком.
+    """
+
+    def __init__(self, client, prefix: str = "users:", ttl: float = 60.0):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisCacheBackend":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("Для общего кэша требуется пакет redis") from e
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.prefix}{key}"
+
+    def get(self, key: Hashable) -> Any:
+        try:
+            raw = self.client.get(self._key(key))
+        except Exception:
+            # Недоступность общего кэша не должна ронять запрос
+            self.errors += 1
+            return MISSING
+        if raw is None:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            self.client.set(
+                self._key(key),
+                json.dumps(value, ensure_ascii=False),
+                ex=max(1, int(ttl)),
+            )
+        except Exception:
+            self.errors += 1
+
+    def delete(self, key: Hashable) -> None:
+        try:
+            self.client.delete(self._key(key))
+        except Exception:
+            self.errors += 1
+
+    def clear(self) -> None:
+        # Общий кэш целиком не чистим: записи истекают по TTL
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
@@ -0,0 +1,168 @@
+"""
+Сжатие ответов по Accept-Encoding (after_request).
+
+- gzip — всегда; br и zstd — если установлены brotli / zstandard;
+- сжимаются только типы из COMPRESSION_MIMETYPES и тела не меньше
+  COMPRESSION_MIN_SIZE байт (маленький ответ почти не сжимается,
+  а ETag одного пользователя нужен клиенту сильным для If-Match);
+- потоковые ответы (экспорт) сжимаются по частям: каждая часть
+  отправляется сразу (flush), без буферизации всего тела;
+- сильный ETag сжатого ответа становится слабым (байты другие,
+  содержимое то же) — If-None-Match продолжает работать.
+"""
+import gzip
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - зависит от окружения
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - зависит от окружения
+    zstandard = None
+
+
+class _Encoder(ABC):
+    """Сжатие целого тела (compress) и потока (stream)."""
+
+    def __init__(self, config):
+        self.config = config
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def stream(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        pass
+
+
+class _Gzip(_Encoder):
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, self.config["COMPRESSION_GZIP_LEVEL"], mtime=0)
+
+    def stream(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = zlib.compressobj(
+            self.config["COMPRESSION_GZIP_LEVEL"], zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+class _Brotli(_Encoder):
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data, quality=self.config["COMPRESSION_BROTLI_QUALITY"])
+
+    def stream(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = brotli.Compressor(quality=self.config["COMPRESSION_BROTLI_QUALITY"])
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+
+
+class _Zstd(_Encoder):
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=self.config["COMPRESSION_ZSTD_LEVEL"]).compress(data)
+
+    def stream(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        compressor = zstandard.ZstdCompressor(
+            level=self.config["COMPRESSION_ZSTD_LEVEL"]
+        ).compressobj()
+        for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(
+                zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            )
+        yield compressor.flush()
+
+
+def available_encodings() -> Dict[str, Callable]:
+    """Доступные кодировки в порядке предпочтения сервера."""
+    encoders: Dict[str, Callable] = {}
+    if zstandard is not None:
+        encoders["zstd"] = _Zstd
+    if brotli is not None:
+        encoders["br"] = _Brotli
+    encoders["gzip"] = _Gzip
+    return encoders
+
+
+def _closing_stream(stream: Iterator[bytes], source) -> Iterator[bytes]:
+    """Закрыть исходный итератор (stream_with_context и т.п.) вместе с обёрткой."""
+    try:
+        yield from stream
+    finally:
+        close = getattr(source, "close", None)
+        if close is not None:
+            close()
+
+
+def _as_bytes(chunks: Iterable) -> Iterator[bytes]:
+    for chunk in chunks:
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+class Compressor:
+    """Обработчик after_request; настройки читаются из конфигурации приложения."""
+
+    def __init__(self, app: Flask):
+        self.config = app.config
+        self.mimetypes = frozenset(app.config["COMPRESSION_MIMETYPES"])
+        self.min_size = app.config["COMPRESSION_MIN_SIZE"]
+        self.encoders = {
+            name: encoder(app.config) for name, encoder in available_encodings().items()
+        }
+
+    def choose_encoding(self) -> Optional[str]:
+        """Лучшая кодировка по Accept-Encoding (q=0 исключает кодировку)."""
+        return request.accept_encodings.best_match(list(self.encoders))
+
+    def __call__(self, response: Response) -> Response:
+        if (
+                response.mimetype not in self.mimetypes
+                or response.status_code < 200
+                or response.status_code in (204, 304)
+                or response.direct_passthrough
+                or "Content-Encoding" in response.headers
+                or "no-transform" in response.headers.get("Cache-Control", "")
+        ):
+            return response
+
+        # Ответ зависит от Accept-Encoding, даже если сейчас не сжат
+        response.vary.add("Accept-Encoding")
+
+        encoding = self.choose_encoding()
+        if encoding is None:
+            return response
+        encoder = self.encoders[encoding]
+
+        if response.is_streamed:
+            source = response.response
+            response.response = _closing_stream(
+                encoder.stream(_as_bytes(source)), source
+            )
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(encoder.compress(data))
+
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag is not None and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def init_compression(app: Flask) -> None:
+    """Включить сжатие ответов (COMPRESSION_ENABLED)."""
+    if not app.config["COMPRESSION_ENABLED"]:
+        return
+    app.after_request(Compressor(app))
@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# SQLAlchemy именует логгер пула по модулю класса, то есть app.utils.db_pool —
+# потомок app.logger, который в DEBUG-режиме Flask пишет всё подряд
+logging.getLogger(__name__).setLevel(logging.WARNING)
+
+
+class PoolWaitStats:
+    """Счётчики ожидания соединения из пула."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_avg_ms": round(self.wait_total * 1000 / attempts, 3) if attempts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+class _TimedCheckoutMixin:
+    """Замер времени получения соединения из очереди пула (_do_get)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def recreate(self):
+        # Пул пересоздаётся при dispose(): статистику сохраняем
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """QueuePool со статистикой ожидания соединений."""
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """Async-вариант для sqlalchemy.ext.asyncio."""
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    """Состояние пула движка: занятость, насыщение и ожидание соединений."""
+    pool = engine.pool
+    stats: Dict[str, Any] = {
+        "dialect": engine.dialect.name,
+        "pool": type(pool).__name__,
+    }
+    if not isinstance(pool, QueuePool):
+        return stats
+
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    stats.update({
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+        "checked_in": pool.checkedin(),
+        "checked_out": checked_out,
+        "overflow": pool.overflow(),
+        # Доля занятых соединений от максимума (1.0 — следующие запросы ждут)
+        "saturation": round(checked_out / capacity, 3) if capacity else None,
+    })
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        stats.update(wait_stats.to_dict())
+    return stats
@@ -0,0 +1,186 @@
+"""
+Разделение чтения и записи между primary и репликами.
+
+Реплики — bind'ы SQLALCHEMY_BINDS с ключами replica_0, replica_1, ...
+Запросы внутри read_replica() уходят на реплику (одну на сессию, выбор
+по кругу), всё остальное — на primary. На primary остаются и чтения:
+- в транзакции, где уже была запись (flush или DML);
+- клиента, который недавно писал (окно read-your-writes).
+
+Время последней записи клиент получает в подписанном (SECRET_KEY) cookie и
+присылает с каждым запросом; состояния на стороне процесса нет, так что
+окно действует во всех воркерах и не зависит от IP клиента.
+"""
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from flask import after_this_request, current_app, has_request_context, request
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, Signer
+from sqlalchemy import event
+
+REPLICA_BIND_PREFIX = "replica_"
+
+# Cookie с подписанным временем последней записи клиента
+PIN_COOKIE = "replica_pin"
+_PIN_SALT = "replica-read-your-writes"
+# Время записи в текущем запросе (ключ WSGI environ: flask.g живёт
+# в контексте приложения и может пережить запрос)
+_PINNED_AT = "app.replica_pinned_at"
+
+# Ключи session.info
+_READ_DEPTH = "replica_read_depth"
+_WROTE = "replica_wrote"
+_REPLICA_KEY = "replica_key"
+
+_round_robin = itertools.count()
+
+
+class _RoutingStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def to_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+
+routing_stats = _RoutingStats()
+
+
+def replica_keys(engines) -> List[str]:
+    return sorted(
+        key for key in engines
+        if key and key.startswith(REPLICA_BIND_PREFIX)
+    )
+
+
+def next_replica(keys: List[str]) -> str:
+    """Следующая реплика по кругу (общий счётчик для sync и async сессий)."""
+    return keys[next(_round_robin) % len(keys)]
+
+
+@contextmanager
+def read_replica() -> Iterator[None]:
+    """Направлять чтения db.session внутри блока на реплику (если возможно)."""
+    from app.extensions import db
+
+    info = db.session.info
+    info[_READ_DEPTH] = info.get(_READ_DEPTH, 0) + 1
+    try:
+        yield
+    finally:
+        info[_READ_DEPTH] -= 1
+
+
+def _signer() -> Signer:
+    return Signer(current_app.config["SECRET_KEY"], salt=_PIN_SALT)
+
+
+def _last_write_at() -> Optional[float]:
+    """Время последней записи клиента: в этом запросе или из cookie."""
+    if not has_request_context():
+        return None
+    pinned_at = request.environ.get(_PINNED_AT)
+    if pinned_at is not None:
+        return pinned_at
+    value = request.cookies.get(PIN_COOKIE)
+    if not value:
+        return None
+    try:
+        return float(_signer().unsign(value))
+    except (BadSignature, ValueError):
+        return None
+
+
+def _has_replicas() -> bool:
+    return bool(replica_keys(current_app.config.get("SQLALCHEMY_BINDS") or {}))
+
+
+def is_pinned_to_primary() -> bool:
+    """Клиент писал в последние REPLICA_READ_YOUR_WRITES_SECONDS секунд."""
+    if not _has_replicas():
+        return False
+    last_write = _last_write_at()
+    window = current_app.config["REPLICA_READ_YOUR_WRITES_SECONDS"]
+    return last_write is not None and time.time() - last_write < window
+
+
+def pin_to_primary() -> None:
+    """Отметить запись клиента: ответ получит cookie с её временем."""
+    window = current_app.config["REPLICA_READ_YOUR_WRITES_SECONDS"]
+    # Без реплик читать не с чего, кроме primary: ни окна, ни cookie
+    if not has_request_context() or window <= 0 or not _has_replicas():
+        return
+    if _PINNED_AT not in request.environ:
+        after_this_request(_set_pin_cookie)
+    request.environ[_PINNED_AT] = time.time()
+
+
+def _set_pin_cookie(response):
+    window = current_app.config["REPLICA_READ_YOUR_WRITES_SECONDS"]
+    value = _signer().sign(repr(request.environ[_PINNED_AT])).decode()
+    response.set_cookie(
+        PIN_COOKIE,
+        value,
+        max_age=math.ceil(window),
+        httponly=True,
+        samesite="Lax",
+        secure=request.is_secure,
+    )
+    return response
+
+
+class RoutingSession(Session):
+    """Сессия Flask-SQLAlchemy с маршрутизацией чтений на реплики."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs) -> Any:
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None:
+            return engine
+
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info[_WROTE] = True
+            return engine
+
+        if not self.info.get(_READ_DEPTH):
+            return engine
+
+        engines = self._db.engines
+        if engine is not engines.get(None):
+            return engine
+        if self.info.get(_WROTE):
+            routing_stats.incr("primary_after_write")
+            return engine
+        if is_pinned_to_primary():
+            routing_stats.incr("primary_read_your_writes")
+            return engine
+
+        key = self.info.get(_REPLICA_KEY)
+        if key is None:
+            keys = replica_keys(engines)
+            if not keys:
+                return engine
+            key = self.info[_REPLICA_KEY] = next_replica(keys)
+        routing_stats.incr(key)
+        return engines[key]
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session):
+    if session.info.pop(_WROTE, False):
+        pin_to_primary()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_WROTE, None)
@@ -35,6 +35,12 @@ class ConflictException(AppException):
     status_code = 409
 
 
+class PreconditionFailedException(AppException):
+    """Не выполнено условие запроса (If-Match)."""
+
+    status_code = 412
+
+
 class DatabaseException(AppException):
     """Ошибка базы данных."""
 
@@ -51,3 +57,9 @@ class ForbiddenException(AppException):
     """Доступ запрещен."""
 
     status_code = 403
+
+
+class ServiceUnavailableException(AppException):
+    """Сервис временно недоступен (исчерпан лимит)."""
+
+    status_code = 503
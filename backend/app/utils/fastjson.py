@@ -0,0 +1,35 @@
+"""
+Компактный JSON для горячих ответов API: orjson, если установлен,
+иначе стандартный json без отступов и лишних пробелов.
+"""
+import json
+from typing import Any
+
+from flask import Flask, Response
+
+from app.utils.metrics import serialize_timer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - зависит от окружения
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Сериализовать в компактный UTF-8 JSON."""
+    with serialize_timer():
+        if orjson is not None:
+            return orjson.dumps(obj)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(obj: Any, status: int = 200) -> Response:
+    """Ответ application/json без прохода через jsonify."""
+    return Response(dumps(obj), status=status, mimetype="application/json")
+
+
+def init_json(app: Flask) -> None:
+    """Настроить jsonify: JSON_COMPACT, JSON_SORT_KEYS, UTF-8 вместо \\uXXXX."""
+    app.json.compact = app.config["JSON_COMPACT"]
+    app.json.sort_keys = app.config["JSON_SORT_KEYS"]
+    app.json.ensure_ascii = False
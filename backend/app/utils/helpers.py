@@ -1,4 +1,7 @@
-from flask import request
+import hashlib
+from datetime import datetime, UTC
+
+from flask import Response, request
 
 
 def get_client_ip() -> str | None:
@@ -15,3 +18,74 @@ def normalize_str(value: str | None) -> str | None:
         return None
     value = value.strip()
     return value or None
+
+
+def compute_etag(*parts) -> str:
+    """Сильный ETag из версии ресурса (без сериализации тела)."""
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def body_etag(body: bytes) -> str:
+    """ETag по содержимому тела — когда дешёвой версии ресурса нет."""
+    return hashlib.sha1(body).hexdigest()
+
+
+def user_etag(
+        user_id: int,
+        updated_at: datetime | str | None,
+        fields: tuple | None = None,
+) -> str:
+    """
+    ETag пользователя по (id, updated_at).
+    fields — неполный набор полей (?fields=): другое представление, другой ETag.
+    """
+    if isinstance(updated_at, datetime):
+        updated_at = updated_at.isoformat()
+    if fields:
+        return compute_etag("user", user_id, updated_at, ",".join(fields))
+    return compute_etag("user", user_id, updated_at)
+
+
+def as_utc(value: datetime | str | None) -> datetime | None:
+    """Привести дату (или ISO-строку) к aware UTC; naive считаем UTC."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def is_not_modified(etag: str | None, last_modified: datetime | None = None) -> bool:
+    """
+    Проверить If-None-Match / If-Modified-Since до сериализации ответа.
+    При наличии If-None-Match заголовок If-Modified-Since игнорируется.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if request.if_none_match:
+        return etag is not None and request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def set_validators(
+        response: Response,
+        etag: str | None,
+        last_modified: datetime | None = None,
+) -> Response:
+    """Проставить ETag/Last-Modified и требовать ревалидации у клиента."""
+    if etag is not None:
+        response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def not_modified(etag: str | None, last_modified: datetime | None = None) -> Response:
+    """Пустой ответ 304 с валидаторами."""
+    return set_validators(Response(status=304), etag, last_modified)
@@ -0,0 +1,242 @@
+"""
+Метрики производительности запросов.
+
+- гистограмма длительности запроса по endpoint / method / status;
+- число SQL-операторов и время в БД на запрос (события движков
+  before_cursor_execute / after_cursor_execute);
+- заголовок Server-Timing (db, serialize, total);
+- экспорт в текстовом формате Prometheus (GET /metrics).
+
+Состояние текущего запроса хранится в ContextVar: обработчики событий
+SQLAlchemy не обращаются к прокси Flask и стоят единицы микросекунд.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from flask import Flask, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+# Границы корзин (секунды) — как у стандартных клиентов Prometheus
+DURATION_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Потокобезопасная гистограмма с метками (кумулятивные корзины при выводе)."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # метки -> [счётчики по корзинам (+Inf последней), сумма]
+        self._series: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def collect(self) -> Dict[Tuple[str, ...], Tuple[List[int], float]]:
+        with self._lock:
+            return {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        for label_values, (counts, total) in sorted(self.collect().items()):
+            labels = ",".join(
+                f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values)
+            )
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f'{self.name}_bucket{{{prefix}le="{_format(bound)}"}} {cumulative}'
+            cumulative += counts[-1]
+            yield f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}'
+            yield f"{self.name}_sum{{{labels}}} {_format(total)}"
+            yield f"{self.name}_count{{{labels}}} {cumulative}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Длительность обработки запроса",
+    ("endpoint", "method", "status"),
+    DURATION_BUCKETS,
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "Число SQL-операторов на запрос",
+    ("endpoint",),
+    STATEMENT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Время выполнения SQL на запрос",
+    ("endpoint",),
+    DURATION_BUCKETS,
+)
+METRICS = (REQUEST_DURATION, REQUEST_DB_STATEMENTS, REQUEST_DB_SECONDS)
+
+
+class RequestTimings:
+    """Накопители времени текущего запроса."""
+
+    __slots__ = ("start", "db_time", "db_statements", "serialize_time")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_time = 0.0
+        self.db_statements = 0
+        self.serialize_time = 0.0
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def serialize_timer() -> Iterator[None]:
+    """Учесть блок как сериализацию ответа (Server-Timing: serialize)."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serialize_time += time.perf_counter() - start
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics() -> None:
+    for metric in METRICS:
+        metric.clear()
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON-провайдер Flask, учитывающий jsonify() как сериализацию."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        with serialize_timer():
+            return super().dumps(obj, **kwargs)
+
+
+# События SQL
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("metrics_query_start", []).append(
+            (context, time.perf_counter())
+        )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    if timings is None:
+        return
+    starts = conn.info.get("metrics_query_start")
+    if starts:
+        timings.db_time += time.perf_counter() - starts.pop()[1]
+        timings.db_statements += 1
+
+
+def _handle_error(exception_context):
+    # Упавший оператор не доходит до after_cursor_execute: без этого его
+    # отметка осталась бы на соединении пула и сдвинула бы следующие замеры
+    conn = exception_context.connection
+    starts = conn.info.get("metrics_query_start") if conn is not None else None
+    if starts and starts[-1][0] is exception_context.execution_context:
+        starts.pop()
+
+
+def instrument_engine(engine) -> None:
+    """Подписать движок на подсчёт SQL (идемпотентно)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+# Хуки запроса
+
+def _start_request() -> None:
+    _current.set(RequestTimings())
+
+
+def _finish_request(response):
+    timings = _current.get()
+    if timings is None:
+        return response
+
+    total = time.perf_counter() - timings.start
+    endpoint = request.endpoint or "unmatched"
+    REQUEST_DURATION.observe(total, endpoint, request.method, str(response.status_code))
+    REQUEST_DB_STATEMENTS.observe(timings.db_statements, endpoint)
+    REQUEST_DB_SECONDS.observe(timings.db_time, endpoint)
+
+    response.headers["Server-Timing"] = (
+        f'db;dur={timings.db_time * 1000:.2f};desc="{timings.db_statements} queries", '
+        f"serialize;dur={timings.serialize_time * 1000:.2f}, "
+        f"total;dur={total * 1000:.2f}"
+    )
+    return response
+
+
+def _end_request(_exc=None) -> None:
+    _current.set(None)
+
+
+def init_metrics(app: Flask) -> None:
+    """Включить сбор метрик (METRICS_ENABLED): хуки запроса и события движков."""
+    if not app.config["METRICS_ENABLED"]:
+        return
+
+    from app.extensions import async_db, db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            instrument_engine(engine)
+    if app.config["ASYNC_MODE"]:
+        # В том числе движки с пулом, которые ASGI заведёт для своего loop
+        async_db.on_engine(app, instrument_engine)
+
+    app.json = TimedJSONProvider(app)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_end_request)
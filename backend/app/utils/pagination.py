@@ -0,0 +1,94 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime, UTC
+
+# Направления перехода по курсору
+DIRECTION_NEXT = "next"
+DIRECTION_PREV = "prev"
+
+
+def _encode_token(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_token(token: str) -> dict:
+    padded = token + "=" * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Позиция в ленте пользователей: ключ (created_at, id) и направление."""
+
+    created_at: datetime
+    id: int
+    direction: str = DIRECTION_NEXT
+
+
+def encode_cursor(created_at: datetime, user_id: int, direction: str = DIRECTION_NEXT) -> str:
+    """Упаковать позицию в непрозрачный URL-safe токен."""
+    return _encode_token({
+        "c": created_at.isoformat(),
+        "i": user_id,
+        "d": "p" if direction == DIRECTION_PREV else "n",
+    })
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Распаковать токен курсора. Бросает ValueError на некорректном вводе."""
+    try:
+        payload = _decode_token(token)
+        created_at = datetime.fromisoformat(payload["c"])
+        user_id = payload["i"]
+        direction = payload.get("d", "n")
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as e:
+        raise ValueError("Некорректный курсор") from e
+
+    if not isinstance(user_id, int) or isinstance(user_id, bool) or user_id < 1:
+        raise ValueError("Некорректный курсор")
+    if direction not in ("n", "p"):
+        raise ValueError("Некорректный курсор")
+
+    return Cursor(
+        created_at=created_at,
+        id=user_id,
+        direction=DIRECTION_PREV if direction == "p" else DIRECTION_NEXT,
+    )
+
+
+@dataclass(frozen=True)
+class ChangeCursor:
+    """Позиция в журнале изменений: ключ (updated_at, id); id 0 — начало момента."""
+
+    updated_at: datetime
+    id: int = 0
+
+
+def encode_change_cursor(updated_at: datetime, user_id: int) -> str:
+    return _encode_token({"u": updated_at.isoformat(), "i": user_id})
+
+
+def decode_change_cursor(value: str) -> ChangeCursor:
+    """
+    Токен курсора изменений или момент времени в ISO 8601 (изменения после него).
+    Время без часового пояса — UTC. Бросает ValueError на некорректном вводе.
+    """
+    try:
+        updated_at = datetime.fromisoformat(value)
+        user_id = 0
+    except ValueError:
+        try:
+            payload = _decode_token(value)
+            updated_at = datetime.fromisoformat(payload["u"])
+            user_id = payload["i"]
+        except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as e:
+            raise ValueError("Некорректный курсор изменений") from e
+
+    if not isinstance(user_id, int) or isinstance(user_id, bool) or user_id < 0:
+        raise ValueError("Некорректный курсор изменений")
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=UTC)
+    return ChangeCursor(updated_at=updated_at.astimezone(UTC), id=user_id)
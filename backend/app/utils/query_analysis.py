@@ -0,0 +1,277 @@
+"""
+Анализ SQL в режиме разработки (QUERY_ANALYSIS) — замена SQLALCHEMY_ECHO.
+
+- медленные операторы (дольше SLOW_QUERY_MS) пишутся в лог с параметрами
+  и вызвавшим методом сервиса (UserService.create_user и т.п.);
+- для медленных SELECT при QUERY_EXPLAIN добавляется план
+  (EXPLAIN QUERY PLAN в SQLite, EXPLAIN в остальных СУБД);
+- в рамках HTTP-запроса считаются «формы» операторов (SQL без значений
+  параметров и длины IN-списков); форма, выполненная не меньше
+  QUERY_REPEAT_THRESHOLD раз, — признак N+1 или поштучной обработки.
+
+count_queries() / assert_max_queries() — помощники для тестов:
+бюджет SQL-операторов на эндпоинт.
+"""
+import logging
+import re
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from flask import Flask, current_app, request
+from sqlalchemy import event
+
+logger = logging.getLogger("app.queries")
+
+# Длина параметров в логе
+MAX_PARAMS_REPR = 500
+
+_IN_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)|\((?:\s*%\([^)]*\)s\s*,)+\s*%\([^)]*\)s\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Форма оператора: без лишних пробелов и с IN-списком любой длины как (?)."""
+    return _IN_LIST.sub("(?)", _SPACES.sub(" ", statement).strip())
+
+
+def find_caller() -> Optional[str]:
+    """Ближайший по стеку метод сервиса (app.services), иначе функция приложения."""
+    fallback = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.services."):
+            return frame.f_code.co_qualname
+        if (
+                fallback is None
+                and module.startswith("app.")
+                and module != __name__
+                and not module.startswith("app.utils.")
+        ):
+            fallback = f"{module}.{frame.f_code.co_qualname}"
+        frame = frame.f_back
+    return fallback
+
+
+class _ShapeStats:
+    __slots__ = ("count", "seconds", "caller")
+
+    def __init__(self, caller: Optional[str]):
+        self.count = 0
+        self.seconds = 0.0
+        self.caller = caller
+
+
+class RequestQueries:
+    """Операторы текущего HTTP-запроса, сгруппированные по форме."""
+
+    __slots__ = ("shapes",)
+
+    def __init__(self):
+        self.shapes: Dict[str, _ShapeStats] = {}
+
+    def record(self, statement: str, seconds: float, caller: Optional[str]) -> None:
+        shape = statement_shape(statement)
+        stats = self.shapes.get(shape)
+        if stats is None:
+            stats = self.shapes[shape] = _ShapeStats(caller)
+        stats.count += 1
+        stats.seconds += seconds
+
+    @property
+    def total(self) -> int:
+        return sum(stats.count for stats in self.shapes.values())
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """(форма, статистика) для форм, выполненных не меньше threshold раз."""
+        return sorted(
+            (
+                (shape, stats) for shape, stats in self.shapes.items()
+                if stats.count >= threshold
+            ),
+            key=lambda item: -item[1].count,
+        )
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+def _format_params(parameters, executemany: bool) -> str:
+    if executemany:
+        text = f"{len(parameters)} наборов, первый: {parameters[0]!r}" if parameters else "[]"
+    else:
+        text = repr(parameters)
+    if len(text) > MAX_PARAMS_REPR:
+        text = text[:MAX_PARAMS_REPR] + "..."
+    return text
+
+
+def explain(conn, statement: str, parameters) -> str:
+    """План оператора на том же соединении."""
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    except Exception as e:  # план — только подсказка, запрос не должен падать
+        return f"(не удалось получить план: {e})"
+    finally:
+        cursor.close()
+    if conn.dialect.name == "sqlite":
+        # (id, parent, notused, detail)
+        return "\n".join(f"  {row[3]}" for row in rows)
+    return "\n".join(f"  {row[0]}" for row in rows)
+
+
+class QueryAnalyzer:
+    """Обработчики событий движка для одного приложения (настройки из его конфига)."""
+
+    def __init__(self, config):
+        self.slow_seconds = config["SLOW_QUERY_MS"] / 1000
+        self.explain = config["QUERY_EXPLAIN"]
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_analysis_start", []).append(
+            (context, time.perf_counter())
+        )
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_analysis_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()[1]
+
+        queries = _current.get()
+        slow = elapsed >= self.slow_seconds
+        caller = find_caller() if queries is not None or slow else None
+        if queries is not None:
+            queries.record(statement, elapsed, caller)
+        if not slow:
+            return
+
+        message = (
+            f"Медленный SQL {elapsed * 1000:.1f} ms ({caller or 'вне сервисов'}): "
+            f"{_SPACES.sub(' ', statement).strip()} | "
+            f"параметры: {_format_params(parameters, executemany)}"
+        )
+        if (
+                self.explain
+                and not executemany
+                and statement.lstrip()[:6].upper() in ("SELECT", "WITH")
+        ):
+            message += "\nПлан:\n" + explain(conn, statement, parameters)
+        logger.warning(message)
+
+    @staticmethod
+    def handle_error(exception_context) -> None:
+        # Упавший оператор не доходит до after_cursor_execute: снимаем его
+        # отметку, иначе следующие замеры на этом соединении сдвинутся
+        conn = exception_context.connection
+        starts = conn.info.get("query_analysis_start") if conn is not None else None
+        if starts and starts[-1][0] is exception_context.execution_context:
+            starts.pop()
+
+    def instrument(self, engine) -> None:
+        event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+        event.listen(engine, "handle_error", self.handle_error)
+
+
+def _start_request() -> None:
+    _current.set(RequestQueries())
+
+
+def _end_request(_exc=None) -> None:
+    queries = _current.get()
+    _current.set(None)
+    if queries is None:
+        return
+    threshold = current_app.config["QUERY_REPEAT_THRESHOLD"]
+    for shape, stats in queries.repeated(threshold):
+        logger.warning(
+            "Повтор SQL в %s %s: %d раз за запрос, %.1f ms (%s) — возможен N+1: %s",
+            request.method,
+            request.path,
+            stats.count,
+            stats.seconds * 1000,
+            stats.caller or "вне сервисов",
+            shape,
+        )
+
+
+def current_queries() -> Optional[RequestQueries]:
+    return _current.get()
+
+
+def app_engines(app: Optional[Flask] = None) -> List:
+    """Sync-движки приложения (все bind'ы и async-движки, если они есть)."""
+    from app.extensions import async_db, db
+
+    app = app or current_app
+    with app.app_context():
+        engines = list(db.engines.values())
+    if "async_db" in app.extensions:
+        engines.extend(async_db.sync_engines(app))
+    return engines
+
+
+def init_query_analysis(app: Flask) -> None:
+    """Включить анализ SQL (QUERY_ANALYSIS): лог медленных и повторяющихся операторов."""
+    if not app.config["QUERY_ANALYSIS"]:
+        return
+
+    # Логгер app.queries — потомок app.logger: вывод идёт через обработчик Flask
+    app.logger.info(
+        "Анализ SQL: медленные от %s ms, повтор от %s раз",
+        app.config["SLOW_QUERY_MS"],
+        app.config["QUERY_REPEAT_THRESHOLD"],
+    )
+
+    from app.extensions import async_db, db
+
+    analyzer = QueryAnalyzer(app.config)
+    with app.app_context():
+        for engine in db.engines.values():
+            analyzer.instrument(engine)
+    if "async_db" in app.extensions:
+        async_db.on_engine(app, analyzer.instrument)
+
+    app.before_request(_start_request)
+    app.teardown_request(_end_request)
+
+
+# Помощники для тестов
+
+@contextmanager
+def count_queries(engines: Optional[Iterable] = None) -> Iterator[List[str]]:
+    """Собрать SQL-операторы, выполненные внутри блока (по умолчанию — всех движков приложения)."""
+    statements: List[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = list(engines) if engines is not None else app_engines()
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", _record)
+
+
+@contextmanager
+def assert_max_queries(limit: int, engines: Optional[Iterable] = None) -> Iterator[List[str]]:
+    """AssertionError, если внутри блока выполнено больше limit SQL-операторов."""
+    with count_queries(engines) as statements:
+        yield statements
+    if len(statements) > limit:
+        listing = "\n".join(
+            f"  {i}. {_SPACES.sub(' ', s).strip()}" for i, s in enumerate(statements, 1)
+        )
+        raise AssertionError(
+            f"Ожидалось не больше {limit} SQL-операторов, выполнено {len(statements)}:\n{listing}"
+        )
@@ -0,0 +1,14 @@
+import os
+
+from dotenv import load_dotenv
+
+from app import create_app
+from app.asgi import create_asgi_app
+
+# Загрузка переменных окружения из .env
+load_dotenv()
+
+# ASGI-точка входа: поток SSE (/api/users/stream) и async-view (ASYNC_MODE)
+# в event loop сервера, остальные запросы — во Flask в пуле потоков.
+# Запуск: uvicorn asgi:application
+application = create_asgi_app(create_app(os.getenv("FLASK_ENV", "development")))
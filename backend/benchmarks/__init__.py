@@ -0,0 +1 @@
+# Бенчмарки производительности (запуск из backend/: python -m benchmarks.<name>)
@@ -0,0 +1,168 @@
+"""
+Пропускная способность sync- и async-режима по HTTP при конкурентных клиентах.
+
+Оба режима обслуживает один и тот же ASGI-сервер (uvicorn, asgi.py) в этом
+процессе; клиенты — --clients потоков, каждый шлёт --requests запросов
+GET /api/users?limit=20 (первая страница keyset-списка) по HTTP:
+
+- sync: Flask в пуле из --threads потоков (ASGI_WSGI_THREADS, как
+  gunicorn --threads);
+- async: ASYNC_MODE, async-view в event loop сервера с пулом
+  async-соединений этого loop.
+
+Задержка сети до БД имитируется sleep в trace-callback sqlite3 — он
+вызывается на каждый SQL-оператор в том потоке, где выполняется запрос
+(в потоке воркера для sync, в потоке aiosqlite для async), поэтому
+event loop не блокируется, как и при реальном сетевом ожидании.
+
+Async выигрывает, когда время запроса определяется ожиданием БД, а клиентов
+больше, чем потоков sync-режима; при задержке порядка 1 ms накладные
+расходы на переключение в поток aiosqlite делают его медленнее sync
+(см. --latency-ms 0).
+
+Требуется uvicorn (pip install uvicorn).
+
+Запуск: python -m benchmarks.bench_async [--clients 50] [--requests 20]
+        [--threads 8] [--latency-ms 20]
+"""
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+
+from app import create_app
+from app.asgi import create_asgi_app
+from app.extensions import async_db, db
+from app.services.user_service import UserService
+from benchmarks.load import HttpClient
+
+PATH = "/api/users?limit=20"
+
+
+def make_app(path: str, async_mode: bool, pool_size: int, threads: int):
+    return create_app(
+        "testing",
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLALCHEMY_ENGINE_OPTIONS": {"pool_size": pool_size, "max_overflow": 0},
+            "ASYNC_MODE": async_mode,
+            "ASGI_WSGI_THREADS": threads,
+            "USERS_LIST_ETAG": False,
+        },
+    )
+
+
+def seed(count: int) -> None:
+    UserService.bulk_create_users(
+        [{"name": "Bench User", "email": f"bench{i}@example.com"} for i in range(count)]
+    )
+
+
+def add_latency(engine, latency: float, is_async: bool) -> None:
+    def on_statement(_sql):
+        time.sleep(latency)
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, _record):
+        if is_async:
+            # Адаптер SQLAlchemy над aiosqlite: callback ставится в его потоке
+            dbapi_connection.await_(
+                dbapi_connection._connection.set_trace_callback(on_statement)
+            )
+        else:
+            dbapi_connection.set_trace_callback(on_statement)
+
+
+@contextmanager
+def serve(app) -> Iterator[str]:
+    """uvicorn с asgi-приложением в фоновом потоке; вернуть базовый URL."""
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise RuntimeError("Для бенчмарка требуется пакет uvicorn") from e
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(
+        uvicorn.Config(create_asgi_app(app), log_level="warning", lifespan="on")
+    )
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{sock.getsockname()[1]}"
+    finally:
+        server.should_exit = True
+        thread.join()
+        sock.close()
+
+
+def run_http(base_url: str, clients: int, requests: int) -> float:
+    client = HttpClient(base_url)
+
+    def one_client(_):
+        for _ in range(requests):
+            status = client.request("GET", PATH, None)
+            if status != 200:
+                raise RuntimeError(f"GET {PATH}: {status}")
+
+    # Прогрев: соединения пула и первый запрос к приложению
+    client.request("GET", PATH, None)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one_client, range(clients)))
+    return time.perf_counter() - start
+
+
+def bench_mode(path: str, async_mode: bool, args) -> float:
+    latency = args.latency_ms / 1000
+    app = make_app(path, async_mode, pool_size=args.clients, threads=args.threads)
+    with app.app_context():
+        add_latency(db.engine, latency, is_async=False)
+        # Соединения, открытые до подключения задержки
+        db.engine.dispose()
+    if async_mode:
+        # Движки с пулом создаются в loop сервера — задержка и для них
+        async_db.on_engine(app, lambda engine: add_latency(engine, latency, is_async=True))
+    with serve(app) as base_url:
+        return run_http(base_url, args.clients, args.requests)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+
+    total = args.clients * args.requests
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        with make_app(path, False, pool_size=1, threads=1).app_context():
+            seed(args.users)
+        results = {
+            f"sync ({args.threads} потоков)": bench_mode(path, False, args),
+            "async (event loop)": bench_mode(path, True, args),
+        }
+
+    print(
+        f"{args.clients} клиентов x {args.requests} запросов по HTTP, "
+        f"задержка {args.latency_ms:g} ms на SQL-оператор"
+    )
+    for name, seconds in results.items():
+        print(f"  {name:<24} {seconds:7.2f} s  {total / seconds:10,.0f} запросов/с")
+
+
+if __name__ == "__main__":
+    main()
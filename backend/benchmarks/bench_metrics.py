@@ -0,0 +1,90 @@
+"""
+Накладные расходы сбора метрик (METRICS_ENABLED) на запрос.
+
+Один и тот же запрос поочерёдно отправляется через test client в два
+приложения поверх одной копии набора — с метриками и без. Сравнивается
+медиана времени запроса: разница — цена хуков запроса, событий курсора
+и заголовка Server-Timing.
+
+- get: GET /api/users/<id> (попадание в кэш пользователей, без SQL);
+- list: первая страница списка (ETag-версия + страница, 2 SQL).
+
+Запуск: python -m benchmarks.bench_metrics [--users 10000] [--requests 2000]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from benchmarks import datasets
+
+PATHS = {
+    "get": "/api/users/{user_id}",
+    "list": "/api/users?per_page=20",
+}
+
+
+def make_app(database_url: str, enabled: bool):
+    return create_app(
+        "production",
+        {
+            "SECRET_KEY": "benchmark",
+            "SQLALCHEMY_DATABASE_URI": database_url,
+            "METRICS_ENABLED": enabled,
+        },
+    )
+
+
+def measure(apps, path: str, requests: int, warmup: int) -> dict:
+    """Медианы времени запроса по приложениям, микросекунды."""
+    clients = {mode: app.test_client() for mode, app in apps.items()}
+    samples = {mode: [] for mode in apps}
+    for i in range(warmup + requests):
+        # Запросы чередуются: дрейф машины одинаково влияет на оба режима
+        for mode, client in clients.items():
+            start = time.perf_counter()
+            client.get(path)
+            if i >= warmup:
+                samples[mode].append(time.perf_counter() - start)
+    return {mode: statistics.median(values) * 1_000_000 for mode, values in samples.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--data-dir", default=datasets.DEFAULT_DATA_DIR)
+    args = parser.parse_args()
+
+    path = datasets.ensure_dataset(args.users, args.data_dir)
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{datasets.working_copy(path, os.path.join(tmp, 'users.db'))}"
+        apps = {"off": make_app(url, False), "on": make_app(url, True)}
+        with apps["off"].app_context():
+            user_id = db.session.scalar(
+                db.select(db.func.min(User.id)).where(User.active())
+            )
+
+        print(f"{'сценарий':<8} {'без метрик':>12} {'с метриками':>12} {'разница':>14}")
+        for name, template in PATHS.items():
+            request_path = template.format(user_id=user_id)
+            medians = measure(apps, request_path, args.requests, args.warmup)
+            delta = medians["on"] - medians["off"]
+            print(
+                f"{name:<8} {medians['off']:>9.1f} us {medians['on']:>9.1f} us "
+                f"{delta:>+7.1f} us {delta / medians['off']:>+5.1%}"
+            )
+
+        for app in apps.values():
+            with app.app_context():
+                for engine in db.engines.values():
+                    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Микробенчмарк валидации пользователей.
+
+Сравнивает:
+- legacy: прежние хуки схем (re.match с некомпилированным паттерном и
+  список временных доменов, собираемый на каждый вызов и просматриваемый
+  линейно) — с тем же набором доменов, что и остальные варианты;
+- schema: UserCreateSchema(many=True).validate с общими валидаторами;
+- validate_many: пакетная проверка без marshmallow.
+
+Запуск: python -m benchmarks.bench_validation [--records 10000] [--domains 5000]
+"""
+import argparse
+import re
+import time
+
+from app.schemas.user_schema import UserCreateSchema
+from app.schemas.validators import DomainBlocklist, set_blocklist, validate_many
+
+
+def make_records(count: int) -> list:
+    records = []
+    for i in range(count):
+        if i % 10 == 0:
+            records.append({"name": "Bad_Name", "email": f"user{i}@tempmail.com"})
+        else:
+            records.append({"name": "Иван Иванов", "email": f"user{i}@example.com"})
+    return records
+
+
+def legacy_validate(records: list, domains: list) -> dict:
+    """Копия прежней логики хуков validate_name / validate_email."""
+    errors = {}
+    for index, record in enumerate(records):
+        record_errors = {}
+        if not re.match(r"^[а-яА-ЯёЁa-zA-Z\s\-]{2,100}$", record["name"].strip()):
+            record_errors["name"] = ["Имя может содержать только буквы, пробелы и дефисы"]
+        disposable_domains = list(domains)
+        domain = record["email"].split("@")[1].lower()
+        if domain in disposable_domains:
+            record_errors["email"] = ["Временные email адреса не разрешены"]
+        if record_errors:
+            errors[index] = record_errors
+    return errors
+
+
+def timed(func, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--domains", type=int, default=5000)
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+    domains = ["tempmail.com"] + [f"disposable{i}.example" for i in range(args.domains)]
+    set_blocklist(DomainBlocklist(domains))
+
+    schema = UserCreateSchema(many=True)
+    results = {
+        "legacy hooks only": timed(legacy_validate, records, domains),
+        "UserCreateSchema(many=True)": timed(schema.validate, records),
+        "validate_many": timed(validate_many, records),
+    }
+
+    print(f"{args.records} записей, {len(domains)} временных доменов")
+    for name, seconds in results.items():
+        rate = args.records / seconds
+        print(f"  {name:<30} {seconds * 1000:8.1f} ms  {rate:12,.0f} записей/с")
+
+
+if __name__ == "__main__":
+    main()
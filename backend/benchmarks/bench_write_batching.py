@@ -0,0 +1,99 @@
+"""
+Пропускная способность записи с групповой фиксацией (USERS_WRITE_BATCHING) и без.
+
+--clients потоков одновременно создают, переименовывают и мягко удаляют
+пользователей через UserService (как gunicorn --threads с --clients
+потоками). Без пакетирования каждая операция — своя транзакция: COMMIT
+(fsync при SQLITE_SYNCHRONOUS=FULL) и ожидание блокировки записи SQLite;
+с пакетированием параллельные операции фиксируются одним COMMIT.
+
+Запуск: python -m benchmarks.bench_write_batching [--clients 50] [--requests 20]
+        [--synchronous FULL] [--window-ms 0] [--batch-size 64]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.services.user_service import UserService
+from app.services.write_batcher import get_write_batcher
+
+
+def make_app(path: str, args, batching: bool):
+    return create_app(
+        "testing",
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+            "SQLALCHEMY_ENGINE_OPTIONS": {"pool_size": args.clients, "max_overflow": 0},
+            "SQLITE_SYNCHRONOUS": args.synchronous,
+            "USERS_WRITE_BATCHING": batching,
+            "USERS_WRITE_BATCH_WINDOW_MS": args.window_ms,
+            "USERS_WRITE_BATCH_SIZE": args.batch_size,
+        },
+    )
+
+
+def run(app, clients: int, requests: int) -> tuple:
+    """(секунды, операций, COMMIT'ов): каждый клиент — requests циклов create/update/delete."""
+    commits = []
+    event.listen(db.engine, "commit", lambda conn: commits.append(1))
+    barrier = threading.Barrier(clients + 1)
+
+    def client(number: int) -> None:
+        with app.app_context():
+            barrier.wait()
+            for i in range(requests):
+                user = UserService.create_user("Bench User", f"c{number}-{i}@example.com")
+                UserService.update_user(user.id, name="Renamed User")
+                UserService.delete_user(user.id)
+            db.session.remove()
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, clients * requests * 3, len(commits)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--synchronous", default="FULL")
+    parser.add_argument("--window-ms", type=float, default=0.0)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, batching in (("без пакетирования", False), ("group commit", True)):
+            app = make_app(os.path.join(tmp, f"{batching}.db"), args, batching)
+            with app.app_context():
+                db.create_all()
+                results[name] = run(app, args.clients, args.requests)
+                if batching:
+                    get_write_batcher().close()
+                db.engine.dispose()
+
+    print(
+        f"{args.clients} клиентов x {args.requests} циклов create/update/delete, "
+        f"synchronous={args.synchronous}, окно {args.window_ms:g} ms, "
+        f"пакет до {args.batch_size}"
+    )
+    for name, (seconds, operations, commits) in results.items():
+        print(
+            f"  {name:<18} {seconds:7.2f} s  {operations / seconds:8,.0f} операций/с  "
+            f"{commits:6} COMMIT"
+        )
+
+
+if __name__ == "__main__":
+    main()
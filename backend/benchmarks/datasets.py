@@ -0,0 +1,178 @@
+"""
+Синтетические наборы пользователей для нагрузочных тестов (10k — 10M).
+
+Строки вставляются Core-executemany пачками; поисковый индекс снимается
+на время загрузки и строится одним проходом в конце (триггеры FTS на
+каждую строку замедляют вставку в разы). Готовый SQLite-файл кэшируется
+в --data-dir и переиспользуется между прогонами.
+
+Запуск: python -m benchmarks.datasets --users 1000000 [--data-dir benchmarks/.data]
+"""
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime, timedelta, UTC
+from typing import Dict, Iterator, List
+
+import sqlalchemy
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.user_search import install_search_index, uninstall_search_index
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(__file__), ".data")
+
+BATCH_SIZE = 10_000
+
+# Доля мягко удалённых пользователей
+INACTIVE_RATIO = 0.05
+
+FIRST_NAMES = (
+    "Иван", "Мария", "Алексей", "Елена", "Дмитрий", "Анна", "Сергей", "Ольга",
+    "Павел", "Наталья", "John", "Emma", "Oliver", "Sophia", "Lucas", "Mia",
+)
+LAST_NAMES = (
+    "Иванов", "Петрова", "Сидоров", "Смирнова", "Козлов", "Волкова", "Морозов",
+    "Новикова", "Smith", "Johnson", "Brown", "Taylor", "Miller", "Wilson",
+)
+DOMAINS = ("example.com", "example.org", "mail.example", "corp.example")
+
+# Слова для поисковых запросов (встречаются в именах и email)
+SEARCH_TERMS = ("Иван", "Петров", "smith", "emma", "corp", "user12", "Волк", "mia")
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def generate_users(count: int, seed: int = 42) -> Iterator[Dict]:
+    """Детерминированный поток записей users (id присваивает БД)."""
+    rnd = random.Random(seed)
+    for i in range(count):
+        first = FIRST_NAMES[rnd.randrange(len(FIRST_NAMES))]
+        last = LAST_NAMES[rnd.randrange(len(LAST_NAMES))]
+        # Несколько пользователей на секунду — есть совпадения created_at
+        created_at = BASE_TIME + timedelta(seconds=i // 3)
+        yield {
+            "name": f"{first} {last}",
+            "email": f"user{i}.{rnd.randrange(10_000)}@{DOMAINS[i % len(DOMAINS)]}",
+            "is_active": rnd.random() >= INACTIVE_RATIO,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+
+def schema_tag() -> str:
+    """Короткий хэш DDL таблицы users: набор пересоздаётся при смене схемы или индексов."""
+    engine = sqlalchemy.create_engine("sqlite://")
+    with engine.begin() as connection:
+        User.__table__.create(connection)
+        ddl = connection.exec_driver_sql(
+            "SELECT sql FROM sqlite_master WHERE tbl_name = 'users' AND sql IS NOT NULL "
+            "ORDER BY name"
+        ).scalars().all()
+    engine.dispose()
+    return hashlib.sha1("\n".join(ddl).encode("utf-8")).hexdigest()[:8]
+
+
+def dataset_path(size: int, data_dir: str = DEFAULT_DATA_DIR) -> str:
+    return os.path.join(data_dir, f"users_{size}_{schema_tag()}.db")
+
+
+def make_app(database_url: str):
+    """Приложение с профилем production поверх заданной БД."""
+    return create_app(
+        "production",
+        {"SECRET_KEY": "benchmark", "SQLALCHEMY_DATABASE_URI": database_url},
+    )
+
+
+def populate(database_url: str, size: int, seed: int = 42) -> int:
+    """Создать схему и догрузить пользователей до size; вернуть их число."""
+    app = make_app(database_url)
+    table = User.__table__
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            existing = connection.scalar(db.select(db.func.count()).select_from(table))
+            if existing >= size:
+                install_search_index(connection)
+                return existing
+            if existing:
+                raise RuntimeError(
+                    f"В БД уже {existing} пользователей: нужна пустая БД или >= {size}"
+                )
+            uninstall_search_index(connection)
+
+        started = time.perf_counter()
+        batch: List[Dict] = []
+        inserted = 0
+        for row in generate_users(size, seed):
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                inserted += _insert(table, batch)
+                batch = []
+                print(f"\r  {inserted:,} / {size:,}", end="", flush=True)
+        if batch:
+            inserted += _insert(table, batch)
+
+        with db.engine.begin() as connection:
+            install_search_index(connection)
+        print(f"\r  {inserted:,} пользователей за {time.perf_counter() - started:.1f} s")
+        db.engine.dispose()
+    return inserted
+
+
+def _insert(table, rows: List[Dict]) -> int:
+    with db.engine.begin() as connection:
+        connection.execute(table.insert(), rows)
+    return len(rows)
+
+
+def ensure_dataset(size: int, data_dir: str = DEFAULT_DATA_DIR, seed: int = 42) -> str:
+    """Путь к закэшированному SQLite-набору размера size (создаётся при отсутствии)."""
+    path = dataset_path(size, data_dir)
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        print(f"Генерация набора {size:,} пользователей -> {path}")
+        populate(f"sqlite:///{tmp_path}", size, seed)
+        # Переносим WAL в основной файл, затем атомарно публикуем набор
+        with closing(sqlite3.connect(tmp_path)) as connection:
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            connection.execute("PRAGMA journal_mode = DELETE")
+        os.replace(tmp_path, path)
+    return path
+
+
+def working_copy(path: str, target: str) -> str:
+    """Копия набора для прогона (нагрузка с записью меняет данные)."""
+    with closing(sqlite3.connect(path)) as src, closing(sqlite3.connect(target)) as dst:
+        src.backup(dst)
+    return target
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--database-url",
+        help="Заполнить указанную БД вместо SQLite-файла в --data-dir",
+    )
+    args = parser.parse_args()
+
+    if args.database_url:
+        populate(args.database_url, args.users, args.seed)
+    else:
+        print(ensure_dataset(args.users, args.data_dir, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Нагрузочный прогон API пользователей.
+
+Гоняет сценарии по всем эндпоинтам app/routes/users.py (список: первая и
+глубокие страницы, курсор, поиск; get, create, update, delete) с заданной
+конкурентностью и считает p50/p95/p99, запросы в секунду и число
+SQL-операторов на запрос.
+
+По умолчанию приложение поднимается в процессе (профиль production) поверх
+копии синтетического набора из benchmarks.datasets; с --base-url запросы
+идут по HTTP в запущенный сервер (тогда без подсчёта SQL — данные для
+выборки id читаются из --database-url).
+
+Результат пишется в JSON (--output) и сравнивается с baseline (--baseline):
+при регрессии код выхода 1. --save-baseline перезаписывает baseline.
+
+Запуск: python -m benchmarks.load [--users 10000] [--concurrency 8]
+        [--requests 200] [--scenarios list,get] [--baseline benchmarks/baseline.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import sqlalchemy
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models.user import User
+from app.utils.pagination import encode_cursor
+from benchmarks import datasets, report
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Сколько строк брать из БД для случайного выбора id и курсоров
+SAMPLE_SIZE = 20_000
+
+PER_PAGE = 20
+
+UPDATE_NAMES = ("Обновлённый Пользователь", "Updated User", "Анна Новикова")
+
+
+@dataclass
+class Scenario:
+    name: str
+    # rnd -> (метод, путь, JSON-тело)
+    build: Callable[[random.Random], Tuple[str, str, Optional[Dict[str, Any]]]]
+    expected: Tuple[int, ...] = (200,)
+
+
+class Sample:
+    """Данные для генерации запросов: id активных пользователей и позиции."""
+
+    def __init__(self, ids: List[int], positions: List[Tuple[datetime, int]], total: int):
+        rnd = random.Random(7)
+        ids = list(ids)
+        rnd.shuffle(ids)
+        # Удаляемые id не пересекаются с остальными сценариями
+        split = len(ids) // 2
+        self.read_ids = ids[:split]
+        self.delete_ids = ids[split:]
+        self.positions = positions
+        self.total = total
+        self._delete_lock = threading.Lock()
+
+    @classmethod
+    def from_database(cls) -> "Sample":
+        total = db.session.scalar(
+            db.select(db.func.count(User.id)).where(User.active())
+        )
+        rows = db.session.execute(
+            db.select(User.id, User.created_at)
+            .where(User.active())
+            .order_by(db.func.random())
+            .limit(SAMPLE_SIZE)
+        ).all()
+        return cls([r.id for r in rows], [(r.created_at, r.id) for r in rows], total)
+
+    def next_delete_id(self) -> Optional[int]:
+        with self._delete_lock:
+            return self.delete_ids.pop() if self.delete_ids else None
+
+
+def build_scenarios(sample: Sample, run_id: str) -> List[Scenario]:
+    pages = max(1, sample.total // PER_PAGE)
+    created = itertools.count()
+
+    def list_first(rnd):
+        return "GET", f"/api/users?per_page={PER_PAGE}", None
+
+    def list_deep(rnd):
+        # Вторая половина ленты: OFFSET-пагинация на глубине
+        page = rnd.randint(max(1, pages // 2), pages)
+        return "GET", f"/api/users?page={page}&per_page={PER_PAGE}", None
+
+    def list_cursor(rnd):
+        created_at, user_id = rnd.choice(sample.positions)
+        cursor = encode_cursor(created_at, user_id)
+        return "GET", f"/api/users?limit={PER_PAGE}&cursor={cursor}", None
+
+    def search(rnd):
+        term = rnd.choice(datasets.SEARCH_TERMS)
+        return "GET", f"/api/users?search={urllib.request.quote(term)}&per_page={PER_PAGE}", None
+
+    def get(rnd):
+        return "GET", f"/api/users/{rnd.choice(sample.read_ids)}", None
+
+    def create(rnd):
+        n = next(created)
+        body = {"name": "Нагрузочный Тест", "email": f"load-{run_id}-{n}@example.com"}
+        return "POST", "/api/users", body
+
+    def update(rnd):
+        body = {"name": rnd.choice(UPDATE_NAMES)}
+        return "PUT", f"/api/users/{rnd.choice(sample.read_ids)}", body
+
+    def delete(rnd):
+        user_id = sample.next_delete_id()
+        if user_id is None:
+            raise RuntimeError("Закончились id для удаления: уменьшите --requests")
+        return "DELETE", f"/api/users/{user_id}", None
+
+    return [
+        Scenario("list_first", list_first),
+        Scenario("list_deep", list_deep),
+        Scenario("list_cursor", list_cursor),
+        Scenario("search", search),
+        Scenario("get", get),
+        Scenario("create", create, expected=(201,)),
+        Scenario("update", update),
+        Scenario("delete", delete),
+    ]
+
+
+class InProcessClient:
+    """Запросы через Flask test client; SQL считается по событиям движков."""
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.statements = 0
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        with self._lock:
+            self.statements += 1
+
+    def sql_statements(self) -> Optional[int]:
+        return self.statements
+
+    def reset(self) -> None:
+        with self._lock:
+            self.statements = 0
+
+    def request(self, method: str, path: str, body: Optional[Dict]) -> int:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        return client.open(path, method=method, json=body).status_code
+
+
+class HttpClient:
+    """Запросы по HTTP в запущенный сервер (SQL не считается)."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+
+    def sql_statements(self) -> Optional[int]:
+        return None
+
+    def reset(self) -> None:
+        pass
+
+    def request(self, method: str, path: str, body: Optional[Dict]) -> int:
+        data = None
+        headers = {}
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        req = urllib.request.Request(
+            self.base_url + path, data=data, method=method, headers=headers
+        )
+        try:
+            with urllib.request.urlopen(req) as resp:
+                resp.read()
+                return resp.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+def run_scenario(
+        client,
+        scenario: Scenario,
+        requests: int,
+        concurrency: int,
+        warmup: int,
+        seed: int = 0,
+) -> Dict[str, Any]:
+    rnd_lock = threading.Lock()
+    rnd = random.Random(seed)
+
+    def one(_):
+        with rnd_lock:
+            method, path, body = scenario.build(rnd)
+        start = time.perf_counter()
+        status = client.request(method, path, body)
+        return time.perf_counter() - start, status
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(warmup)))
+        client.reset()
+        started = time.perf_counter()
+        outcomes = list(pool.map(one, range(requests)))
+        elapsed = time.perf_counter() - started
+
+    errors = sum(1 for _, status in outcomes if status not in scenario.expected)
+    return report.summarize(
+        [latency for latency, _ in outcomes], elapsed, errors, client.sql_statements()
+    )
+
+
+def run(
+        app,
+        client,
+        scenarios: Optional[List[str]] = None,
+        requests: int = 200,
+        concurrency: int = 8,
+        warmup: int = 20,
+) -> Dict[str, Any]:
+    """Прогнать сценарии; вернуть результаты в формате JSON-отчёта."""
+    with app.app_context():
+        sample = Sample.from_database()
+        db.session.remove()
+
+    run_id = datetime.now(UTC).strftime("%Y%m%d%H%M%S%f")
+    selected = [
+        s for s in build_scenarios(sample, run_id)
+        if not scenarios or s.name in scenarios
+    ]
+    results = {}
+    for index, scenario in enumerate(selected):
+        results[scenario.name] = run_scenario(
+            client, scenario, requests, concurrency, warmup, seed=index
+        )
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "users": sample.total,
+            "requests": requests,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "mode": "http" if isinstance(client, HttpClient) else "in-process",
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+        },
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenarios", help="Через запятую (по умолчанию все)")
+    parser.add_argument("--data-dir", default=datasets.DEFAULT_DATA_DIR)
+    parser.add_argument("--base-url", help="HTTP-режим: адрес запущенного сервера")
+    parser.add_argument("--database-url", help="БД для HTTP-режима (выборка id)")
+    parser.add_argument(
+        "--output", default=os.path.join(datasets.DEFAULT_DATA_DIR, "results.json")
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=report.DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    scenarios = args.scenarios.split(",") if args.scenarios else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.base_url:
+            if not args.database_url:
+                parser.error("--base-url требует --database-url")
+            app = datasets.make_app(args.database_url)
+            client = HttpClient(args.base_url)
+        else:
+            path = datasets.ensure_dataset(args.users, args.data_dir)
+            copy = datasets.working_copy(path, os.path.join(tmp, "users.db"))
+            app = datasets.make_app(f"sqlite:///{copy}")
+            client = InProcessClient(app)
+
+        results = run(
+            app, client, scenarios, args.requests, args.concurrency, args.warmup
+        )
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+    report.save(results, args.output)
+    report.print_results(results)
+    print(f"Результаты: {args.output}")
+
+    if args.save_baseline:
+        report.save(results, args.baseline)
+        print(f"Baseline обновлён: {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        rows = report.compare(results, report.load(args.baseline), args.tolerance)
+        report.print_comparison(rows)
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Сводка замеров нагрузочного прогона и сравнение с baseline."""
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+# Метрики, рост которых — регрессия; и те, где регрессия — падение
+HIGHER_IS_WORSE = ("p50_ms", "p95_ms", "p99_ms", "sql_per_request")
+LOWER_IS_WORSE = ("rps",)
+
+DEFAULT_TOLERANCE = 0.20
+
+# SQL на запрос сравнивается в абсолютных единицах: доли — это попадания
+# в кэш, которые зависят от случайной выборки id
+SQL_TOLERANCE = 0.1
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Перцентиль с линейной интерполяцией (как numpy.percentile)."""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def summarize(
+        latencies: List[float],
+        elapsed: float,
+        errors: int,
+        sql_statements: Optional[int],
+) -> Dict[str, Any]:
+    """Итог сценария: latencies — секунды на запрос, elapsed — время сценария."""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if count else 0.0,
+        "sql_per_request": (
+            round(sql_statements / count, 2)
+            if sql_statements is not None and count else None
+        ),
+    }
+
+
+def compare(
+        results: Dict[str, Any],
+        baseline: Dict[str, Any],
+        tolerance: float = DEFAULT_TOLERANCE,
+) -> List[Dict[str, Any]]:
+    """
+    Сравнить сценарии с baseline; вернуть строки сравнения.
+    regression=True, если метрика ухудшилась больше чем на tolerance
+    (для SQL на запрос — при росте больше SQL_TOLERANCE операторов).
+    """
+    rows = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        for metric in HIGHER_IS_WORSE + LOWER_IS_WORSE:
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            if metric == "sql_per_request":
+                regression = new - old > SQL_TOLERANCE
+            elif metric in LOWER_IS_WORSE:
+                regression = change < -tolerance
+            else:
+                regression = change > tolerance
+            rows.append({
+                "scenario": name,
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": round(change, 4),
+                "regression": regression,
+            })
+    return rows
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(results: Dict[str, Any], path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    print(
+        f"{'сценарий':<16} {'запросов':>8} {'ошибок':>6} {'rps':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'SQL/запр':>9}"
+    )
+    for name, s in results["scenarios"].items():
+        sql = "-" if s["sql_per_request"] is None else f"{s['sql_per_request']:.2f}"
+        print(
+            f"{name:<16} {s['requests']:>8} {s['errors']:>6} {s['rps']:>9.1f} "
+            f"{s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f} {sql:>9}"
+        )
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    regressions = [row for row in rows if row["regression"]]
+    if not regressions:
+        print("Регрессий относительно baseline нет")
+        return
+    print("Регрессии относительно baseline:")
+    for row in regressions:
+        print(
+            f"  {row['scenario']:<16} {row['metric']:<16} "
+            f"{row['baseline']} -> {row['current']} ({row['change']:+.0%})"
+        )
@@ -0,0 +1,25 @@
+"""users search index (FTS5 trigram / pg_trgm)
+
+Revision ID: 3b1f6c2a9d40
+Revises: 7edfdaf36d5a
+Create Date: 2026-10-17 23:10:00.000000
+
+"""
+from alembic import op
+
+from app.models.user_search import install_search_index, uninstall_search_index
+
+
+# revision identifiers, used by Alembic.
+revision = '3b1f6c2a9d40'
+down_revision = '7edfdaf36d5a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    install_search_index(op.get_bind())
+
+
+def downgrade():
+    uninstall_search_index(op.get_bind())
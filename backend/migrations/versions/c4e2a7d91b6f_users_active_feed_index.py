@@ -0,0 +1,55 @@
+"""users active feed index (partial, covering); drop redundant indexes
+
+Revision ID: c4e2a7d91b6f
+Revises: 3b1f6c2a9d40
+Create Date: 2026-10-17 23:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e2a7d91b6f'
+down_revision = '3b1f6c2a9d40'
+branch_labels = None
+depends_on = None
+
+FEED_INDEX = 'ix_users_active_feed'
+
+# Индексы, которые заменяет частичный индекс ленты (или которые не
+# используются ни одним запросом: name ищется через FTS5 / pg_trgm)
+REDUNDANT_INDEXES = [
+    ('ix_users_is_active', ['is_active']),
+    ('ix_users_email_active', ['email', 'is_active']),
+    ('ix_users_created_at', ['created_at']),
+    ('ix_users_name', ['name']),
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    active = sa.text('is_active = true' if dialect == 'postgresql' else 'is_active = 1')
+    feed_key = [sa.text('created_at DESC'), sa.text('id DESC')]
+
+    if dialect == 'postgresql':
+        op.create_index(
+            FEED_INDEX, 'users', feed_key,
+            postgresql_include=['name', 'email', 'updated_at'],
+            postgresql_where=active,
+        )
+    else:
+        # SQLite: INCLUDE нет, столбцы ленты входят в ключ
+        op.create_index(
+            FEED_INDEX, 'users', feed_key + ['name', 'email', 'updated_at'],
+            sqlite_where=active,
+        )
+
+    for name, _ in REDUNDANT_INDEXES:
+        op.drop_index(name, table_name='users')
+
+
+def downgrade():
+    for name, columns in reversed(REDUNDANT_INDEXES):
+        op.create_index(name, 'users', columns, unique=False)
+    op.drop_index(FEED_INDEX, table_name='users')
@@ -0,0 +1,24 @@
+"""users updated_at index for the change feed
+
+Revision ID: e8d15f3b7a20
+Revises: c4e2a7d91b6f
+Create Date: 2026-10-18 10:20:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8d15f3b7a20'
+down_revision = 'c4e2a7d91b6f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Seek журнала изменений: WHERE (updated_at, id) > (?, ?) ORDER BY updated_at, id
+    op.create_index('ix_users_updated_at', 'users', ['updated_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_updated_at', table_name='users')
@@ -0,0 +1,47 @@
+import pytest
+
+from app.extensions import db
+from benchmarks import datasets, load, report
+
+
+def test_percentile_interpolates():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert report.percentile(values, 50) == pytest.approx(2.5)
+    assert report.percentile(values, 100) == 4.0
+    assert report.percentile([], 95) == 0.0
+
+
+def test_compare_flags_regressions():
+    baseline = {"scenarios": {"get": {
+        "p50_ms": 1.0, "p95_ms": 2.0, "p99_ms": 3.0, "rps": 100.0, "sql_per_request": 1.0,
+    }}}
+    results = {"scenarios": {"get": {
+        "p50_ms": 1.1, "p95_ms": 3.0, "p99_ms": 3.0, "rps": 70.0, "sql_per_request": 2.0,
+    }}}
+    flagged = {
+        row["metric"] for row in report.compare(results, baseline, tolerance=0.2)
+        if row["regression"]
+    }
+    assert flagged == {"p95_ms", "rps", "sql_per_request"}
+
+
+def test_load_run_smoke(tmp_path):
+    url = f"sqlite:///{tmp_path / 'users.db'}"
+    assert datasets.populate(url, 300) == 300
+
+    app = datasets.make_app(url)
+    client = load.InProcessClient(app)
+    results = load.run(app, client, requests=5, concurrency=2, warmup=0)
+
+    scenarios = results["scenarios"]
+    assert set(scenarios) == {
+        "list_first", "list_deep", "list_cursor", "search",
+        "get", "create", "update", "delete",
+    }
+    for name, summary in scenarios.items():
+        assert summary["requests"] == 5
+        assert summary["errors"] == 0, name
+        assert summary["sql_per_request"] > 0
+
+    with app.app_context():
+        db.engine.dispose()
@@ -0,0 +1,86 @@
+import gzip
+import json
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.services.user_service import UserService
+
+
+@pytest.fixture
+def client():
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        UserService.bulk_create_users(
+            [{"name": f"Пользователь {i}", "email": f"user{i}@example.com"} for i in range(100)]
+        )
+        yield app.test_client()
+        db.session.remove()
+        db.drop_all()
+
+
+def test_list_is_gzipped_with_weak_etag(client):
+    plain = client.get("/api/users?per_page=100")
+    resp = client.get("/api/users?per_page=100", headers={"Accept-Encoding": "gzip"})
+
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert int(resp.headers["Content-Length"]) < len(plain.data) / 5
+    assert gzip.decompress(resp.data) == plain.data
+
+    # Сжатый ответ — другие байты: ETag слабый, но ревалидация работает
+    etag, weak = resp.get_etag()
+    assert weak and etag == plain.get_etag()[0]
+    resp = client.get(
+        "/api/users?per_page=100",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": resp.headers["ETag"]},
+    )
+    assert resp.status_code == 304
+
+
+def test_negotiation_and_threshold(client):
+    # Без Accept-Encoding и с q=0 — без сжатия, но с Vary
+    resp = client.get("/api/users?per_page=100")
+    assert "Content-Encoding" not in resp.headers
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    resp = client.get("/api/users?per_page=100", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in resp.headers
+
+    # Один пользователь меньше порога: сильный ETag сохраняется для If-Match
+    resp = client.get("/api/users/1", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+    assert resp.get_etag()[1] is False
+
+
+@pytest.mark.parametrize("encoding, module", [("br", "brotli"), ("zstd", "zstandard")])
+def test_optional_encodings(client, encoding, module):
+    lib = pytest.importorskip(module)
+    resp = client.get(
+        "/api/users?per_page=100", headers={"Accept-Encoding": f"gzip;q=0.5, {encoding}"}
+    )
+    assert resp.headers["Content-Encoding"] == encoding
+    if encoding == "br":
+        body = lib.decompress(resp.data)
+    else:
+        body = lib.ZstdDecompressor().decompress(resp.data)
+    assert len(json.loads(body)["data"]) == 100
+
+
+def test_streamed_export_is_compressed(client):
+    resp = client.get(
+        "/api/users/export?format=ndjson", headers={"Accept-Encoding": "gzip"}
+    )
+    assert resp.is_streamed
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in resp.headers
+    lines = gzip.decompress(resp.data).decode("utf-8").splitlines()
+    assert len(lines) == 100
+
+
+def test_jsonify_is_compact_utf8(client):
+    resp = client.get("/api/users/999")
+    assert resp.status_code == 404
+    assert b"\n" not in resp.data.rstrip()
+    assert "Пользователь".encode("utf-8") in resp.data
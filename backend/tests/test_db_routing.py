@@ -0,0 +1,177 @@
+import sqlite3
+import time
+from contextlib import closing
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.utils.db_routing import PIN_COOKIE
+
+
+def copy_database(source, target):
+    # backup(), а не копирование файла: учитывает ещё не перенесённый WAL
+    with closing(sqlite3.connect(source)) as src, closing(sqlite3.connect(target)) as dst:
+        src.backup(dst)
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Primary-файл с двумя пользователями и его копии в роли реплик."""
+    primary = tmp_path / "primary.db"
+    seed = create_app("testing", {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{primary}"})
+    with seed.app_context():
+        client = seed.test_client()
+        for i in range(2):
+            client.post("/api/users", json={"name": "Seed User", "email": f"seed{i}@example.com"})
+        db.engine.dispose()
+
+    apps = []
+
+    def factory(replicas=1, window=5.0, **overrides):
+        binds = {}
+        for i in range(replicas):
+            path = tmp_path / f"replica_{i}.db"
+            copy_database(primary, path)
+            binds[f"replica_{i}"] = f"sqlite:///{path}"
+        app = create_app(
+            "testing",
+            {
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{primary}",
+                "SQLALCHEMY_BINDS": binds,
+                "REPLICA_READ_YOUR_WRITES_SECONDS": window,
+                **overrides,
+            },
+        )
+        apps.append(app)
+        return app
+
+    yield factory
+    for app in apps:
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+def emails(resp):
+    return {u["email"] for u in resp.get_json()["data"]}
+
+
+def client_reads(client):
+    return client.get("/api/system/replicas").get_json()["data"]["reads"]
+
+
+def test_reads_go_to_replica_writes_to_primary(make_app):
+    app = make_app()
+    writer, reader = app.test_client(), app.test_client()
+
+    resp = writer.post("/api/users", json={"name": "New User", "email": "new@example.com"})
+    assert resp.status_code == 201, resp.get_json()
+    new_id = resp.get_json()["data"]["id"]
+
+    # Другой клиент читает реплику, куда запись ещё не доехала
+    assert "new@example.com" not in emails(reader.get("/api/users"))
+    assert reader.get(f"/api/users/{new_id}").status_code == 404
+
+    # Писавший клиент в окне read-your-writes читает primary (и мимо кэша)
+    assert "new@example.com" in emails(writer.get("/api/users"))
+    assert writer.get(f"/api/users/{new_id}").status_code == 200
+
+
+def test_async_mode_reads_replica_and_honours_pin(make_app):
+    app = make_app(ASYNC_MODE=True)
+    writer, reader = app.test_client(), app.test_client()
+    before = client_reads(reader)
+
+    resp = writer.post("/api/users", json={"name": "New User", "email": "async@example.com"})
+    assert resp.status_code == 201, resp.get_json()
+    new_id = resp.get_json()["data"]["id"]
+
+    assert "async@example.com" not in emails(reader.get("/api/users"))
+    assert reader.get(f"/api/users/{new_id}").status_code == 404
+    assert client_reads(reader).get("replica_0", 0) > before.get("replica_0", 0)
+
+    # Окно read-your-writes: primary и мимо закэшированного 404
+    assert "async@example.com" in emails(writer.get("/api/users"))
+    assert writer.get(f"/api/users/{new_id}").status_code == 200
+
+
+def test_read_your_writes_pin_is_signed_cookie(make_app):
+    app = make_app()
+    writer, reader = app.test_client(), app.test_client()
+    writer.post("/api/users", json={"name": "New User", "email": "pin@example.com"})
+
+    # Тот же IP не даёт окна другому клиенту
+    forwarded = {"X-Forwarded-For": "10.13.0.1"}
+    assert "pin@example.com" not in emails(reader.get("/api/users", headers=forwarded))
+
+    # Поддельное или испорченное время записи игнорируется
+    forged = writer.get_cookie(PIN_COOKIE).value.rsplit(".", 1)[0] + ".forged"
+    reader.set_cookie(PIN_COOKIE, forged)
+    assert "pin@example.com" not in emails(reader.get("/api/users"))
+
+    # Подписанный cookie действует в любом воркере (экземпляре приложения)
+    other = make_app().test_client()
+    other.set_cookie(PIN_COOKIE, writer.get_cookie(PIN_COOKIE).value)
+    assert "pin@example.com" in emails(other.get("/api/users"))
+
+
+def test_lagging_replica_reads_are_not_cached(make_app):
+    app = make_app()
+    writer, reader = app.test_client(), app.test_client()
+    user_id = writer.post("/api/users", json={"name": "New User", "email": "lag@example.com"}).get_json()["data"]["id"]
+    seed_id = reader.get("/api/users").get_json()["data"][0]["id"]
+    writer.put(f"/api/users/{seed_id}", json={"name": "Renamed"})
+
+    # Реплика ещё не получила запись: ответы не кэшируются
+    assert reader.get(f"/api/users/{user_id}").status_code == 404
+    assert reader.get(f"/api/users/{seed_id}").get_json()["data"]["name"] == "Seed User"
+
+    with app.app_context():
+        db.engines["replica_0"].dispose()
+        copy_database(
+            app.config["SQLALCHEMY_DATABASE_URI"].removeprefix("sqlite:///"),
+            app.config["SQLALCHEMY_BINDS"]["replica_0"].removeprefix("sqlite:///"),
+        )
+    assert reader.get(f"/api/users/{user_id}").status_code == 200
+    assert reader.get(f"/api/users/{seed_id}").get_json()["data"]["name"] == "Renamed"
+
+
+def test_no_pin_without_replicas(make_app):
+    client = make_app(replicas=0).test_client()
+    resp = client.post("/api/users", json={"name": "New User", "email": "single@example.com"})
+    assert resp.status_code == 201
+    assert PIN_COOKIE not in resp.headers.get("Set-Cookie", "")
+
+
+def test_read_your_writes_window_expires(make_app):
+    client = make_app(window=0.2).test_client()
+    client.post("/api/users", json={"name": "New User", "email": "late@example.com"})
+    assert "late@example.com" in emails(client.get("/api/users"))
+
+    time.sleep(0.25)
+    assert "late@example.com" not in emails(client.get("/api/users"))
+
+
+def test_reads_spread_across_replicas(make_app):
+    client = make_app(replicas=2).test_client()
+    before = client.get("/api/system/replicas").get_json()["data"]
+    assert before["replicas"] == ["replica_0", "replica_1"]
+
+    for _ in range(4):
+        assert len(emails(client.get("/api/users"))) == 2
+
+    reads = client.get("/api/system/replicas").get_json()["data"]["reads"]
+    for key in ("replica_0", "replica_1"):
+        assert reads.get(key, 0) > before["reads"].get(key, 0)
+
+
+def test_update_reads_primary(make_app):
+    app = make_app()
+    writer, reader = app.test_client(), app.test_client()
+    user = writer.post("/api/users", json={"name": "New User", "email": "upd@example.com"}).get_json()["data"]
+
+    # Запись сама находит пользователя на primary, даже без окна клиента
+    resp = reader.put(f"/api/users/{user['id']}", json={"name": "Renamed"})
+    assert resp.status_code == 200
+    assert resp.get_json()["data"]["name"] == "Renamed"
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.asgi import STREAM_PATH, create_asgi_app
+from app.extensions import async_db, db
+from app.services.event_broker import get_event_broker
+from app.utils.db_pool import InstrumentedAsyncQueuePool
+from app.utils.exceptions import ServiceUnavailableException
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing", {
+        "USERS_STREAM_QUEUE_SIZE": 3,
+        "USERS_STREAM_REPLAY_SIZE": 5,
+        "USERS_STREAM_MAX_SUBSCRIBERS": 2000,
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def events(chunks):
+    """Имена событий из кадров SSE."""
+    return [
+        line.split(": ", 1)[1]
+        for line in b"".join(chunks).decode().splitlines()
+        if line.startswith("event: ")
+    ]
+
+
+def test_slow_subscriber_is_disconnected_or_dropped(app):
+    broker = get_event_broker()
+    slow = broker.subscribe()
+    slow.drain()
+    for i in range(4):
+        broker.publish("user.deleted", {"id": i})
+
+    # disconnect: поток закрыт, при переподключении с последним ID — reset
+    assert slow.drain() == [] and slow.closed and not broker._subscribers
+    resumed = broker.subscribe(f"{broker.epoch}-0")
+    assert events(resumed.drain()) == ["reset"]
+    resumed.close()
+
+    broker.overflow = "drop"
+    lossy = broker.subscribe()
+    lossy.drain()
+    for i in range(5):
+        broker.publish("user.deleted", {"id": i})
+    assert events(lossy.drain()) == ["reset"] + ["user.deleted"] * 3
+    assert not lossy.closed
+
+
+def test_resume_from_replay_ring(app):
+    broker = get_event_broker()
+    for i in range(7):
+        broker.publish("user.deleted", {"id": i})
+
+    # Продолжить можно, если пропущено не больше min(REPLAY_SIZE, QUEUE_SIZE)
+    assert events(broker.subscribe(f"{broker.epoch}-5").drain()) == ["user.deleted"] * 2
+    assert events(broker.subscribe(f"{broker.epoch}-7").drain()) == []
+    assert events(broker.subscribe(f"{broker.epoch}-4").drain()) == ["user.deleted"] * 3
+    assert events(broker.subscribe(f"{broker.epoch}-3").drain()) == ["reset"]
+    assert events(broker.subscribe("0123abcd-5").drain()) == ["reset"]
+
+    broker.max_subscribers = len(broker._subscribers)
+    with pytest.raises(ServiceUnavailableException):
+        broker.subscribe()
+
+
+def test_asgi_stream_without_thread_per_subscriber(app):
+    broker = get_event_broker()
+    asgi = create_asgi_app(app)
+
+    async def open_stream(disconnect):
+        sent = asyncio.Queue()
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        scope = {"type": "http", "method": "GET", "path": STREAM_PATH, "headers": []}
+        task = asyncio.ensure_future(asgi(scope, receive, sent.put))
+        assert (await sent.get())["status"] == 200
+        await sent.get()  # retry и ID начала
+        return task, sent
+
+    async def scenario():
+        disconnect = asyncio.Event()
+        threads = threading.active_count()
+        streams = [await open_stream(disconnect) for _ in range(1000)]
+        assert threading.active_count() == threads
+
+        # Публикация из потока обработчика запроса
+        await asyncio.to_thread(broker.publish, "user.deleted", {"id": 7})
+        bodies = [await asyncio.wait_for(sent.get(), 1) for _, sent in streams]
+        assert {message["body"] for message in bodies} == {
+            b'id: %s-1\nevent: user.deleted\ndata: {"id":7}\n\n' % broker.epoch.encode()
+        }
+
+        disconnect.set()
+        await asyncio.gather(*(task for task, _ in streams))
+        assert not broker._subscribers
+
+    asyncio.run(scenario())
+
+
+async def asgi_request(asgi, path, method="GET", json_body=None):
+    """Запрос через ASGI-приложение; вернуть отправленные сообщения."""
+    sent = []
+    headers = []
+    body = b""
+    if json_body is not None:
+        body = json.dumps(json_body).encode()
+        headers = [(b"content-type", b"application/json"),
+                   (b"content-length", str(len(body)).encode())]
+    messages = iter([{"type": "http.request", "body": body, "more_body": False}])
+
+    async def receive():
+        return next(messages, {"type": "http.disconnect"})
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": method, "path": path, "query_string": b"",
+        "headers": headers, "root_path": "", "http_version": "1.1", "scheme": "http",
+        "server": ("testserver", 80),
+    }
+    await asgi(scope, receive, send)
+    return sent
+
+
+def test_asgi_passes_other_requests_to_flask(app):
+    sent = asyncio.run(asgi_request(create_asgi_app(app), "/api/users"))
+    assert sent[0]["status"] == 200
+    assert json.loads(b"".join(m.get("body", b"") for m in sent[1:]))["success"] is True
+
+
+def test_asgi_runs_flask_requests_in_parallel():
+    app = create_app("testing", {"ASGI_WSGI_THREADS": 4})
+
+    @app.route("/test/slow")
+    def slow():
+        time.sleep(0.2)
+        return {"thread": threading.get_ident()}
+
+    asgi = create_asgi_app(app)
+
+    async def scenario():
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(asgi_request(asgi, "/test/slow") for _ in range(4)))
+        return responses, time.perf_counter() - start
+
+    responses, elapsed = asyncio.run(scenario())
+    assert [sent[0]["status"] for sent in responses] == [200] * 4
+    # По очереди в одном потоке было бы 0.8 s
+    assert elapsed < 0.5
+    threads = {json.loads(sent[1]["body"])["thread"] for sent in responses}
+    assert len(threads) == 4
+
+
+def test_asgi_serves_async_views_in_event_loop(tmp_path):
+    app = create_app("testing", {
+        "ASYNC_MODE": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'users.db'}",
+        "USER_CACHE_ENABLED": False,
+        # Через пул потоков WSGI запросы шли бы по одному
+        "ASGI_WSGI_THREADS": 1,
+    })
+
+    latency = {"seconds": 0.0}
+
+    def slow_statements(engine):
+        @event.listens_for(engine, "connect")
+        def _connect(dbapi_connection, _record):
+            # Ожидание «сети» в потоке aiosqlite: event loop не блокируется
+            dbapi_connection.await_(dbapi_connection._connection.set_trace_callback(
+                lambda _sql: time.sleep(latency["seconds"])
+            ))
+
+    async_db.on_engine(app, slow_statements)
+    asgi = create_asgi_app(app)
+
+    async def scenario():
+        created = await asgi_request(
+            asgi, "/api/users", "POST", {"name": "Async User", "email": "loop@example.com"}
+        )
+        latency["seconds"] = 0.2
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(asgi_request(asgi, "/api/users/1") for _ in range(4)))
+        elapsed = time.perf_counter() - start
+        pool = async_db.pool_engine(app).pool
+        await asgi({"type": "lifespan"}, iter_messages("lifespan.shutdown"), noop_send)
+        return created, responses, elapsed, pool
+
+    created, responses, elapsed, pool = asyncio.run(scenario())
+    assert created[0]["status"] == 201
+    assert [sent[0]["status"] for sent in responses] == [200] * 4
+    assert json.loads(responses[0][1]["body"])["data"]["email"] == "loop@example.com"
+    # По очереди было бы 0.8 s
+    assert elapsed < 0.6
+    # Соединения loop сервера — из пула, а не новое на каждый запрос
+    assert isinstance(pool, InstrumentedAsyncQueuePool)
+    assert pool.wait_stats.checkouts >= 5
+    # Пул закрыт при остановке сервера
+    assert app.extensions["async_db"]["loops"] == {}
+
+
+def iter_messages(*types):
+    messages = iter(types)
+
+    async def receive():
+        return {"type": next(messages)}
+
+    return receive
+
+
+async def noop_send(_message):
+    pass
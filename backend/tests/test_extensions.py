@@ -0,0 +1,92 @@
+import pytest
+
+from app import create_app
+from app.extensions import db, engine_options
+from app.utils.db_pool import InstrumentedQueuePool
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app(
+        "testing",
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'users.db'}",
+            "DB_POOL_SIZE": 2,
+            "DB_MAX_OVERFLOW": 1,
+        },
+    )
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_sqlite_file_profile_pragmas(app):
+    def pragma(name):
+        return db.session.execute(db.text(f"PRAGMA {name}")).scalar()
+
+    assert pragma("journal_mode") == "wal"
+    assert pragma("synchronous") == 1  # NORMAL
+    assert pragma("busy_timeout") == app.config["SQLITE_BUSY_TIMEOUT_MS"]
+    assert pragma("cache_size") == -app.config["SQLITE_CACHE_SIZE_KB"]
+
+
+def test_engine_options_by_backend():
+    config = create_app("testing").config
+    # In-memory SQLite: пул не настраиваем
+    assert engine_options(config) == {}
+
+    server = engine_options({**config, "SQLALCHEMY_DATABASE_URI": "postgresql://u@db/app"})
+    assert server["poolclass"] is InstrumentedQueuePool
+    assert server["pool_pre_ping"] is True
+    assert server["pool_recycle"] == config["DB_POOL_RECYCLE"]
+
+    sqlite_file = engine_options({**config, "SQLALCHEMY_DATABASE_URI": "sqlite:////tmp/x.db"})
+    assert "pool_pre_ping" not in sqlite_file
+
+
+def test_pool_stats_endpoint(app):
+    db.session.execute(db.text("SELECT 1"))
+    connection = db.engine.connect()
+    try:
+        resp = app.test_client().get("/api/system/pool")
+    finally:
+        connection.close()
+
+    assert resp.status_code == 200
+    stats = resp.get_json()["data"]["default"]
+    assert stats["pool"] == "InstrumentedQueuePool"
+    assert stats["size"] == 2
+    assert stats["checked_out"] == 2
+    assert stats["saturation"] == pytest.approx(2 / 3, abs=1e-3)
+    assert stats["checkouts"] >= 2
+    assert stats["timeouts"] == 0
+
+
+def test_cors_allows_conditional_requests():
+    client = create_app("testing").test_client()
+    origin = {"Origin": "http://localhost:3000"}
+
+    preflight = client.options("/api/users/1", headers={
+        **origin,
+        "Access-Control-Request-Method": "PUT",
+        "Access-Control-Request-Headers": "If-Match, If-None-Match",
+    })
+    allowed = preflight.headers["Access-Control-Allow-Headers"].lower()
+    assert "if-match" in allowed and "if-none-match" in allowed
+
+    response = client.get("/api/users/1", headers=origin)
+    assert "ETag" in response.headers["Access-Control-Expose-Headers"]
+
+    # Пакетное обновление PATCH /api/users
+    preflight = client.options("/api/users", headers={
+        **origin, "Access-Control-Request-Method": "PATCH",
+    })
+    assert "PATCH" in preflight.headers["Access-Control-Allow-Methods"]
+
+    preflight = client.options("/api/users/stream", headers={
+        **origin,
+        "Access-Control-Request-Method": "GET",
+        "Access-Control-Request-Headers": "Last-Event-ID",
+    })
+    assert "last-event-id" in preflight.headers["Access-Control-Allow-Headers"].lower()
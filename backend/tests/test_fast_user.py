@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.schemas.fast_user import serialize_rows, user_columns
+from app.schemas.user_schema import UserSchema
+from app.services.user_service import UserService
+from app.utils import fastjson
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_fast_serializer_matches_user_schema(app):
+    UserService.create_user(name="Анна Петрова", email="anna@example.com")
+    UserService.create_user(name="John Smith", email="john@example.com")
+    UserService.delete_user(2, soft_delete=True)
+
+    orm_users = User.query.order_by(User.id).all()
+    rows = db.session.execute(db.select(*user_columns()).order_by(User.id)).all()
+
+    assert serialize_rows(rows) == UserSchema(many=True).dump(orm_users)
+
+
+def test_list_endpoint_matches_user_schema(app):
+    for i in range(3):
+        UserService.create_user(name="Same Shape", email=f"shape{i}@example.com")
+
+    resp = app.test_client().get("/api/users")
+    expected = UserSchema(many=True).dump(
+        User.query.order_by(User.created_at.desc(), User.id.desc()).all()
+    )
+    assert resp.get_json()["data"] == expected
+
+
+def test_fastjson_is_compact_and_unicode():
+    body = fastjson.dumps({"name": "Иван", "ids": [1, 2]})
+    assert json.loads(body) == {"name": "Иван", "ids": [1, 2]}
+    assert b" " not in body
+    assert "Иван".encode("utf-8") in body
@@ -0,0 +1,158 @@
+import io
+import json
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.services.import_service import UserImporter
+from app.services.user_service import UserService
+from app.utils.exceptions import ConflictException
+from app.utils.query_analysis import count_queries
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def ndjson(*records):
+    return io.StringIO("\n".join(json.dumps(r) for r in records) + "\n")
+
+
+def test_import_csv_in_chunks(app):
+    data = io.StringIO(
+        "name,email\n"
+        "Анна Петрова,anna@example.com\n"
+        "Bad1,bad\n"
+        "Иван Иванов,ivan@example.com\n"
+        "Ivan Dup,IVAN@example.com\n"
+    )
+    chunks = []
+    stats = UserImporter(chunk_size=2, progress=lambda line, s: chunks.append(line)).run(
+        data, "csv"
+    )
+
+    assert chunks == [3, 5]
+    assert (stats.processed, stats.created, stats.invalid, stats.skipped) == (4, 2, 1, 1)
+    assert stats.errors[0]["line"] == 3
+    assert User.find_by_email("ivan@example.com").name == "Иван Иванов"
+
+
+def test_import_duplicate_policies(app):
+    UserService.create_user(name="Old Name", email="dup@example.com")
+
+    stats = UserImporter(on_duplicate="skip").run(
+        ndjson({"name": "New Name", "email": "dup@example.com"}), "ndjson"
+    )
+    assert stats.skipped == 1
+    assert User.find_by_email("dup@example.com").name == "Old Name"
+
+    stats = UserImporter(on_duplicate="update").run(
+        ndjson({"name": "New Name", "email": "dup@example.com"}), "ndjson"
+    )
+    assert stats.updated == 1
+    db.session.expire_all()
+    assert User.find_by_email("dup@example.com").name == "New Name"
+
+    with pytest.raises(ConflictException):
+        UserImporter(on_duplicate="fail").run(
+            ndjson({"name": "Other Name", "email": "dup@example.com"}), "ndjson"
+        )
+
+
+def test_import_resumes_from_checkpoint(app, tmp_path):
+    checkpoint = tmp_path / "import.checkpoint"
+    records = [{"name": "User Name", "email": f"user{i}@example.com"} for i in range(5)]
+
+    def crash(line, stats):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        UserImporter(chunk_size=2, checkpoint_path=str(checkpoint), progress=crash).run(
+            ndjson(*records), "ndjson", source="users.ndjson"
+        )
+    assert json.loads(checkpoint.read_text())["line"] == 2
+
+    stats = UserImporter(chunk_size=2, checkpoint_path=str(checkpoint)).run(
+        ndjson(*records), "ndjson", source="users.ndjson"
+    )
+    assert stats.created == 5
+    assert stats.skipped == 0
+    assert not checkpoint.exists()
+
+
+def test_import_cli_command(app, tmp_path):
+    path = tmp_path / "users.ndjson"
+    path.write_text(
+        json.dumps({"name": "Cli User", "email": "cli@example.com"}) + "\n",
+        encoding="utf-8",
+    )
+
+    result = app.test_cli_runner().invoke(args=["users", "import", str(path)])
+    assert result.exit_code == 0, result.output
+    assert "создано 1" in result.output
+    assert User.find_by_email("cli@example.com") is not None
+
+
+def test_import_update_counts_each_row_once(app):
+    UserService.create_user(name="Old Name", email="old@example.com")
+    gone = UserService.create_user(name="Gone Name", email="gone@example.com")
+    UserService.delete_user(gone.id)
+
+    stats = UserImporter(on_duplicate="update").run(
+        ndjson(
+            {"name": "First Name", "email": "new@example.com"},
+            {"name": "Second Name", "email": "new@example.com"},
+            {"name": "New Name", "email": "old@example.com"},
+            {"name": "Back Name", "email": "gone@example.com"},
+        ),
+        "ndjson",
+    )
+
+    assert (stats.processed, stats.created, stats.updated, stats.skipped) == (4, 1, 2, 1)
+    assert stats.created + stats.updated + stats.skipped + stats.invalid == stats.processed
+    db.session.expire_all()
+    assert User.find_by_email("new@example.com").name == "Second Name"
+    # Мягко удалённый пользователь не изменён
+    assert db.session.get(User, gone.id).name == "Gone Name"
+
+
+def test_import_update_invalidates_raced_rows(app, monkeypatch):
+    bulk_create = UserService.bulk_create_users
+    raced = {}
+
+    def racing_bulk_create(items, **kwargs):
+        # Параллельная запись успевает вставить email между проверкой и INSERT
+        user = UserService.create_user(name="Raced Name", email="race@example.com")
+        UserService.get_user_data(user.id)
+        raced["id"] = user.id
+        return bulk_create(items, **kwargs)
+
+    monkeypatch.setattr(UserService, "bulk_create_users", racing_bulk_create)
+    stats = UserImporter(on_duplicate="update").run(
+        ndjson({"name": "Import Name", "email": "race@example.com"}), "ndjson"
+    )
+
+    assert (stats.created, stats.updated, stats.skipped) == (0, 1, 0)
+    assert UserService.get_user_data(raced["id"])["name"] == "Import Name"
+
+
+def test_import_chunk_looks_up_existing_emails_once(app):
+    UserService.create_user(name="Old Name", email="old@example.com")
+    records = [{"name": "User Name", "email": f"user{i}@example.com"} for i in range(3)]
+
+    with count_queries() as statements:
+        stats = UserImporter().run(
+            ndjson(*records, {"name": "Old Name", "email": "old@example.com"}), "ndjson"
+        )
+
+    assert (stats.created, stats.skipped) == (3, 1)
+    lookups = [s for s in statements if s.lstrip().startswith("SELECT") and "email IN" in s]
+    assert len(lookups) == 1
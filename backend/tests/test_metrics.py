@@ -0,0 +1,95 @@
+import re
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.utils.metrics import Histogram, reset_metrics
+
+
+@pytest.fixture
+def client():
+    reset_metrics()
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.session.remove()
+        db.drop_all()
+
+
+def test_server_timing_header(client):
+    client.post("/api/users", json={"name": "Metrics User", "email": "metrics@example.com"})
+
+    resp = client.get("/api/users?with_total=false")
+    header = resp.headers["Server-Timing"]
+    match = re.match(
+        r'db;dur=([\d.]+);desc="(\d+) queries", serialize;dur=([\d.]+), total;dur=([\d.]+)$',
+        header,
+    )
+    assert match, header
+    db_ms, statements, serialize_ms, total_ms = match.groups()
+    # Только страница: без total версия выборки для ETag не запрашивается
+    assert int(statements) == 1
+    assert float(serialize_ms) > 0
+    assert float(db_ms) + float(serialize_ms) <= float(total_ms)
+
+
+def test_metrics_endpoint(client):
+    client.get("/api/users")
+    client.get("/api/users/999")
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/plain"
+    text = resp.get_data(as_text=True)
+
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert (
+        'http_request_duration_seconds_count{endpoint="users.get_users",method="GET",status="200"} 1'
+        in text
+    )
+    assert (
+        'http_request_duration_seconds_count{endpoint="users.get_user",method="GET",status="404"} 1'
+        in text
+    )
+    assert 'http_request_db_statements_bucket{endpoint="users.get_users",le="2"} 1' in text
+
+
+def test_metrics_disabled():
+    app = create_app("testing", {"METRICS_ENABLED": False})
+    client = app.test_client()
+    assert "Server-Timing" not in client.get("/api/users").headers
+    assert client.get("/metrics").status_code == 404
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("h", "test", ("name",), (1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value, "x")
+
+    lines = list(histogram.render())
+    assert 'h_bucket{name="x",le="1"} 2' in lines
+    assert 'h_bucket{name="x",le="5"} 3' in lines
+    assert 'h_bucket{name="x",le="+Inf"} 4' in lines
+    assert 'h_sum{name="x"} 14.5' in lines
+    assert 'h_count{name="x"} 4' in lines
+
+
+def test_failed_statement_keeps_timings_balanced():
+    app = create_app("testing")
+
+    @app.get("/test/broken-sql")
+    def broken_sql():
+        with pytest.raises(Exception):
+            db.session.execute(db.text("SELECT * FROM missing_table"))
+        db.session.rollback()
+        db.session.execute(db.text("SELECT 1"))
+        return ""
+
+    with app.app_context():
+        header = app.test_client().get("/test/broken-sql").headers["Server-Timing"]
+        assert '"1 queries"' in header
+        # Отметка упавшего оператора не остаётся на соединении пула
+        with db.engine.connect() as conn:
+            assert not conn.info.get("metrics_query_start")
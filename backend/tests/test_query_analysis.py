@@ -0,0 +1,135 @@
+import logging
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.services.user_service import UserService
+from app.utils.exceptions import NotFoundException
+from app.utils.query_analysis import assert_max_queries, statement_shape
+
+
+@pytest.fixture
+def app():
+    app = create_app(
+        "testing",
+        {"QUERY_ANALYSIS": True, "QUERY_EXPLAIN": True, "USER_CACHE_ENABLED": False},
+    )
+
+    @app.get("/test/lookup-missing")
+    def lookup_missing():
+        # Поштучные чтения в цикле — типичный N+1
+        for user_id in (101, 102, 103):
+            try:
+                UserService.get_user_data(user_id)
+            except NotFoundException:
+                pass
+        return {"success": True}
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def test_query_budget_per_endpoint(client):
+    # INSERT ... RETURNING; занятый email отсекает уникальный индекс
+    with assert_max_queries(1) as statements:
+        resp = client.post("/api/users", json={"name": "Budget User", "email": "budget@example.com"})
+    user_id = resp.get_json()["data"]["id"]
+    insert = statement_shape(statements[0])
+    assert insert.startswith("INSERT INTO users") and "RETURNING" in insert
+    assert "ON CONFLICT" not in insert
+
+    # Версия для ETag (заодно даёт total) + страница
+    with assert_max_queries(2):
+        assert client.get("/api/users").status_code == 200
+    with assert_max_queries(1):
+        assert client.get(f"/api/users/{user_id}").status_code == 200
+    # UPDATE ... RETURNING и DELETE (мягкое: UPDATE ... RETURNING) — по одному оператору
+    with assert_max_queries(1) as statements:
+        assert client.put(f"/api/users/{user_id}", json={"name": "Renamed User"}).status_code == 200
+    assert statement_shape(statements[0]).startswith("UPDATE users")
+    with assert_max_queries(1) as statements:
+        assert client.delete(f"/api/users/{user_id}").status_code == 200
+    assert statement_shape(statements[0]).startswith("UPDATE users")
+    assert "RETURNING" in statements[0]
+
+
+def test_lookup_is_one_query_per_chunk(app, client):
+    UserService.bulk_create_users(
+        [{"name": "Lookup User", "email": f"lookup{i}@example.com"} for i in range(600)]
+    )
+    app.config["USERS_LOOKUP_CHUNK_SIZE"] = 500
+    ids = list(range(1, 701))
+    with assert_max_queries(2):
+        resp = client.post("/api/users/lookup", json={"ids": ids})
+    assert resp.get_json()["metadata"]["found"] == 600
+
+
+@pytest.mark.parametrize("returning, budget", [(True, 2), (False, 4)])
+def test_bulk_delete_is_set_based(app, client, returning, budget):
+    UserService.bulk_create_users(
+        [{"name": "Bulk User", "email": f"bulk{i}@example.com"} for i in range(600)]
+    )
+    app.config.update(USERS_BULK_CHUNK_SIZE=500, USERS_WRITE_RETURNING=returning)
+    # По оператору на чанк (без RETURNING — ещё SELECT совпавших ID)
+    with assert_max_queries(budget):
+        resp = client.delete("/api/users", json={"ids": list(range(1, 701))})
+    assert resp.get_json()["metadata"]["deleted"] == 600
+
+
+def test_assert_max_queries_lists_statements(client):
+    with pytest.raises(AssertionError, match="не больше 0 SQL-операторов, выполнено 1"):
+        with assert_max_queries(0):
+            client.get("/api/users/1")
+
+
+def test_repeated_statements_are_flagged(client, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.queries"):
+        client.get("/test/lookup-missing")
+        client.get("/api/users/1")
+
+    repeats = [r.getMessage() for r in caplog.records if "Повтор SQL" in r.getMessage()]
+    assert len(repeats) == 1
+    assert "GET /test/lookup-missing: 3 раз" in repeats[0]
+    assert "UserService.get_user_data" in repeats[0]
+
+
+def test_slow_query_log_with_plan(caplog):
+    # Порог 0: медленным считается каждый оператор
+    slow_app = create_app(
+        "testing", {"QUERY_ANALYSIS": True, "QUERY_EXPLAIN": True, "SLOW_QUERY_MS": 0}
+    )
+    with slow_app.app_context(), caplog.at_level(logging.WARNING, logger="app.queries"):
+        db.create_all()
+        with pytest.raises(NotFoundException):
+            UserService.get_user_by_id(42)
+
+    slow = [r.getMessage() for r in caplog.records if "Медленный SQL" in r.getMessage()]
+    assert slow
+    message = slow[-1]
+    assert "(UserService._get_user)" in message
+    assert "параметры: (42, 1, 0)" in message
+    assert "План:\n  SEARCH users USING INTEGER PRIMARY KEY" in message
+
+
+def test_statement_shape_ignores_in_list_length():
+    assert statement_shape("SELECT id FROM users WHERE id IN (?, ?)") == statement_shape(
+        "SELECT  id FROM users\n WHERE id IN (?, ?, ?, ?)"
+    )
+
+
+def test_failed_statement_does_not_leak_start(app):
+    with pytest.raises(Exception):
+        db.session.execute(db.text("SELECT * FROM missing_table"))
+    db.session.rollback()
+
+    with db.engine.connect() as conn:
+        assert not conn.info.get("query_analysis_start")
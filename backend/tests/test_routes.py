@@ -1,12 +1,23 @@
+import csv
+import io
+import json
+
 import pytest
 
 from app import create_app
 from app.extensions import db
 
 
-@pytest.fixture
-def client():
-    app = create_app("testing")
+@pytest.fixture(params=["sync", "async"])
+def client(request, tmp_path):
+    # Каждый тест гоняется в обоих режимах; async-движку нужна файловая БД
+    overrides = None
+    if request.param == "async":
+        overrides = {
+            "ASYNC_MODE": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'users.db'}",
+        }
+    app = create_app("testing", overrides)
     with app.app_context():
         db.create_all()
         yield app.test_client()
@@ -38,3 +49,395 @@ def test_get_users_endpoint(client):
     assert data["success"] is True
     assert isinstance(data["data"], list)
     assert len(data["data"]) >= 1
+
+
+def test_get_users_cursor_pagination(client):
+    for i in range(5):
+        client.post(
+            "/api/users",
+            json={"name": "Cursor User", "email": f"cursor{i}@example.com"},
+        )
+
+    resp = client.get("/api/users?limit=2")
+    assert resp.status_code == 200
+    first = resp.get_json()
+    assert [u["email"] for u in first["data"]] == [
+        "cursor4@example.com",
+        "cursor3@example.com",
+    ]
+    assert first["metadata"]["has_next"] is True
+    assert first["metadata"]["prev_cursor"] is None
+
+    # Идём вперёд до конца
+    seen = [u["email"] for u in first["data"]]
+    cursor = first["metadata"]["next_cursor"]
+    while cursor:
+        page = client.get(f"/api/users?limit=2&cursor={cursor}").get_json()
+        seen.extend(u["email"] for u in page["data"])
+        last_page = page
+        cursor = page["metadata"]["next_cursor"]
+    assert seen == [f"cursor{i}@example.com" for i in range(4, -1, -1)]
+
+    # И обратно на предыдущую страницу
+    prev = client.get(
+        f"/api/users?limit=2&cursor={last_page['metadata']['prev_cursor']}"
+    ).get_json()
+    assert [u["email"] for u in prev["data"]] == [
+        "cursor2@example.com",
+        "cursor1@example.com",
+    ]
+
+
+def test_get_users_invalid_cursor(client):
+    resp = client.get("/api/users?cursor=not-a-cursor")
+    assert resp.status_code == 400
+    assert "cursor" in resp.get_json()["details"]
+
+
+def test_sparse_fieldsets(client):
+    for i in range(3):
+        client.post("/api/users", json={"name": "Sparse User", "email": f"sparse{i}@example.com"})
+
+    resp = client.get("/api/users?fields=name,id")
+    assert resp.status_code == 200
+    assert [list(u) for u in resp.get_json()["data"]] == [["id", "name"]] * 3
+
+    # Курсор строится по created_at/id, даже если их нет в ответе
+    page = client.get("/api/users?limit=2&fields=email").get_json()
+    assert page["data"] == [{"email": "sparse2@example.com"}, {"email": "sparse1@example.com"}]
+    page = client.get(
+        f"/api/users?limit=2&fields=email&cursor={page['metadata']['next_cursor']}"
+    ).get_json()
+    assert page["data"] == [{"email": "sparse0@example.com"}]
+
+    full = client.get("/api/users/1")
+    sparse = client.get("/api/users/1?fields=id,name")
+    assert sparse.get_json()["data"] == {"id": 1, "name": "Sparse User"}
+    assert sparse.headers["ETag"] != full.headers["ETag"]
+
+    resp = client.get("/api/users?fields=id,password")
+    assert resp.status_code == 400
+    assert "fields" in resp.get_json()["details"]
+    assert client.get("/api/users/1?fields=").status_code == 400
+
+
+def test_lookup_users_by_ids(client):
+    for i in range(4):
+        client.post("/api/users", json={"name": "Lookup User", "email": f"lookup{i}@example.com"})
+    client.delete("/api/users/2")
+
+    # Порядок — как в ids (без повторов); удалённые и несуществующие — в missing
+    resp = client.get("/api/users?ids=3,99,1,2,3")
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert [u["id"] for u in body["data"]] == [3, 1]
+    assert body["metadata"] == {"requested": 4, "found": 2, "missing": [99, 2]}
+
+    # Повторный запрос отвечает из кэша тем же
+    assert client.get("/api/users?ids=3,99,1,2,3").get_json() == body
+
+    resp = client.post("/api/users/lookup", json={"ids": [4, 1], "fields": "id,email"})
+    assert resp.status_code == 200
+    assert resp.get_json()["data"] == [
+        {"id": 4, "email": "lookup3@example.com"},
+        {"id": 1, "email": "lookup0@example.com"},
+    ]
+
+    assert client.get("/api/users?ids=1,abc").status_code == 400
+    assert client.post("/api/users/lookup", json={"ids": []}).status_code == 400
+    client.application.config["USERS_LOOKUP_MAX_IDS"] = 2
+    resp = client.post("/api/users/lookup", json={"ids": [1, 2, 3]})
+    assert resp.status_code == 400
+
+
+def test_bulk_create_users_endpoint(client):
+    client.post(
+        "/api/users",
+        json={"name": "Existing", "email": "exists@example.com"},
+    )
+
+    resp = client.post(
+        "/api/users/bulk",
+        json=[
+            {"name": "Bulk One", "email": "bulk1@example.com"},
+            {"name": "Bulk Two", "email": "EXISTS@example.com"},
+            {"name": "Bulk Three", "email": "bulk1@example.com"},
+            {"name": "1", "email": "not-an-email"},
+            {"name": "Bulk Four", "email": "bulk4@example.com"},
+        ],
+    )
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert [r["status"] for r in data["data"]] == [
+        "created",
+        "conflict",
+        "conflict",
+        "invalid",
+        "created",
+    ]
+    assert data["metadata"] == {
+        "total": 5,
+        "created": 2,
+        "conflict": 2,
+        "invalid": 1,
+    }
+
+    created_id = data["data"][0]["id"]
+    resp = client.get(f"/api/users/{created_id}")
+    assert resp.get_json()["data"]["email"] == "bulk1@example.com"
+
+
+def test_bulk_create_users_requires_list(client):
+    resp = client.post("/api/users/bulk", json={"name": "x"})
+    assert resp.status_code == 400
+
+
+def test_export_users_ndjson_and_csv(client):
+    for i in range(3):
+        client.post(
+            "/api/users",
+            json={"name": "Export User", "email": f"export{i}@example.com"},
+        )
+    client.post("/api/users", json={"name": "Other", "email": "other@example.com"})
+
+    resp = client.get("/api/users/export?format=ndjson&search=export")
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    assert [u["email"] for u in lines] == [f"export{i}@example.com" for i in range(3)]
+    # Первая строка не ждёт накопления пачки
+    streamed = client.get("/api/users/export?format=ndjson&search=export", buffered=False)
+    assert next(iter(streamed.response)).count(b"\n") == 1
+    streamed.close()
+    single = client.get(f"/api/users/{lines[0]['id']}").get_json()["data"]
+    assert lines[0] == single
+
+    resp = client.get("/api/users/export?format=csv")
+    assert resp.mimetype == "text/csv"
+    rows = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+    assert len(rows) == 4
+    assert rows[0]["email"] == "export0@example.com"
+
+
+def test_export_users_invalid_format(client):
+    resp = client.get("/api/users/export?format=xml")
+    assert resp.status_code == 400
+
+
+def test_import_users_upload(client):
+    data = {
+        "file": (
+            io.BytesIO(b"name,email\nUpload User,upload@example.com\nX,bad\n"),
+            "users.csv",
+        )
+    }
+    resp = client.post(
+        "/api/users/import", data=data, content_type="multipart/form-data"
+    )
+    assert resp.status_code == 200
+    stats = resp.get_json()["data"]
+    assert stats["created"] == 1
+    assert stats["invalid"] == 1
+
+
+def test_get_user_conditional_requests(client):
+    user = client.post(
+        "/api/users",
+        json={"name": "Etag User", "email": "etag@example.com"},
+    ).get_json()["data"]
+
+    resp = client.get(f"/api/users/{user['id']}")
+    etag = resp.headers["ETag"]
+    last_modified = resp.headers["Last-Modified"]
+
+    resp = client.get(f"/api/users/{user['id']}", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.get_data() == b""
+
+    resp = client.get(
+        f"/api/users/{user['id']}",
+        headers={"If-Modified-Since": last_modified},
+    )
+    assert resp.status_code == 304
+
+    # Устаревший If-Match -> 412, актуальный -> 200 и новый ETag
+    resp = client.put(
+        f"/api/users/{user['id']}",
+        json={"name": "Changed Name"},
+        headers={"If-Match": '"stale"'},
+    )
+    assert resp.status_code == 412
+
+    resp = client.put(
+        f"/api/users/{user['id']}",
+        json={"name": "Changed Name"},
+        headers={"If-Match": etag},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+    resp = client.get(f"/api/users/{user['id']}", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.get_json()["data"]["name"] == "Changed Name"
+
+
+def test_get_users_conditional_request(client):
+    client.post("/api/users", json={"name": "List Etag", "email": "l1@example.com"})
+
+    resp = client.get("/api/users")
+    etag = resp.headers["ETag"]
+
+    resp = client.get("/api/users", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+    # Другие параметры — другой ETag
+    resp = client.get("/api/users?per_page=5", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+
+    client.post("/api/users", json={"name": "List Etag", "email": "l2@example.com"})
+    resp = client.get("/api/users", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert len(resp.get_json()["data"]) == 2
+
+
+def test_list_without_total_uses_page_etag(client):
+    client.post("/api/users", json={"name": "Page Etag", "email": "p1@example.com"})
+
+    for url in ("/api/users?with_total=false", "/api/users?limit=10"):
+        resp = client.get(url)
+        etag = resp.headers["ETag"]
+        assert resp.get_json()["metadata"].get("total") is None
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    etag = client.get("/api/users?limit=10").headers["ETag"]
+    client.post("/api/users", json={"name": "Page Etag", "email": "p2@example.com"})
+    assert client.get("/api/users?limit=10", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_async_mode_overrides_core_endpoints(tmp_path):
+    app = create_app(
+        "testing",
+        {
+            "ASYNC_MODE": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'users.db'}",
+        },
+    )
+    urls = app.url_map.bind("localhost")
+    assert urls.match("/api/users", "GET")[0] == "users_async.get_users"
+    assert urls.match("/api/users/1", "PUT")[0] == "users_async.update_user"
+    # Остальное обслуживает синхронный blueprint
+    assert urls.match("/api/users/bulk", "POST")[0] == "users.bulk_create_users"
+
+
+def test_async_mode_requires_file_database():
+    with pytest.raises(RuntimeError):
+        create_app("testing", {"ASYNC_MODE": True})
+
+
+def test_bulk_update_and_delete(client):
+    for i in range(5):
+        client.post("/api/users", json={"name": "Team Member", "email": f"team{i}@example.com"})
+    client.post("/api/users", json={"name": "Outsider", "email": "outsider@example.net"})
+    client.delete("/api/users/2")
+
+    resp = client.patch("/api/users", json={"ids": [3, 1, 2, 99], "changes": {"name": "Renamed"}})
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["data"] == [
+        {"id": 3, "status": "updated"},
+        {"id": 1, "status": "updated"},
+        {"id": 2, "status": "not_found"},
+        {"id": 99, "status": "not_found"},
+    ]
+    assert body["metadata"] == {"total": 4, "dry_run": False, "updated": 2, "not_found": 2}
+    assert client.get("/api/users/3").get_json()["data"]["name"] == "Renamed"
+
+    # dry_run только считает совпадения
+    resp = client.delete("/api/users", json={"search": "example.com", "dry_run": True})
+    assert resp.get_json()["metadata"] == {"total": 4, "dry_run": True, "matched": 4}
+    assert client.get("/api/users?ids=1,3,4,5").get_json()["metadata"]["found"] == 4
+
+    resp = client.delete("/api/users", json={"search": "example.com"})
+    assert resp.get_json()["metadata"]["deleted"] == 4
+    assert client.get("/api/users?with_total=true").get_json()["metadata"]["total"] == 1
+
+    assert client.delete("/api/users", json={"ids": [1], "search": "x"}).status_code == 400
+    assert client.delete("/api/users", json={"search": " "}).status_code == 400
+    resp = client.patch("/api/users", json={"ids": [6], "changes": {"email": "a@example.com"}})
+    assert resp.status_code == 400
+
+
+def test_changes_feed(client):
+    client.application.config["USERS_CHANGES_SETTLE_MS"] = 0
+    for i in range(3):
+        client.post("/api/users", json={"name": "Feed User", "email": f"feed{i}@example.com"})
+
+    page = client.get("/api/users/changes?limit=2").get_json()
+    assert [u["id"] for u in page["data"]] == [1, 2]
+    assert page["metadata"]["has_more"] is True
+    page = client.get(f"/api/users/changes?since={page['metadata']['cursor']}").get_json()
+    assert [u["id"] for u in page["data"]] == [3]
+    cursor = page["metadata"]["cursor"]
+
+    # Пустой опрос не сдвигает курсор
+    page = client.get(f"/api/users/changes?since={cursor}").get_json()
+    assert page["data"] == [] and page["metadata"]["cursor"] == cursor
+
+    client.put("/api/users/1", json={"name": "Feed Renamed"})
+    client.delete("/api/users/2")
+    page = client.get(f"/api/users/changes?since={cursor}").get_json()
+    assert [(u["id"], u["name"]) for u in page["data"]] == [(1, "Feed Renamed")]
+    assert page["deleted"] == [2]
+
+    # Изменения моложе USERS_CHANGES_SETTLE_MS отдаются повторно
+    client.application.config["USERS_CHANGES_SETTLE_MS"] = 60_000
+    first = client.get(f"/api/users/changes?since={cursor}").get_json()
+    assert first["metadata"]["cursor"] == cursor
+    assert client.get(f"/api/users/changes?since={cursor}").get_json()["deleted"] == [2]
+
+    assert client.get("/api/users/changes?since=2020-01-01T00:00:00Z").get_json()["metadata"]["count"] == 3
+    assert client.get("/api/users/changes?since=garbage").status_code == 400
+
+
+def read_events(resp):
+    """Первая порция потока SSE: [(id, event, data)] без комментариев."""
+    body = next(iter(resp.response)).decode()
+    resp.close()
+    events = []
+    for frame in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines() if line[:1] != ":")
+        if "id" in fields or "event" in fields:
+            data = fields.get("data")
+            events.append((fields.get("id"), fields.get("event"), data and json.loads(data)))
+    return events
+
+
+def test_stream_replays_after_last_event_id(client):
+    resp = client.get("/api/users/stream", buffered=False)
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+    [(start, event, _)] = read_events(resp)
+    assert event is None
+
+    user = client.post("/api/users", json={"name": "Stream User", "email": "stream@example.com"}).get_json()["data"]
+    client.put(f"/api/users/{user['id']}", json={"name": "Stream Renamed"})
+    client.delete(f"/api/users/{user['id']}")
+    client.post("/api/users", json={"name": "Stream Bulk", "email": "bulk@example.com"})
+    client.delete("/api/users", json={"ids": [2, 99]})
+
+    events = read_events(client.get("/api/users/stream", headers={"Last-Event-ID": start}, buffered=False))
+    assert [(event, data.get("name")) for _, event, data in events] == [
+        ("user.created", "Stream User"),
+        ("user.updated", "Stream Renamed"),
+        ("user.deleted", None),
+        ("user.created", "Stream Bulk"),
+        ("users.changed", None),
+    ]
+    assert events[2][2] == {"id": user["id"]}
+    assert events[4][2] == {"action": "deleted", "ids": [2]}
+
+    # Продолжение с середины; чужой ID — reset
+    events = read_events(client.get("/api/users/stream", headers={"Last-Event-ID": events[2][0]}, buffered=False))
+    assert [event for _, event, _ in events] == ["user.created", "users.changed"]
+    [(_, event, data)] = read_events(client.get("/api/users/stream", headers={"Last-Event-ID": "old-1"}, buffered=False))
+    assert (event, data) == ("reset", {"reason": "gap"})
@@ -0,0 +1,164 @@
+import time
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.services.user_cache import UserCache, get_user_cache, init_user_cache
+from app.services.user_service import UserService
+from app.utils.cache import MISSING, CacheBackend, LRUCache, RedisCacheBackend
+from app.utils.exceptions import NotFoundException
+
+
+class FakeRedis:
+    """Локальный фейк Redis-клиента для общего кэша."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_read_through_and_invalidation(app):
+    user = UserService.create_user(name="Cached User", email="cached@example.com")
+    cache = get_user_cache()
+
+    first = UserService.get_user_data(user.id)
+    second = UserService.get_user_data(user.id)
+    assert first == second
+    assert cache.stats()["local"]["hits"] == 1
+
+    UserService.update_user(user.id, name="Renamed User")
+    assert UserService.get_user_data(user.id)["name"] == "Renamed User"
+
+    UserService.delete_user(user.id)
+    with pytest.raises(NotFoundException):
+        UserService.get_user_data(user.id)
+
+
+def test_negative_results_are_cached(app):
+    cache = get_user_cache()
+    for _ in range(2):
+        with pytest.raises(NotFoundException):
+            UserService.get_user_data(1)
+    assert cache.stats()["local"]["hits"] == 1
+
+    # Создание пользователя сбрасывает закэшированный 404
+    user = UserService.create_user(name="New User", email="new@example.com")
+    assert user.id == 1
+    assert UserService.get_user_data(1)["email"] == "new@example.com"
+
+
+def test_shared_backend(app):
+    client = FakeRedis()
+    init_user_cache(app, shared=RedisCacheBackend(client))
+    user = UserService.create_user(name="Shared User", email="shared@example.com")
+
+    UserService.get_user_data(user.id)
+    assert f"users:{user.id}" in client.data
+
+    # Другой процесс с пустым локальным кэшем читает из общего
+    get_user_cache().local.clear()
+    assert UserService.get_user_data(user.id)["email"] == "shared@example.com"
+    assert get_user_cache().stats()["shared"]["hits"] == 1
+
+    UserService.update_user(user.id, name="Shared Renamed")
+    assert f"users:{user.id}" not in client.data
+
+
+def test_invalidation_reaches_other_workers_within_local_ttl():
+    client = FakeRedis()
+    workers = [
+        UserCache(
+            LRUCache(),
+            RedisCacheBackend(client),
+            ttl=60,
+            local_ttl=0.05,
+            versions=RedisCacheBackend(client, prefix="users:version:"),
+        )
+        for _ in range(2)
+    ]
+    workers[0].set(1, {"name": "Old Name"})
+    assert workers[1].get(1) == (True, {"name": "Old Name"})
+
+    # Второй воркер обновил пользователя: у первого локальная копия устаревает
+    # через local_ttl, а не через USER_CACHE_TTL
+    workers[1].invalidate(1)
+    workers[1].set(1, {"name": "New Name"}, workers[1].version(1))
+    time.sleep(0.06)
+    assert workers[0].get(1) == (True, {"name": "New Name"})
+
+    # Без общего бэкенда local_ttl не действует
+    assert UserCache(LRUCache(), ttl=60, local_ttl=0.05).local_ttl == 60
+
+
+def test_lru_bounds_and_ttl():
+    cache = LRUCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+
+    cache.set("d", 4, ttl=0)
+    assert cache.get("d") is MISSING
+    assert cache.stats()["expirations"] == 1
+
+
+def test_fill_after_concurrent_invalidation_is_dropped(app):
+    user = UserService.create_user(name="Old Name", email="race@example.com")
+    cache = get_user_cache()
+
+    # Читатель взял версию и прочитал строку, запись успела инвалидировать ID
+    version = cache.version(user.id)
+    stale = UserService.get_user_by_id(user.id).to_dict()
+    UserService.update_user(user.id, name="New Name")
+    cache.set(user.id, stale, version)
+    cache.set_missing(user.id, version)
+
+    assert cache.get(user.id) == (False, None)
+    assert UserService.get_user_data(user.id)["name"] == "New Name"
+
+
+def test_fill_race_across_workers(app):
+    client = FakeRedis()
+    init_user_cache(app, shared=RedisCacheBackend(client))
+    reader = get_user_cache()
+    writer = init_user_cache(app, shared=RedisCacheBackend(client))
+
+    version = reader.version(1)
+    writer.invalidate(1)
+    reader.set(1, {"name": "Stale Name"}, version)
+    assert "users:1" not in client.data
+
+    reader.set(1, {"name": "Fresh Name"}, reader.version(1))
+    assert writer.get(1) == (True, {"name": "Fresh Name"})
+
+
+def test_backend_must_implement_interface():
+    class GetOnly(CacheBackend):
+        def get(self, key):
+            return MISSING
+
+    # Неполная реализация не создаётся, а не падает при первом set()
+    with pytest.raises(TypeError):
+        GetOnly()
@@ -4,6 +4,13 @@ from app import create_app
 from app.extensions import db
 from app.services.user_service import UserService
 from app.models.user import User
+from app.utils.exceptions import (
+    ConflictException,
+    NotFoundException,
+    PreconditionFailedException,
+)
+from app.utils.helpers import user_etag
+from app.utils.pagination import decode_cursor
 
 
 @pytest.fixture
@@ -44,3 +51,125 @@ def test_soft_delete_user(session):
     db_user = User.query.filter_by(id=user.id).first()
     assert db_user is not None
     assert db_user.is_active is False
+
+
+def test_count_strategies(app, session):
+    app.config["USERS_COUNT_STRATEGY"] = "cached"
+    UserService.invalidate_counts()
+    UserService.create_user(name="Count One", email="count1@example.com")
+
+    _, meta = UserService.get_all_users(search="Count")
+    assert meta["total"] == 1
+    assert meta["count_strategy"] == "exact"
+
+    _, meta = UserService.get_all_users(search="  count ")
+    assert meta["total"] == 1
+    assert meta["count_strategy"] == "cached"
+
+    # Запись сбрасывает закэшированные total
+    UserService.create_user(name="Count Two", email="count2@example.com")
+    _, meta = UserService.get_all_users(search="Count")
+    assert meta["total"] == 2
+    assert meta["count_strategy"] == "exact"
+
+    users, meta = UserService.get_all_users(per_page=1, with_total=False)
+    assert len(users) == 1
+    assert meta["total"] is None
+    assert meta["count_strategy"] == "skipped"
+    assert meta["has_next"] is True
+
+
+def test_cursor_total_counts_whole_result(session):
+    UserService.invalidate_counts()
+    for i in range(3):
+        UserService.create_user(name="Cursor Count", email=f"cursor{i}@example.com")
+
+    users, meta = UserService.get_users_by_cursor(limit=2, with_total=True)
+    assert meta["total"] == 3
+    cursor = decode_cursor(meta["next_cursor"])
+    users, meta = UserService.get_users_by_cursor(cursor=cursor, limit=2, with_total=True)
+    assert len(users) == 1
+    assert meta["total"] == 3
+
+
+def test_search_uses_index_and_follows_writes(session):
+    UserService.invalidate_counts()
+    anna = UserService.create_user(name="Анна Каренина", email="anna@example.com")
+    UserService.create_user(name="Иван Аннушкин", email="ivan.a@example.com")
+    UserService.create_user(name="Пётр Петров", email="petr@example.com")
+
+    users, meta = UserService.get_all_users(search="анн")
+    assert {u.email for u in users} == {"anna@example.com", "ivan.a@example.com"}
+    assert meta["total"] == 2
+
+    # Обновление имени переиндексирует запись
+    UserService.update_user(anna.id, name="Анна Шмидт")
+    users, _ = UserService.get_all_users(search="Шмидт")
+    assert [u.id for u in users] == [anna.id]
+
+    # Мягко удалённые пользователи пропадают из поиска
+    UserService.delete_user(anna.id, soft_delete=True)
+    users, _ = UserService.get_all_users(search="анн")
+    assert [u.email for u in users] == ["ivan.a@example.com"]
+
+    # Короткие запросы (< 3 символов) обслуживаются через ILIKE
+    users, _ = UserService.get_all_users(search="pe")
+    assert [u.email for u in users] == ["petr@example.com"]
+
+
+def test_feed_queries_use_partial_index(session):
+    from datetime import datetime, UTC
+
+    from app.utils.pagination import ChangeCursor, Cursor
+
+    def plan(stmt):
+        compiled = stmt.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+        rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+        return " | ".join(row[3] for row in rows)
+
+    cursor = Cursor(datetime(2024, 1, 1, tzinfo=UTC), 100)
+    for stmt in (
+        UserService._page_query(1, 20, None),
+        UserService._cursor_query(cursor, 20, None),
+        UserService._version_query(None),
+    ):
+        detail = plan(stmt)
+        assert "ix_users_active_feed" in detail
+        assert "TEMP B-TREE" not in detail
+
+    # Журнал изменений — seek по ix_users_updated_at, без сортировки
+    since = ChangeCursor(datetime(2024, 1, 1, tzinfo=UTC), 100)
+    detail = plan(UserService._changes_query(since, 100))
+    assert "SEARCH users USING INDEX ix_users_updated_at" in detail
+    assert "TEMP B-TREE" not in detail
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_write_paths_keep_errors(app, session, returning):
+    # Один оператор с RETURNING и запасной путь (проверка + запись) — те же исключения
+    app.config["USERS_WRITE_RETURNING"] = returning
+    user = UserService.create_user(name="Writer", email="writer@example.com")
+    other = UserService.create_user(name="Other", email="other@example.com")
+    assert (user.name, user.is_active, user.created_at is not None) == ("Writer", True, True)
+
+    with pytest.raises(ConflictException):
+        UserService.create_user(name="Dup", email=" WRITER@example.com ")
+    with pytest.raises(ConflictException):
+        UserService.update_user(other.id, email="writer@example.com")
+    with pytest.raises(NotFoundException):
+        UserService.update_user(999, name="Nobody")
+
+    version = user.updated_at
+    etag = user_etag(user.id, version)
+    updated = UserService.update_user(user.id, if_match={etag}, name=" Renamed ")
+    assert updated.name == "Renamed" and updated.updated_at > version
+    with pytest.raises(PreconditionFailedException):
+        UserService.update_user(user.id, if_match={etag}, name="Stale")
+
+    UserService.delete_user(user.id)
+    with pytest.raises(NotFoundException):
+        UserService.delete_user(user.id)
+    with pytest.raises(NotFoundException):
+        UserService.update_user(user.id, name="Deleted")
+    UserService.delete_user(other.id, soft_delete=False)
+    assert db.session.get(User, other.id) is None
@@ -0,0 +1,73 @@
+import pytest
+
+from app.schemas.user_schema import UserCreateSchema, UserUpdateSchema
+from app.schemas.validators import (
+    DomainBlocklist,
+    get_blocklist,
+    set_blocklist,
+    validate_many,
+)
+
+RECORDS = [
+    {"name": "Иван Иванов", "email": "ivan@example.com"},
+    {"name": "Anna-Maria", "email": "anna@localhost"},
+    {"name": "X", "email": "x@example.com"},
+    {"name": "  ", "email": "spaces@example.com"},
+    {"name": "Bad_Name1", "email": "bad@example.com"},
+    {"name": "N" * 101, "email": "long@example.com"},
+    {"name": "Valid Name", "email": "not-an-email"},
+    {"name": "Valid Name", "email": "a" * 130 + "@example.com"},
+    {"name": "Valid Name", "email": "a" * 130},
+    {"name": "Valid Name", "email": "user@tempmail.com"},
+    {"name": "Valid Name", "email": "user@TempMail.com"},
+    {"name": "Valid Name", "email": "user@пример.рф"},
+    {"name": None, "email": 5},
+    {"name": "Valid Name"},
+    {"email": "only@example.com"},
+    {"name": "Valid Name", "email": "x@example.com", "role": "admin"},
+    {},
+    "not a dict",
+    ["list"],
+]
+
+
+def test_validate_many_matches_create_schema():
+    assert validate_many(RECORDS) == UserCreateSchema(many=True).validate(RECORDS)
+
+
+def test_validate_many_partial_matches_update_schema():
+    assert validate_many(RECORDS, partial=True) == UserUpdateSchema(many=True).validate(
+        RECORDS
+    )
+
+
+def test_update_does_not_check_disposable_domains():
+    # Как и до общего модуля валидации: email существующих пользователей
+    # на временных доменах не мешает их обновлять
+    record = {"email": "user@tempmail.com"}
+    assert UserUpdateSchema().validate(record) == {}
+    assert validate_many([record], partial=True) == {}
+    assert "email" in UserCreateSchema().validate({"name": "Valid Name", **record})
+
+
+def test_blocklist_from_file(tmp_path):
+    path = tmp_path / "domains.txt"
+    path.write_text(
+        "# временные домены\nthrowaway.io\nYopMail.com  # комментарий\n\n",
+        encoding="utf-8",
+    )
+    blocklist = DomainBlocklist.from_file(str(path))
+    assert len(blocklist) == 2
+    assert blocklist.is_blocked("user@yopmail.com")
+    assert not blocklist.is_blocked("user@example.com")
+
+    previous = get_blocklist()
+    set_blocklist(blocklist)
+    try:
+        errors = UserCreateSchema().validate(
+            {"name": "Valid Name", "email": "user@throwaway.io"}
+        )
+        assert errors == {"email": ["Временные email адреса не разрешены"]}
+        assert validate_many([{"name": "Valid Name", "email": "user@tempmail.com"}]) == {}
+    finally:
+        set_blocklist(previous)
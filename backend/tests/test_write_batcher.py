@@ -0,0 +1,117 @@
+import sqlite3
+import threading
+from contextlib import closing
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.services.user_service import UserService
+from app.services.write_batcher import get_write_batcher
+from app.utils.exceptions import ConflictException, NotFoundException
+
+
+@pytest.fixture
+def app(tmp_path):
+    # Файловая БД: операции выполняются в потоке пакета со своим соединением
+    app = create_app("testing", {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'users.db'}",
+        "USERS_WRITE_BATCHING": True,
+        "USERS_WRITE_BATCH_WINDOW_MS": 50,
+        "USERS_WRITE_BATCH_SIZE": 100,
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        get_write_batcher().close()
+        db.session.remove()
+        db.drop_all()
+
+
+def run_concurrently(app, calls):
+    """Выполнить calls параллельно; вернуть результат или исключение каждого."""
+    results = [None] * len(calls)
+    barrier = threading.Barrier(len(calls))
+
+    def worker(index, func, args):
+        with app.app_context():
+            barrier.wait()
+            try:
+                results[index] = func(*args)
+            except Exception as e:
+                results[index] = e
+
+    threads = [
+        threading.Thread(target=worker, args=(i, func, args))
+        for i, (func, args) in enumerate(calls)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_writes_share_commit(app):
+    commits = []
+    event.listen(db.engine, "commit", lambda conn: commits.append(1))
+
+    calls = [
+        (UserService.create_user, ("Batch User", f"batch{i}@example.com"))
+        for i in range(10)
+    ]
+    calls.append((UserService.create_user, ("Batch Twin", "batch0@example.com")))
+    results = run_concurrently(app, calls)
+
+    conflicts = [r for r in results if isinstance(r, ConflictException)]
+    created = [r for r in results if not isinstance(r, Exception)]
+    assert len(conflicts) == 1 and len(created) == 10
+    assert {user.email for user in created} == {f"batch{i}@example.com" for i in range(10)}
+    # Отсоединённые объекты сохраняют значения из RETURNING
+    assert all(user.id and user.created_at for user in created)
+    assert len(commits) < 5
+
+    # batch0 мог создать любой из двух вызовов — ID берём по email
+    by_email = {user.email: user.id for user in created}
+    ids = [by_email[f"batch{i}@example.com"] for i in range(10)]
+    results = run_concurrently(app, [
+        (lambda: UserService.update_user(ids[0], name="Renamed User"), ()),
+        (UserService.delete_user, (ids[1],)),
+        (UserService.delete_user, (999,)),
+        # IntegrityError откатывает только свой оператор
+        (lambda: UserService.update_user(ids[2], email="batch3@example.com"), ()),
+    ])
+    assert results[0].name == "Renamed User"
+    assert results[1] is None
+    assert isinstance(results[2], NotFoundException)
+    assert isinstance(results[3], ConflictException)
+    assert UserService.get_user_by_id(ids[0]).name == "Renamed User"
+    assert UserService.get_users_data([ids[1]])[1] == [ids[1]]
+
+
+def test_batched_write_pins_client_to_primary(tmp_path):
+    primary, replica = tmp_path / "primary.db", tmp_path / "replica.db"
+    app = create_app("testing", {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{primary}",
+        "SQLALCHEMY_BINDS": {"replica_0": f"sqlite:///{replica}"},
+        "USERS_WRITE_BATCHING": True,
+    })
+    with app.app_context():
+        db.create_all(bind_key=None)
+        with closing(sqlite3.connect(primary)) as src, closing(sqlite3.connect(replica)) as dst:
+            src.backup(dst)
+
+        writer, reader = app.test_client(), app.test_client()
+        resp = writer.post("/api/users", json={"name": "New User", "email": "pin@example.com"})
+        assert resp.status_code == 201, resp.get_json()
+        user_id = resp.get_json()["data"]["id"]
+
+        # Реплика отстаёт, но писавший клиент читает primary
+        assert reader.get(f"/api/users/{user_id}").status_code == 404
+        assert writer.get(f"/api/users/{user_id}").status_code == 200
+
+        get_write_batcher().close()
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()